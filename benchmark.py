@@ -0,0 +1,333 @@
+#!/bin/bash/python
+
+from __future__ import print_function
+
+import networkx as nx
+
+import configurationClass
+from configurationClass import *
+
+import instrumentation
+from instrumentation import *
+
+import argparse
+import imp
+import json
+import os
+import platform
+import shutil
+import sys
+import tempfile
+import timeit
+
+# Load the version module from this directory by filename. networkx also has a top level version module,
+# which is the one found by an import statement once networkx has been imported.
+version = imp.load_source('configurationClassVersion', os.path.join(os.path.dirname(os.path.abspath(__file__)), 'version.py'))
+
+# Define a class for generating synthetic tool and pipeline configuration files. The pipeline is a
+# chain of tasks, each using the output of the previous task as input. Some of the tasks output a
+# filename stub or a stream, some additional tasks greedily merge the outputs of the chain and some
+# tasks have an argument set by evaluating a command.
+class syntheticConfiguration:
+  def __init__(self, numberOfTasks = 50, argumentsPerTool = 0, stubFrequency = 5, streamFrequency = 7, numberOfGreedyTasks = 1,
+               numberOfEvaluateCommands = 1):
+
+    # Store the size of the pipeline.
+    self.numberOfTasks = numberOfTasks
+
+    # Store the number of additional (optional) arguments to add to each tool.
+    self.argumentsPerTool = argumentsPerTool
+
+    # One in every stubFrequency tasks outputs a filename stub and one in every streamFrequency tasks
+    # outputs to a stream (a task is not both, so filename stubs take precedence). If set to zero, no
+    # tasks of this type are included.
+    self.stubFrequency   = stubFrequency
+    self.streamFrequency = streamFrequency
+
+    # Store the number of tasks that greedily use outputs from the chain and the number of tasks with
+    # an argument set by evaluating a command.
+    self.numberOfGreedyTasks      = numberOfGreedyTasks
+    self.numberOfEvaluateCommands = numberOfEvaluateCommands
+
+  # Define an argument for a tool.
+  def buildArgument(self, longFormArgument, shortFormArgument, dataType, extensions, isRequired):
+    argument                          = {}
+    argument['long form argument']    = longFormArgument
+    argument['short form argument']   = shortFormArgument
+    argument['command line argument'] = longFormArgument
+    argument['data type']             = dataType
+    argument['description']           = 'Synthetic argument ' + longFormArgument + '.'
+    argument['extensions']            = extensions
+    argument['required']              = isRequired
+
+    return argument
+
+  # Build the configuration data for a tool.
+  def buildTool(self, tool, isStub = False, isStream = False, hasEvaluateCommand = False):
+    inputs = [self.buildArgument('--in', '-i', 'string', ['.bam'], True), self.buildArgument('--ref', '-r', 'string', ['.fa'], True)]
+    if isStream: inputs[0]['if input is stream'] = 'do not include'
+
+    outputs = [self.buildArgument('--out', '-o', 'string', ['.bam'], True)]
+    if isStub:
+      outputs[0]['is filename stub']    = True
+      outputs[0]['filename extensions'] = ['.bam', '.bai']
+    if isStream: outputs[0]['if output to stream'] = 'do not include'
+
+    options = [self.buildArgument('--param', '-p', 'integer', ['no extension'], True), self.buildArgument('--flag', '-f', 'flag', ['no extension'], True)]
+    if hasEvaluateCommand: options.append(self.buildArgument('--size', '-s', 'string', ['no extension'], True))
+    for counter in range(self.argumentsPerTool):
+      options.append(self.buildArgument('--option' + str(counter), '-o' + str(counter), 'string', ['no extension'], False))
+
+    data                   = {}
+    data['id']             = tool
+    data['description']    = 'Synthetic tool ' + tool + '.'
+    data['categories']     = ['General']
+    data['executable']     = tool
+    data['help']           = '--help'
+    data['path']           = tool
+    data['parameter sets'] = []
+    data['tools']          = []
+    data['arguments']      = {'inputs': inputs, 'outputs': outputs, 'options': options}
+
+    return data
+
+  # Determine the tool used by a task in the chain. The last task in every stubFrequency (or
+  # streamFrequency) tasks uses the filename stub (or stream) tool.
+  def getTaskTool(self, counter):
+    if self.stubFrequency and counter % self.stubFrequency == self.stubFrequency - 1: return 'benchmark_stub'
+    elif self.streamFrequency and counter % self.streamFrequency == self.streamFrequency - 1: return 'benchmark_stream'
+
+    return 'benchmark_plain'
+
+  # Get the tasks in the chain that use the plain tool, i.e. that output a single file (not a filename
+  # stub or a stream). The greedy tasks and evaluated commands use the files of these tasks.
+  def getPlainTasks(self):
+    return ['task' + str(counter) for counter in range(self.numberOfTasks) if self.getTaskTool(counter) == 'benchmark_plain']
+
+  # Build the configuration data for the pipeline.
+  def buildPipeline(self):
+    tasks = {}
+    nodes = []
+
+    # Define the chain of tasks.
+    for counter in range(self.numberOfTasks):
+      task        = 'task' + str(counter)
+      tasks[task] = {'tool': self.getTaskTool(counter)}
+      if tasks[task]['tool'] == 'benchmark_stream': tasks[task]['output to stream'] = True
+
+    # Link each task to the next task in the chain. Delete some of the intermediate files.
+    linkNodes = {}
+    for counter in range(self.numberOfTasks - 1):
+      task     = 'task' + str(counter)
+      nextTask = 'task' + str(counter + 1)
+      node     = {'ID': 'link' + str(counter), 'description': 'Link.', 'tasks': {task: '--out', nextTask: '--in'}}
+      if tasks[task]['tool'] == 'benchmark_stub': node['extensions'] = {nextTask: {'--in': '.bam'}}
+      if counter % 4 == 1: node['delete files'] = True
+      linkNodes[task] = node
+      nodes.append(node)
+
+    # Define the pipeline arguments, including an option shared by many of the tasks.
+    nodes.append({'ID': 'input', 'description': 'Input.', 'tasks': {'task0': '--in'}, 'long form argument': '--input', 'short form argument': '-i'})
+    nodes.append({'ID': 'param', 'description': 'Parameter.', 'tasks': dict(('task' + str(counter), '--param') for counter in range(0, self.numberOfTasks, 2)),
+                  'long form argument': '--param', 'short form argument': '-p'})
+    # A chain with a single task has no task using the reference, and a node must have a connection.
+    referenceTasks = dict(('task' + str(counter), '--ref') for counter in range(1, self.numberOfTasks, 3))
+    if referenceTasks:
+      nodes.append({'ID': 'reference', 'description': 'Reference.', 'tasks': referenceTasks, 'long form argument': '--reference', 'short form argument': '-r'})
+
+    # Add the greedy tasks. Each greedily uses the output of the last plain task in the chain. A task
+    # argument can only appear in a single node, so if this task links to the next task in the chain,
+    # the greedy tasks are added to the link node.
+    plainTasks  = self.getPlainTasks()
+    greedyTasks = {}
+    for counter in range(self.numberOfGreedyTasks):
+      task              = 'merge' + str(counter)
+      tasks[task]       = {'tool': 'benchmark_plain'}
+      greedyTasks[task] = '--in'
+    if greedyTasks and plainTasks[-1] in linkNodes: linkNodes[plainTasks[-1]]['greedy tasks'] = greedyTasks
+    elif greedyTasks: nodes.append({'ID': 'greedy', 'description': 'Greedy.', 'tasks': {plainTasks[-1]: '--out'}, 'greedy tasks': greedyTasks})
+
+    # Add the tasks with an argument set by evaluating a command using the input of a plain task in the
+    # chain.
+    for counter in range(self.numberOfEvaluateCommands):
+      task        = 'evaluate' + str(counter)
+      sourceTask  = plainTasks[counter % len(plainTasks)]
+      tasks[task] = {'tool': 'benchmark_eval'}
+      nodes.append({'ID': 'evaluateInput' + str(counter), 'description': 'Evaluate input.', 'tasks': {task: '--in'}, 'originating edges': {sourceTask: '--out'}})
+      nodes.append({'ID': 'size' + str(counter), 'description': 'Size.', 'tasks': {task: '--size'},
+                    'evaluate command': {'command': 'wc -c FILE', 'add values': [{'ID': 'FILE', 'task': sourceTask, 'argument': '--in'}]}})
+
+    return {'description': 'Synthetic pipeline.', 'categories': ['General'], 'parameter sets': [], 'tasks': tasks, 'nodes': nodes}
+
+  # Write the tool and pipeline configuration files to a directory. A list of (tool, filename) tuples and
+  # the pipeline filename are returned.
+  def writeConfigurationFiles(self, directory):
+    toolFiles = []
+    for tool, isStub, isStream, hasEvaluateCommand in [('benchmark_plain', False, False, False), ('benchmark_stub', True, False, False),
+                                                       ('benchmark_stream', False, True, False), ('benchmark_eval', False, False, True)]:
+      filename = os.path.join(directory, tool + '.json')
+      with open(filename, 'w') as toolFile: json.dump(self.buildTool(tool, isStub, isStream, hasEvaluateCommand), toolFile, indent = 2)
+      toolFiles.append((tool, filename))
+
+    pipelineFilename = os.path.join(directory, 'benchmark.json')
+    with open(pipelineFilename, 'w') as pipelineFile: json.dump(self.buildPipeline(), pipelineFile, indent = 2)
+
+    return toolFiles, pipelineFilename
+
+# Filename construction is handled outside of this library. The benchmark sets all of the file values
+# directly, so no arguments need to be constructed.
+class benchmarkConstruct:
+  def canToolArgumentBeConstructed(self, graph, config, tool, argument): return None, None
+
+class benchmarkGkno:
+  def __init__(self):
+    self.construct = benchmarkConstruct()
+
+# Define a class for timing each phase of building and processing the pipeline graph.
+class pipelineBenchmark:
+  def __init__(self, configuration, numberOfDataSets = 1):
+    self.configuration    = configuration
+    self.numberOfDataSets = numberOfDataSets
+
+    # Store the time taken for each phase, in the order that the phases are run.
+    self.phases = []
+    self.times  = {}
+
+  # Run a phase, recording the time taken, and return the result.
+  def timePhase(self, phase, method, *arguments):
+    start  = timeit.default_timer()
+    result = method(*arguments)
+    if phase not in self.times:
+      self.phases.append(phase)
+      self.times[phase] = []
+    self.times[phase].append(timeit.default_timer() - start)
+
+    return result
+
+  # Attach values to all of the option and file nodes used by the tasks. Each file is given a value for
+  # each data set.
+  def attachValues(self, config, graph):
+    for task in config.pipeline.workflow:
+      for optionNodeID in config.nodeMethods.getPredecessorOptionNodes(graph, task):
+        if config.nodeMethods.getGraphNodeAttribute(graph, optionNodeID, 'values'): continue
+        argument = config.edgeMethods.getEdgeAttribute(graph, optionNodeID, task, 'longFormArgument')
+        if argument == '--param': config.nodeMethods.addValuesToGraphNode(graph, optionNodeID, ['1'], write = 'replace')
+        elif config.nodeMethods.getGraphNodeAttribute(graph, optionNodeID, 'isFile'):
+          for iteration in range(1, self.numberOfDataSets + 1):
+            config.nodeMethods.addValuesToGraphNode(graph, optionNodeID, [optionNodeID + '_' + str(iteration) + '.bam'], write = 'iteration')
+          for fileNodeID in config.nodeMethods.getAssociatedFileNodeIDs(graph, optionNodeID):
+            for iteration in range(1, self.numberOfDataSets + 1):
+              config.nodeMethods.addValuesToGraphNode(graph, fileNodeID, [fileNodeID + '_' + str(iteration) + '.bam'], write = 'iteration')
+
+  # Read the configuration files and build and process the pipeline graph, timing each phase.
+  def run(self, toolFiles, pipelineFilename):
+    config = configurationMethods()
+    config.fileOperations.clearConfigurationCache()
+
+    # Read and validate the configuration files.
+    def readConfigurationFiles():
+      for tool, filename in toolFiles:
+        config.tools.processConfigurationData(tool, config.fileOperations.readConfigurationFile(filename), ['General'], True)
+      data = config.fileOperations.readConfigurationFile(pipelineFilename)
+      config.pipeline.processConfigurationData(data, 'benchmark', [os.path.basename(filename) for tool, filename in toolFiles], ['General'], True)
+      config.pipeline.checkCommonNodes(config.tools)
+    self.timePhase('readConfigurationFiles', readConfigurationFiles)
+
+    # Build the pipeline graph.
+    config.isPipeline = True
+    graph             = pipelineGraph()
+    tasks             = sorted(config.pipeline.taskAttributes.keys())
+    self.timePhase('buildTaskGraph', config.buildTaskGraph, graph, tasks)
+    self.timePhase('assignPipelineAttributes', config.assignPipelineAttributes, graph, tasks)
+    self.timePhase('mergeNodes', config.mergeNodes, graph)
+    self.timePhase('processOriginatingEdges', config.processOriginatingEdges, graph)
+    self.timePhase('processAdditionalNodes', config.processAdditionalNodes, graph)
+    self.timePhase('getPipelineArgumentNodes', config.nodeMethods.getPipelineArgumentNodes, graph, config)
+    self.timePhase('connectPipelineArgumentsFromAdditionalNodes', config.connectPipelineArgumentsFromAdditionalNodes, graph)
+
+    # Determine the workflow.
+    workflow                 = self.timePhase('generateWorkflow', config.generateWorkflow, graph)
+    config.pipeline.workflow = self.timePhase('correctWorkflowForStreams', config.correctWorkflowForStreams, graph, workflow)
+    self.timePhase('setRequiredNodes', config.nodeMethods.setRequiredNodes, graph, config.tools, config.pipeline.workflow)
+    self.timePhase('identifyStreamingNodes', config.identifyStreamingNodes, graph)
+
+    # Attach values to the nodes and process them.
+    self.timePhase('attachValues', self.attachValues, config, graph)
+    self.timePhase('evaluateCommands', config.evaluateCommands, graph)
+    self.timePhase('checkRequiredFiles', config.checkRequiredFiles, graph, benchmarkGkno())
+    self.timePhase('getNumberOfDataSets', config.getNumberOfDataSets, graph)
+
+    # Extract the dependencies and outputs.
+    intermediates = self.timePhase('getGraphIntermediateFiles', config.getGraphIntermediateFiles, graph, config.pipeline.workflow)
+    deleteList    = self.timePhase('setWhenToDeleteFiles', config.setWhenToDeleteFiles, graph, intermediates)
+    self.timePhase('getGraphDependencies', config.getGraphDependencies, graph, config.pipeline.workflow, 'all')
+    self.timePhase('getGraphOutputs', config.getGraphOutputs, graph, config.pipeline.workflow, deleteList, 'all')
+    self.timePhase('getWorkflowFileMatrix', config.getWorkflowFileMatrix, graph)
+
+    return config, graph
+
+  # Run the benchmark a number of times and return the results. The fastest time for each phase is
+  # reported as well as all of the individual times. If requested, the counters and spans from an
+  # additional, instrumented run are included.
+  def getResults(self, toolFiles, pipelineFilename, repeats = 3, isInstrumented = False):
+    for repeat in range(repeats): config, graph = self.run(toolFiles, pipelineFilename)
+    if isInstrumented: report = self.getInstrumentationReport(toolFiles, pipelineFilename)
+
+    results                 = {}
+    results['version']      = version.__version__
+    results['python']       = platform.python_version()
+    results['parameters']   = {'numberOfTasks': self.configuration.numberOfTasks, 'argumentsPerTool': self.configuration.argumentsPerTool,
+                               'stubFrequency': self.configuration.stubFrequency, 'streamFrequency': self.configuration.streamFrequency,
+                               'numberOfGreedyTasks': self.configuration.numberOfGreedyTasks,
+                               'numberOfEvaluateCommands': self.configuration.numberOfEvaluateCommands,
+                               'numberOfDataSets': self.numberOfDataSets, 'repeats': repeats}
+    results['graph']        = {'nodes': graph.number_of_nodes(), 'edges': graph.number_of_edges(), 'tasks': len(config.pipeline.workflow)}
+    results['phases']       = [{'phase': phase, 'minimum': min(self.times[phase]), 'times': self.times[phase]} for phase in self.phases]
+    results['totalMinimum'] = sum([phase['minimum'] for phase in results['phases']])
+
+    if isInstrumented: results['instrumentation'] = report
+
+    return results
+
+  # Run the benchmark with the instrumentation enabled and return the counters and spans. The times of
+  # this run are discarded, as they include the overhead of the instrumentation.
+  def getInstrumentationReport(self, toolFiles, pipelineFilename):
+    times     = dict((phase, list(self.times[phase])) for phase in self.times)
+    collector = instrumentation()
+    collector.reset()
+    collector.enable()
+    try: self.run(toolFiles, pipelineFilename)
+    finally: collector.disable()
+    self.times = times
+
+    return collector.getReport()
+
+if __name__ == '__main__':
+  parser = argparse.ArgumentParser(description = 'Benchmark building and processing synthetic pipeline graphs.')
+  parser.add_argument('--tasks', type = int, default = 50, help = 'The number of tasks in the pipeline chain.')
+  parser.add_argument('--arguments', type = int, default = 0, help = 'The number of additional arguments for each tool.')
+  parser.add_argument('--stub-frequency', type = int, default = 5, help = 'One in this many tasks outputs a filename stub (0 for none).')
+  parser.add_argument('--stream-frequency', type = int, default = 7, help = 'One in this many tasks outputs to a stream (0 for none).')
+  parser.add_argument('--greedy', type = int, default = 1, help = 'The number of greedy tasks.')
+  parser.add_argument('--evaluate', type = int, default = 1, help = 'The number of arguments set by evaluating a command.')
+  parser.add_argument('--data-sets', type = int, default = 1, help = 'The number of data sets.')
+  parser.add_argument('--repeats', type = int, default = 3, help = 'The number of times to run the benchmark.')
+  parser.add_argument('--instrument', action = 'store_true', help = 'Include the counters and phase timings from an additional instrumented run.')
+  parser.add_argument('--output', default = None, help = 'Write the results as json to this file, rather than to the screen.')
+  options = parser.parse_args()
+  for option, minimum in [('tasks', 1), ('arguments', 0), ('stub_frequency', 0), ('stream_frequency', 0), ('greedy', 0), ('evaluate', 0),
+                          ('data_sets', 1), ('repeats', 1)]:
+    if getattr(options, option) < minimum: parser.error('--' + option.replace('_', '-') + ' must be at least ' + str(minimum) + '.')
+
+  configuration = syntheticConfiguration(options.tasks, options.arguments, options.stub_frequency, options.stream_frequency, options.greedy, options.evaluate)
+  if (options.greedy or options.evaluate) and not configuration.getPlainTasks():
+    parser.error('The greedy tasks and evaluated commands need at least one task that does not output a filename stub or stream.')
+  directory     = tempfile.mkdtemp()
+  try:
+    toolFiles, pipelineFilename = configuration.writeConfigurationFiles(directory)
+    results                     = pipelineBenchmark(configuration, options.data_sets).getResults(toolFiles, pipelineFilename, options.repeats, options.instrument)
+  finally: shutil.rmtree(directory)
+
+  if options.output:
+    with open(options.output, 'w') as outputFile: json.dump(results, outputFile, indent = 2)
+  else: print(json.dumps(results, indent = 2))
@@ -27,8 +27,22 @@ from toolAttributes import *
 
 import json
 import os
+import re
 import sys
 
+try: import cPickle as pickle
+except ImportError: import pickle
+
+from collections import OrderedDict
+
+# Store the graphs built for pipelines. Building and merging the nodes for a pipeline gives the same
+# graph every time the pipeline is run with the same configuration files, so the graph is stored
+# (before any values are attached) and a copy is used for subsequent runs. The templates are keyed
+# by the hashes of the configuration files and the tasks in the pipeline. When the cache is full, the
+# least recently used template is discarded.
+graphTemplates    = OrderedDict()
+graphTemplateSize = 32
+
 class configurationMethods:
   def __init__(self):
 
@@ -58,6 +72,122 @@ class configurationMethods:
 
     self.nodeIDs = {}
 
+    # If the graph is updated incrementally when node values change, store the tasks whose number of
+    # data sets, dependencies and outputs are derived from the values of each node, and the dependencies
+    # and outputs already determined for each task (see setIncrementalMode).
+    self.isIncremental   = False
+    self.valueDependents = {}
+    self.taskFileCache   = {}
+
+  # Validate tool and pipeline configuration files without terminating on the first error. The files are
+  # supplied as lists of (tool, filename) and (pipeline, filename) tuples. Every file is checked and an
+  # error collector (see configurationErrorCollector) containing all of the errors found is returned.
+  # All of the independent checks of a file are made, but checks that depend on information containing
+  # errors are not. Valid tools are added to the tool configuration.
+  def validateConfigurationFiles(self, toolFiles, pipelineFiles, allowedCategories):
+    collector                            = configurationErrorCollector()
+    self.fileOperations.errors.collector = collector
+    try:
+      for tool, filename in toolFiles:
+        collector.setContext(filename, tool)
+        try: data = self.fileOperations.readConfigurationFile(filename)
+        except configurationError: continue
+        self.tools.validateConfigurationData(tool, data, allowedCategories, collector, filename)
+
+      # Pipelines are checked using a separate pipeline configuration, so that the pipeline currently
+      # being used is not modified.
+      toolFilenames = [os.path.basename(filename) for tool, filename in toolFiles]
+      for pipeline, filename in pipelineFiles:
+        collector.setContext(filename, pipeline)
+        try: data = self.fileOperations.readConfigurationFile(filename)
+        except configurationError: continue
+        pipelineConfiguration().validateConfigurationData(data, pipeline, toolFilenames, allowedCategories, collector, filename)
+
+    finally: self.fileOperations.errors.collector = None
+
+    return collector
+
+  # Write the validated tool and pipeline configuration information to a compiled snapshot. The source
+  # files are the configuration files that the information was read from. If any of these change, the
+  # snapshot is no longer valid.
+  def writeConfigurationSnapshot(self, filename, sourceFiles):
+    data                  = {}
+    data['isPipeline']    = self.isPipeline
+    data['tools']         = self.tools.getSnapshotData()
+    data['pipeline']      = self.pipeline.getSnapshotData()
+    self.fileOperations.writeConfigurationSnapshot(filename, sourceFiles, data)
+
+  # Load the validated tool and pipeline configuration information from a compiled snapshot. Return
+  # False if the snapshot is missing or out of date, in which case the configuration files need to be
+  # read and validated as usual.
+  def loadConfigurationSnapshot(self, filename, sourceFiles):
+    data = self.fileOperations.readConfigurationSnapshot(filename, sourceFiles)
+    if data == None: return False
+
+    self.isPipeline = data['isPipeline']
+    self.tools.loadSnapshotData(data['tools'])
+    self.pipeline.loadSnapshotData(data['pipeline'])
+
+    return True
+
+  # Build the pipeline graph. The graph for each task is built, the pipeline attributes assigned and
+  # nodes merged, and then the originating edges and additional nodes are included. If the graph has
+  # already been built for this pipeline with the same configuration files (sourceFiles), a copy of
+  # the stored graph is used instead. The return value indicates if originating edges were added.
+  #
+  # The order in which the nodes and their neighbours are listed depends on the order that they were
+  # added to (and removed from) the graph, and this determines the order of the tasks in the workflow.
+  # A copy of the template lists them in a different order to the graph that was built, so the graph
+  # is built separately and a copy of the template is always used. Every run of the pipeline then
+  # gives the same graph, whether or not the template was already stored.
+  def buildPipelineGraph(self, graph, tasks, sourceFiles):
+    key = (tuple(sorted(self.fileOperations.getSourceFileHashes(sourceFiles).items())), tuple(tasks))
+    if key in graphTemplates:
+      template = graphTemplates.pop(key)
+      graphTemplates[key] = template
+      return self.copyGraphTemplate(graph, template)
+
+    # Build the pipeline in a graph containing the nodes and edges already in the graph, so that these
+    # can be connected to. Only the nodes and edges added when building the pipeline are stored in the
+    # template.
+    existingNodeIDs = set(graph.nodes())
+    existingEdges   = set(graph.edges())
+    pipeline        = graph.__class__()
+    pipeline.add_nodes_from(graph.nodes(data = True))
+    pipeline.add_edges_from(graph.edges(data = True))
+
+    self.buildTaskGraph(pipeline, tasks)
+    self.assignPipelineAttributes(pipeline, tasks)
+    self.mergeNodes(pipeline)
+    isEdgesAdded = self.processOriginatingEdges(pipeline)
+    self.processAdditionalNodes(pipeline)
+
+    # Store the template. The nodes and edges are stored in the order that they appear in the graph.
+    nodes    = [(nodeID, pipeline.node[nodeID]) for nodeID in pipeline.nodes() if nodeID not in existingNodeIDs]
+    edges    = [(u, v, data) for u, v, data in pipeline.edges(data = True) if (u, v) not in existingEdges]
+    template = pickle.dumps((nodes, edges, self.nodeIDs, self.nodeMethods.optionNodeID, isEdgesAdded), 2)
+    graphTemplates[key] = template
+    while len(graphTemplates) > graphTemplateSize: graphTemplates.popitem(last = False)
+
+    return self.copyGraphTemplate(graph, template)
+
+  # Remove all of the stored graph templates.
+  def clearGraphTemplates(self):
+    graphTemplates.clear()
+
+  # Add a copy of the nodes and edges stored in a graph template to the graph. Copies of the template
+  # list the nodes and the neighbours of each node in the same order.
+  def copyGraphTemplate(self, graph, template):
+    nodes, edges, nodeIDs, optionNodeID, isEdgesAdded = pickle.loads(template)
+    graph.add_nodes_from(nodes)
+    graph.add_edges_from(edges)
+
+    # Restore the information about the nodes that was stored while the graph was built.
+    self.nodeIDs                  = nodeIDs
+    self.nodeMethods.optionNodeID = optionNodeID
+
+    return isEdgesAdded
+
   # Build a graph for an individual task.  The pipeline is built by merging nodes between
   # different tasks.  This step is performed later.
   def buildTaskGraph(self, graph, tasks):
@@ -183,10 +313,10 @@ class configurationMethods:
       deleteFiles = self.pipeline.nodeAttributes[configNodeID].deleteFiles
 
       # If there is only a single node listed, there is no need to proceed, since no merging needs to
-      # take place. 
-      optionsToMerge   = deepcopy(self.pipeline.commonNodes[configNodeID])
+      # take place. The linked extensions are only read, so do not need to be copied.
+      optionsToMerge   = list(self.pipeline.commonNodes[configNodeID])
       #TODO CHECK
-      linkedExtensions = deepcopy(self.pipeline.linkedExtension[configNodeID]) if configNodeID in self.pipeline.linkedExtension else {}
+      linkedExtensions = self.pipeline.linkedExtension[configNodeID] if configNodeID in self.pipeline.linkedExtension else {}
       if len(optionsToMerge) != 1:
 
         # Pick one of the nodes to keep.  If the option picked has not yet been set as a node, choose
@@ -265,26 +395,36 @@ class configurationMethods:
   # Create missing merged nodes.
   def createMissingMergedNodes(self, graph, edgesToCreate):
     createdNodes = {}
+
+    # Find the pipeline configuration file nodes that point to each node ID, so that the nodeIDs
+    # dictionary can be updated for each created node without searching it.
+    configNodeIDs = {}
+    for configNodeID in self.nodeIDs:
+      nodeID = self.nodeIDs[configNodeID]
+      if nodeID not in configNodeIDs: configNodeIDs[nodeID] = []
+      configNodeIDs[nodeID].append(configNodeID)
+
     for mergeNodeID in edgesToCreate:
-      for nodeID, task, argument in edgesToCreate[mergeNodeID]:
 
-        # If the node does not exist (i.e. none of the nodes being merged had been added to the graph),
-        # the ID will begin with 'CREATE_NODE'.  If this is the case, create the node.
-        if mergeNodeID.startswith('CREATE_NODE') and mergeNodeID not in createdNodes:
-          tempNodeID = 'OPTION_' + str(self.nodeMethods.optionNodeID)
-          self.nodeMethods.optionNodeID += 1
-          tool       = self.nodeMethods.getGraphNodeAttribute(graph, task, 'tool')
-          attributes = self.nodeMethods.buildNodeFromToolConfiguration(self.tools, tool, argument)
-          graph.add_node(tempNodeID, attributes = attributes)
+      # If the node does not exist (i.e. none of the nodes being merged had been added to the graph),
+      # the ID will begin with 'CREATE_NODE'.  If this is the case, create the node using the first
+      # task and argument.  There will be at least two edges required for any of the nodes to be
+      # created, but the node only needs to be created once.
+      if mergeNodeID.startswith('CREATE_NODE') and edgesToCreate[mergeNodeID]:
+        nodeID, task, argument = edgesToCreate[mergeNodeID][0]
+        tempNodeID = 'OPTION_' + str(self.nodeMethods.optionNodeID)
+        self.nodeMethods.optionNodeID += 1
+        tool       = self.nodeMethods.getGraphNodeAttribute(graph, task, 'tool')
+        attributes = self.nodeMethods.buildNodeFromToolConfiguration(self.tools, tool, argument)
+        graph.add_node(tempNodeID, attributes = attributes)
 
-          # With the node addded, add the mergeNodeID to the dictionary containing nodes created in
-          # this routine.  There will be at least two edges required for any of the nodes to be
-          # created, but the node only needs to be created once.
-          createdNodes[mergeNodeID] = tempNodeID
+        # With the node addded, add the mergeNodeID to the dictionary containing nodes created in
+        # this routine.
+        createdNodes[mergeNodeID] = tempNodeID
 
-          # Modify the value in the nodeIDs dictionary to reflect this modified node value.
-          for storedNodeID in self.nodeIDs:
-            if mergeNodeID == self.nodeIDs[storedNodeID]: self.nodeIDs[storedNodeID] = tempNodeID
+        # Modify the value in the nodeIDs dictionary to reflect this modified node value.
+        if mergeNodeID in configNodeIDs:
+          for configNodeID in configNodeIDs[mergeNodeID]: self.nodeIDs[configNodeID] = tempNodeID
 
     # Having created all of the necessary nodes, update the edgesToCreate structure to include the new
     # IDs.
@@ -295,8 +435,6 @@ class configurationMethods:
   def createEdgesForMergedNodes(self, graph, edgesToCreate):
     for mergeNodeID in edgesToCreate:
       for nodeID, task, argument in edgesToCreate[mergeNodeID]:
-        tool = self.nodeMethods.getGraphNodeAttribute(graph, task, 'tool')
-
         if argument == 'read json file': self.edgeMethods.addJsonEdge(graph, mergeNodeID, task)
 
         # Add an edge from the merged node to this task.
@@ -305,6 +443,11 @@ class configurationMethods:
   # Create edges from the merged file nodes to the tasks whose own file nodes were marked
   # for removal in the merging process.  Filename stubs have to be handled here.
   def createEdgesForMergedFileNodes(self, graph, edgesToCreate):
+
+    # Store the extensions of the file nodes associated with each merged filename stub node, so that
+    # the file node matching a required extension can be found directly.
+    extensionTables = {}
+
     for mergeNodeID in edgesToCreate:
       for nodeID, task, argument in edgesToCreate[mergeNodeID]:
 
@@ -343,7 +486,8 @@ class configurationMethods:
   
             # If either of the nodes are filename stubs, deal with them.
             elif mergedNodeIsFilenameStub and not removedNodeisFilenameStub:
-              self.createFilenameStubEdgesM(graph, mergeNodeID, nodeID, task, shortFormArgument, longFormArgument)
+              if mergeNodeID not in extensionTables: extensionTables[mergeNodeID] = self.getFileNodeExtensionTable(graph, mergeNodeID)
+              self.createFilenameStubEdgesM(graph, mergeNodeID, nodeID, task, shortFormArgument, longFormArgument, extensionTables[mergeNodeID])
             elif not mergedNodeIsFilenameStub and removedNodeisFilenameStub:
               self.createFilenameStubEdgesR(graph, mergeNodeID, nodeID, task, tool, shortFormArgument, longFormArgument)
             elif mergedNodeIsFilenameStub and removedNodeisFilenameStub:
@@ -369,37 +513,44 @@ class configurationMethods:
     if isInput: self.edgeMethods.addEdge(graph, self.nodeMethods, self.tools, mergeFileNodeIDs[0], task, longFormArgument)
     else: self.edgeMethods.addEdge(graph, self.nodeMethods, self.tools, task, mergeFileNodeIDs[0], longFormArgument)
 
+  # Build a table of the extensions allowed by the file nodes associated with an option node. Each
+  # extension points to the position of the first file node that allows it and the file node ID.
+  def getFileNodeExtensionTable(self, graph, optionNodeID):
+    extensionTable = {}
+    for position, fileNodeID in enumerate(self.nodeMethods.getAssociatedFileNodeIDs(graph, optionNodeID)):
+      for extension in self.nodeMethods.getGraphNodeAttribute(graph, fileNodeID, 'allowedExtensions'):
+        if extension not in extensionTable: extensionTable[extension] = (position, fileNodeID)
+
+    return extensionTable
+
   # Create the edges for file nodes that are generated from filename stubs.  Specifically, deal
   # with the case where the node being kept is a filename stub and the node being removed is not.
-  def createFilenameStubEdgesM(self, graph, mergeNodeID, nodeID, task, shortFormArgument, longFormArgument):
-    foundMatch = False
-    tool       = self.nodeMethods.getGraphNodeAttribute(graph, task, 'tool')
-
-    # The node being kept is a filename stub, so has multiple file nodes associated with it. First
-    # loop over these file nodes.
-    for fileNodeID in self.nodeMethods.getAssociatedFileNodeIDs(graph, mergeNodeID):
-      
-      # Get the extension that the file is expecting. Add a '.' to the front of this extension. The extensions
-      # supplied for filename stubs begin with a '.'.
-      extensionA = self.pipeline.getExtension(task, longFormArgument, self.nodeMethods.getGraphNodeAttribute(graph, nodeID, 'linkedExtension'))
-      extensionB = '.' + self.pipeline.getExtension(task, longFormArgument, self.nodeMethods.getGraphNodeAttribute(graph, nodeID, 'linkedExtension'))
-      allowedExtensions = self.nodeMethods.getGraphNodeAttribute(graph, fileNodeID, 'allowedExtensions')
-      if extensionA in allowedExtensions or extensionB in allowedExtensions:
-        foundMatch = True
-
-        # Create the edge from the file node to the task.
-        isInput = self.tools.getArgumentAttribute(tool, longFormArgument, 'isInput')
-        if isInput: self.edgeMethods.addEdge(graph, self.nodeMethods, self.tools, fileNodeID, task, longFormArgument)
-        else: self.edgeMethods.addEdge(graph, self.nodeMethods, self.tools, task, fileNodeID, longFormArgument)
-        break
+  # The extension table is the table of extensions for the file nodes of the node being kept.
+  def createFilenameStubEdgesM(self, graph, mergeNodeID, nodeID, task, shortFormArgument, longFormArgument, extensionTable):
+    tool    = self.nodeMethods.getGraphNodeAttribute(graph, task, 'tool')
+    matches = []
+
+    # The node being kept is a filename stub, so has multiple file nodes associated with it. Get the
+    # extension that the file is expecting and find the first of these file nodes that allows it. The
+    # extensions supplied for filename stubs begin with a '.', so also check with this added.
+    if extensionTable:
+      extension = self.pipeline.getExtension(task, longFormArgument, self.nodeMethods.getGraphNodeAttribute(graph, nodeID, 'linkedExtension'))
+      if extension in extensionTable: matches.append(extensionTable[extension])
+      if '.' + extension in extensionTable: matches.append(extensionTable['.' + extension])
 
     # If the expected extension was not available in any of the file nodes, this must be an error in the
     # pipeline configuration file.
-    if not foundMatch:
+    if not matches:
       #TODO ERROR
       print('createFilenameStubEdgesM')
       self.errors.terminate()
 
+    # Create the edge from the file node to the task.
+    position, fileNodeID = min(matches)
+    isInput              = self.tools.getArgumentAttribute(tool, longFormArgument, 'isInput')
+    if isInput: self.edgeMethods.addEdge(graph, self.nodeMethods, self.tools, fileNodeID, task, longFormArgument)
+    else: self.edgeMethods.addEdge(graph, self.nodeMethods, self.tools, task, fileNodeID, longFormArgument)
+
   # Create the edges for file nodes that are generated from filename stubs.  Specifically, deal
   # with the case where the node being kept is not a filename stub and the node being removed is.
   def createFilenameStubEdgesR(self, graph, mergeNodeID, nodeID, task, tool, shortFormArgument, longFormArgument):
@@ -416,12 +567,14 @@ class configurationMethods:
     # Get the extensions for the output files.
     outputExtensions = self.tools.getArgumentAttribute(tool, longFormArgument, 'filenameExtensions')
 
-    # Rename the existing file node and reset the extension.
-    self.nodeMethods.renameNode(graph, self.tools, mergeFileNodeIDs[0], mergeFileNodeIDs[0] + '_1', allowNullArgument = False)
-    fileNodeIDs.append(mergeFileNodeIDs[0] + '_1')
+    # Rename the existing file node and reset the extension. Renaming the node updates the list of
+    # associated file nodes, so store the new ID first.
+    renamedFileNodeID = mergeFileNodeIDs[0] + '_1'
+    self.nodeMethods.renameNode(graph, self.tools, mergeFileNodeIDs[0], renamedFileNodeID, allowNullArgument = False)
+    fileNodeIDs.append(renamedFileNodeID)
 
     # Update the attributes for the renamed file node.
-    self.nodeMethods.setGraphNodeAttribute(graph, mergeFileNodeIDs[0] + '_1', 'allowedExtensions', [outputExtensions[0]], True)
+    self.nodeMethods.setGraphNodeAttribute(graph, renamedFileNodeID, 'allowedExtensions', [outputExtensions[0]], True)
 
     # Create the additional file nodes.
     for count in range(2, len(outputExtensions) + 1):
@@ -433,6 +586,7 @@ class configurationMethods:
       attributes.allowedExtensions   = [extension]
       fileNodeIDs.append(fileNodeID)
       graph.add_node(fileNodeID, attributes = attributes)
+      self.nodeMethods.setGraphNodeAttribute(graph, mergeNodeID, 'associatedFileNodes', fileNodeID)
 
     # Create edges from all of the file nodes to the task associated with the node being removed.
     for fileNodeID in fileNodeIDs:
@@ -565,64 +719,119 @@ class configurationMethods:
 
     return isIsolated, isolatedNodes
 
-  # Generate the task workflow from the topologically sorted pipeline graph.
+  # Generate the task workflow from the topologically sorted pipeline graph. A task outputting to
+  # the stream must be immediately followed by the task reading the stream, so each chain of tasks
+  # connected by streams is treated as a single node in the sort and expanded afterwards. The sort
+  # visits the nodes in the same order as the networkx topological sort, so if there are no streams
+  # the workflow is unchanged.
   def generateWorkflow(self, graph):
+    streamSuccessors = self.getStreamSuccessors(graph)
+
+    # Find the first task in the stream chain containing each task. Tasks not in a chain are their
+    # own representative, as are all other nodes.
+    streamPredecessors = {}
+    for task in streamSuccessors: streamPredecessors[streamSuccessors[task]] = task
+
+    representatives = {}
+    for task in streamSuccessors:
+      chain = [task]
+      while chain[-1] in streamPredecessors and chain[-1] not in representatives:
+        chain.append(streamPredecessors[chain[-1]])
+        if chain[-1] == task: break
+
+      head = representatives[chain[-1]] if chain[-1] in representatives else chain[-1]
+      for chainTask in chain: representatives[chainTask] = head
+      representatives[streamSuccessors[task]] = head
+
+    # Define the members of each chain, in stream order. The nodes linking each task to the task
+    # reading its stream (e.g. the streamed file node) are also part of the chain.
+    members = {}
+    for head in set(representatives.values()):
+      members[head] = [head]
+      task          = head
+      while task in streamSuccessors and streamSuccessors[task] != head:
+        for nodeID in graph.successors(task):
+          if streamSuccessors[task] in graph[nodeID]:
+            representatives[nodeID] = head
+            members[head].append(nodeID)
+
+        task = streamSuccessors[task]
+        members[head].append(task)
+
+    # Perform a depth first search of the graph, with each chain as a single node.
+    seen     = set()
+    explored = set()
+    order    = []
+    for nodeID in graph.nodes_iter():
+      nodeID = representatives.get(nodeID, nodeID)
+      if nodeID in explored: continue
+
+      fringe = [nodeID]
+      while fringe:
+        currentNodeID = fringe[-1]
+        if currentNodeID in explored:
+          fringe.pop()
+          continue
+        seen.add(currentNodeID)
+
+        # Check the successors of all the nodes in the chain for cycles and unexplored nodes.
+        newNodeIDs = []
+        for memberNodeID in members.get(currentNodeID, [currentNodeID]):
+          for successorNodeID in graph[memberNodeID]:
+            successorNodeID = representatives.get(successorNodeID, successorNodeID)
+            if successorNodeID == currentNodeID or successorNodeID in explored: continue
+
+            # If the graph contains a cycle, the tasks cannot be ordered.
+            if successorNodeID in seen:
+              #TODO ERROR
+              print('ERROR - config.generateWorkflow - The pipeline contains a cycle, or streaming tasks cannot be ordered.')
+              self.errors.terminate()
+            newNodeIDs.append(successorNodeID)
+
+        if newNodeIDs: fringe.extend(newNodeIDs)
+        else:
+          explored.add(currentNodeID)
+          order.append(currentNodeID)
+          fringe.pop()
+
+    # Expand the chains and keep only the tasks.
     workflow = []
-    for nodeID in nx.topological_sort(graph):
-      if self.nodeMethods.getGraphNodeAttribute(graph, nodeID, 'nodeType') == 'task': workflow.append(nodeID)
+    for nodeID in reversed(order):
+      for memberNodeID in members.get(nodeID, [nodeID]):
+        if self.nodeMethods.getGraphNodeAttribute(graph, memberNodeID, 'nodeType') == 'task': workflow.append(memberNodeID)
 
     return workflow
 
-  # The topological sort does not always generate the corret order. In this routine, check for
-  # cases where a task is outputting to the stream. It is possible that after this task, the
-  # topological sort could choose from multiple tasks to perform next. This routine exists to
-  # ensure that the task following is the one that expects the stream as its input.
-  def correctWorkflowForStreams(self, graph, workflow):
-    incomplete = True
-    startCount = 0
-    while incomplete:
-      for counter in range(startCount, len(workflow)):
-        task = workflow[counter]
-        if counter == len(workflow) - 1: incomplete = False
-        else:
-          nextTask         = workflow[counter + 1]
-          isOutputToStream = self.nodeMethods.getGraphNodeAttribute(graph, task, 'outputStream')
-  
-          # If this task outputs to the stream, determine what the next task should be.
-          if isOutputToStream:
-            for outputNodeID in graph.successors(task):
-              successorTasks  = []
-              for successorTask in graph.successors(outputNodeID): successorTasks.append(successorTask)
-  
-            # If the next task is not in the list of tasks, modify the workflow to ensure that it is.
-            successorIndex = workflow.index(successorTasks[0])
-            if nextTask not in successorTasks:
-
-              # Store the tasks 
-              workflowMiddle = []
-              workflowMiddle = workflow[counter + 1: successorIndex]
-
-              # Find all the tasks after the successor task. Once tasks have been moved around, these
-              # tasks will all be added to the end.
-              workflowEnd = []
-              workflowEnd = workflow[successorIndex + 1:]
-  
-              # Reconstruct the workflow.
-              updatedWorkflow = []
-              for updateCount in range(0, counter + 1): updatedWorkflow.append(workflow[updateCount])
-              updatedWorkflow.append(successorTasks[0])
-              for updateTask in workflowMiddle: updatedWorkflow.append(updateTask)
-              for updateTask in workflowEnd: updatedWorkflow.append(updateTask)
- 
-              # Update the workflow.
-              workflow = updatedWorkflow
+  # Determine the task that reads the stream output by each task outputting to the stream.
+  def getStreamSuccessors(self, graph):
+    streamSuccessors = {}
+    for task in graph.nodes_iter():
+      if self.nodeMethods.getGraphNodeAttribute(graph, task, 'nodeType') != 'task': continue
+      if self.nodeMethods.getGraphNodeAttribute(graph, task, 'outputStream'):
 
-              # Reset the startCount. There is no need to loop over the entire workflow on the next
-              # pass.
-              startCount = counter
-              break
+        # The stream is read by the first task using the (last) output of the task.
+        successorTasks = []
+        for outputNodeID in graph.successors(task): successorTasks = graph.successors(outputNodeID)
+        if successorTasks: streamSuccessors[task] = successorTasks[0]
 
-    return workflow
+    return streamSuccessors
+
+  # Ensure that each task outputting to the stream is immediately followed by the task reading the
+  # stream. The workflow produced by generateWorkflow is already in the correct order, but a workflow
+  # generated elsewhere may not be. Each task is followed directly by the chain of tasks reading its
+  # streams, and tasks already included are skipped when they are reached.
+  def correctWorkflowForStreams(self, graph, workflow):
+    streamSuccessors = self.getStreamSuccessors(graph)
+    updatedWorkflow  = []
+    includedTasks    = set()
+    for task in workflow:
+      while task not in includedTasks:
+        updatedWorkflow.append(task)
+        includedTasks.add(task)
+        if task not in streamSuccessors: break
+        task = streamSuccessors[task]
+
+    return updatedWorkflow
 
   # Process any 'additional nodes' for this pipeline.
   def processAdditionalNodes(self, graph):
@@ -658,6 +867,7 @@ class configurationMethods:
             attributes.allowMultipleValues = self.nodeMethods.getGraphNodeAttribute(graph, nodeID, 'allowMultipleValues')
             attributes.allowedExtensions   = self.nodeMethods.getGraphNodeAttribute(graph, nodeID, 'allowedExtensions')
             graph.add_node(fileNodeID, attributes = attributes)
+            self.nodeMethods.setGraphNodeAttribute(graph, nodeID, 'associatedFileNodes', fileNodeID)
 
         # Loop over all the task/argument pairs and add edges to the new node.
         for task in self.pipeline.additionalNodes[configNodeID]:
@@ -772,10 +982,10 @@ class configurationMethods:
   # Check that all required files and values have been set. All files and parameters that are listed as
   # required by the individual tools should already have been checked, but if the pipeline has some
   # additional requirements, these may not yet have been checked.
-  def checkRequiredFiles(self, graph, gknoConfig):
+  def checkRequiredFiles(self, graph, gknoConfig, tasks = None):
 
-    # Loop over all of the tasks in the pipeline.
-    for task in self.pipeline.workflow:
+    # Loop over all of the tasks in the pipeline (or only the supplied tasks).
+    for task in self.pipeline.workflow if tasks == None else tasks:
 
       # Loop over all predecessor file nodes.
       for fileNodeID in self.nodeMethods.getPredecessorFileNodes(graph, task):
@@ -838,9 +1048,19 @@ class configurationMethods:
 
   # Determine all of the graph dependencies.  This is essentially
   def getGraphDependencies(self, graph, taskList, key):
-    dependencies = []
+    return list(self.iterGraphDependencies(graph, taskList, key))
+
+  # Generate the graph dependencies as (file node ID, filename) pairs, one at a time, so that the
+  # dependencies can be written out without storing them all. If isUnique is set, the files for a
+  # node used by multiple tasks are only generated once. Only the IDs of the nodes already seen are
+  # stored, not the filenames.
+  def iterGraphDependencies(self, graph, taskList, key, isUnique = False):
+    seenNodes = {}
     for task in taskList:
       for fileNodeID in self.nodeMethods.getPredecessorFileNodes(graph, task):
+        if isUnique:
+          if fileNodeID in seenNodes: continue
+          seenNodes[fileNodeID] = True
 
         # If the node refers to a directory, do not include it.
         optionNodeID = self.nodeMethods.getOptionNodeIDFromFileNodeID(fileNodeID)
@@ -856,16 +1076,16 @@ class configurationMethods:
           values = self.nodeMethods.getGraphNodeAttribute(graph, fileNodeID, 'values')
           if values:
             if key == 'all':
-              for iteration in values.keys():
-                for value in values[iteration]: dependencies.append((fileNodeID, value))
+              for iteration in values:
+                for value in values.getValues(iteration): yield (fileNodeID, value)
   
             # Just get values for a particular key.
             elif key in values:
-              for value in values[key]: dependencies.append((fileNodeID, value))
+              for value in values.getValues(key): yield (fileNodeID, value)
   
             # TODO CHECK
             elif key not in values and key != 1:
-               for value in values[1]: dependencies.append((fileNodeID, value))
+               for value in values.getValues(1): yield (fileNodeID, value)
   
             # If the key is unknown, fail.
             #TODO Errors.
@@ -874,48 +1094,51 @@ class configurationMethods:
               print(values)
               self.errors.terminate()
 
-    return dependencies
-
   # Determine all of the outputs.  This is essentially all file nodes with no predecessors.
   def getGraphOutputs(self, graph, taskList, deleteList, key):
+    return list(self.iterGraphOutputs(graph, taskList, deleteList, key))
+
+  # Generate the outputs as (option node ID, filename) pairs, one at a time. If isUnique is set, the
+  # files for each node are only generated once (see iterGraphDependencies).
+  def iterGraphOutputs(self, graph, taskList, deleteList, key, isUnique = False):
 
     # Collect all the files that are deleted in this phase.
-    filesDeleted = []
+    filesDeleted = set()
     for task in deleteList:
-      for iteration in deleteList[task]:
-        for filename in deleteList[task][iteration]: filesDeleted.append(filename)
+      for iteration in deleteList[task]: filesDeleted.update(deleteList[task][iteration])
 
-    outputs     = []
+    seenNodes = {}
     for task in taskList:
       for fileNodeID in self.nodeMethods.getSuccessorFileNodes(graph, task):
+        if isUnique:
+          if fileNodeID in seenNodes: continue
+          seenNodes[fileNodeID] = True
+
         optionNodeID = self.nodeMethods.getOptionNodeIDFromFileNodeID(fileNodeID)
         deleteFiles  = self.nodeMethods.getGraphNodeAttribute(graph, optionNodeID, 'deleteFiles')
         isStreaming  = self.nodeMethods.getGraphNodeAttribute(graph, fileNodeID, 'isStreaming')
         isTemporary  = self.nodeMethods.getGraphNodeAttribute(graph, optionNodeID, 'isTemporary')
         values       = self.nodeMethods.getGraphNodeAttribute(graph, fileNodeID, 'values')
 
-        # Get the tasks associated with this option node.
-        tasks = graph.successors(optionNodeID)
-
         # By default, all files produced by the pipeline are kept and so should be listed as
         # outputs. However, some files are listed as to be deleted, so do not include these as
         # outputs.
         #if not deleteFiles and not isStreaming and not isTemporary:
         if not isStreaming and not isTemporary:
           if key == 'all':
-            for iteration in values.keys():
-              for value in values[iteration]:
-                if value not in filesDeleted: outputs.append((optionNodeID, value))
+            for iteration in values:
+              for value in values.getValues(iteration):
+                if value not in filesDeleted: yield (optionNodeID, value)
   
           # Just get values for a particular key.
           elif key in values:
-            for value in values[key]:
-              if value not in filesDeleted: outputs.append((optionNodeID, value))
+            for value in values.getValues(key):
+              if value not in filesDeleted: yield (optionNodeID, value)
   
           #TODO CHECK
           elif key not in values and key != 1:
-            for value in values[1]:
-              if value not in filesDeleted: outputs.append((optionNodeID, value))
+            for value in values.getValues(1):
+              if value not in filesDeleted: yield (optionNodeID, value)
 
           # If the key is unknown, fail.
           #TODO Errors.
@@ -923,13 +1146,19 @@ class configurationMethods:
             print('UNKNOWN KEY: configurationClass.getGraphOutputs', key)
             self.errors.terminate()
 
-    return outputs
-
   # Determine all of the intermediate files in the graph.  This is all of the file nodes that have both
   # predecessor and successor nodes.
   def getGraphIntermediateFiles(self, graph, taskList):
     intermediates = {}
-    seenNodes     = {}
+    for iteration, optionNodeID, value in self.iterGraphIntermediateFiles(graph, taskList):
+      if iteration not in intermediates: intermediates[iteration] = []
+      intermediates[iteration].append((optionNodeID, value))
+
+    return intermediates
+
+  # Generate the intermediate files as (iteration, option node ID, filename) tuples, one at a time.
+  def iterGraphIntermediateFiles(self, graph, taskList):
+    seenNodes = {}
     for task in taskList:
       for fileNodeID in self.nodeMethods.getPredecessorFileNodes(graph, task):
 
@@ -954,23 +1183,16 @@ class configurationMethods:
               # Do not include streaming nodes.
               if not self.edgeMethods.getEdgeAttribute(graph, fileNodeID, task, 'isStreaming'):
                 for iteration in values.keys():
-                  if iteration not in intermediates: intermediates[iteration] = []
-                  for value in values[iteration]: intermediates[iteration].append((optionNodeID, value))
-      
-    return intermediates
+                  for value in values.getValues(iteration): yield (iteration, optionNodeID, value)
 
   # Deterrmine when each intermediate file is last used,
   def setWhenToDeleteFiles(self, graph, intermediates):
+    lastConsumers = self.getLastConsumers(graph, intermediates)
+
     deleteList = {}
     for counter in intermediates:
       for nodeID, filename in intermediates[counter]:
-  
-        # Find the successor task nodes.
-        successorNodeIDs = graph.successors(nodeID)
-  
-        # Determine which of these tasks comes last in the workflow.
-        for task in reversed(self.pipeline.workflow):
-          if task in successorNodeIDs: break
+        task = lastConsumers[nodeID]
   
         # Store the task when the file can be deleted.
         if filename in deleteList:
@@ -984,8 +1206,31 @@ class configurationMethods:
 
     return deleteList
 
+  # Determine the task that comes last in the workflow out of all the tasks that use each of the nodes
+  # in the list of intermediate files. If none of the tasks using a node is in the workflow, the first
+  # task in the workflow is used.
+  def getLastConsumers(self, graph, intermediates):
+    workflow = self.pipeline.workflow
+    position = dict((task, counter) for counter, task in enumerate(workflow))
+
+    lastConsumers = {}
+    for counter in intermediates:
+      for nodeID, filename in intermediates[counter]:
+        if nodeID in lastConsumers: continue
+
+        lastPosition = 0
+        for task in graph.successors(nodeID):
+          if task in position and position[task] > lastPosition: lastPosition = position[task]
+        lastConsumers[nodeID] = workflow[lastPosition]
+
+    return lastConsumers
+
   # Get all of the outputs from a task.
   def getTaskOutputs(self, graph, task, iteration):
+    if self.isIncremental:
+      cacheKey = ('outputs', iteration)
+      if cacheKey in self.taskFileCache.get(task, {}): return list(self.taskFileCache[task][cacheKey])
+
     outputIDs = []
     for fileNodeID in self.nodeMethods.getSuccessorFileNodes(graph, task):
 
@@ -999,24 +1244,26 @@ class configurationMethods:
       #if not isStreaming and not isDirectory:
         values = self.nodeMethods.getGraphNodeAttribute(graph, fileNodeID, 'values')
         if iteration == 'all':
-          for counter in values:
-            for value in values[counter]: outputIDs.append(value)
+          outputIDs.extend(values.getAllValues())
   
-        elif iteration in values:
-          for value in values[iteration]: outputIDs.append(value)
-  
-        elif iteration != 1:
-          for value in values[1]: outputIDs.append(value)
+        elif iteration in values: outputIDs.extend(values.getValues(iteration))
+        elif iteration != 1: outputIDs.extend(values.getValues(1))
   
         else:
           #TODO ERROR
           print('Unknown iteration in getTaskOutputs.')
           self.errors.terminate()
 
+    if self.isIncremental: self.storeTaskFiles(task, cacheKey, outputIDs)
+
     return outputIDs
 
   # Get all of the dependencies for a task.
   def getTaskDependencies(self, graph, task, isGreedy, iteration):
+    if self.isIncremental:
+      cacheKey = ('dependencies', isGreedy, iteration)
+      if cacheKey in self.taskFileCache.get(task, {}): return list(self.taskFileCache[task][cacheKey])
+
     dependencies = []
     for fileNodeID in self.nodeMethods.getPredecessorFileNodes(graph, task):
 
@@ -1035,25 +1282,142 @@ class configurationMethods:
   
           # Get the dependencies.
           if iteration == 'all':
-            for counter in values:
-              for value in values[counter]: dependencies.append(value)
+            dependencies.extend(values.getAllValues())
     
-          elif iteration in values:
-            for value in values[iteration]: dependencies.append(value)
-    
-          elif iteration != 1:
-            for value in values[1]: dependencies.append(value)
+          elif iteration in values: dependencies.extend(values.getValues(iteration))
+          elif iteration != 1: dependencies.extend(values.getValues(1))
     
           else:
             #TODO ERROR
             print('Unknown iteration in getTaskDependencies.')
             self.errors.terminate()
 
+    if self.isIncremental: self.storeTaskFiles(task, cacheKey, dependencies)
+
     return dependencies
 
-  # For each task, determine the maximum number of datasets associated with any option.
-  def getNumberOfDataSets(self, graph):
+  # Get the dependencies and outputs for every iteration of a task in a single pass over the file nodes
+  # of the task. The dependencies and outputs are returned as dictionaries, keyed by the iteration, and
+  # are the same as those returned by getTaskDependencies and getTaskOutputs for each iteration. If no
+  # iterations are supplied, all of the data sets of the task are included.
+  def getTaskFileMatrix(self, graph, task, iterations = None):
+    isGreedy = self.nodeMethods.getGraphNodeAttribute(graph, task, 'isGreedy')
+    if iterations == None:
+      numberOfDataSets = self.nodeMethods.getGraphNodeAttribute(graph, task, 'numberOfDataSets')
+      iterations       = range(1, max(numberOfDataSets, 1) + 1)
+
+    dependencies = dict((iteration, []) for iteration in iterations)
+    for fileNodeID in self.nodeMethods.getPredecessorFileNodes(graph, task):
+      if not self.nodeMethods.getGraphNodeAttribute(graph, fileNodeID, 'isStreaming'):
+        values = self.nodeMethods.getGraphNodeAttribute(graph, fileNodeID, 'values')
+        if values:
+
+          # If the task is greedy, every iteration depends on all of the values.
+          if isGreedy:
+            allValues = values.getAllValues()
+            for iteration in dependencies: dependencies[iteration].extend(allValues)
+          else: self.addIterationValues(dependencies, values, 'getTaskDependencies')
+
+    outputs = dict((iteration, []) for iteration in iterations)
+    for fileNodeID in self.nodeMethods.getSuccessorFileNodes(graph, task):
+      optionNodeID = self.nodeMethods.getOptionNodeIDFromFileNodeID(fileNodeID)
+      isStreaming  = self.nodeMethods.getGraphNodeAttribute(graph, fileNodeID, 'isStreaming')
+      isTemporary  = self.nodeMethods.getGraphNodeAttribute(graph, optionNodeID, 'isTemporary')
+      if not isStreaming and not isTemporary:
+        self.addIterationValues(outputs, self.nodeMethods.getGraphNodeAttribute(graph, fileNodeID, 'values'), 'getTaskOutputs')
+
+    return dependencies, outputs
+
+  # Add the values of a node to the files for each iteration. If the node has no values for an iteration
+  # other than the first, the values of the first iteration are used.
+  def addIterationValues(self, files, values, method):
+    for iteration in files:
+      if iteration in values: files[iteration].extend(values.getValues(iteration))
+      elif iteration != 1: files[iteration].extend(values.getValues(1))
+      else:
+        #TODO ERROR
+        print('Unknown iteration in ' + method + '.')
+        self.errors.terminate()
+
+  # Get the dependencies and outputs for every iteration of every task in the workflow. A dictionary,
+  # keyed by the task, of (dependencies, outputs) is returned (see getTaskFileMatrix).
+  def getWorkflowFileMatrix(self, graph):
+    matrix = {}
+    for task in self.pipeline.workflow: matrix[task] = self.getTaskFileMatrix(graph, task)
+
+    return matrix
+
+  # Store the dependencies or outputs determined for a task, so that they are not determined again
+  # unless the values of a node used by the task are modified.
+  def storeTaskFiles(self, task, cacheKey, files):
+    if task not in self.taskFileCache: self.taskFileCache[task] = {}
+    self.taskFileCache[task][cacheKey] = list(files)
+
+  # Update the graph incrementally when node values change. The tasks using each option and file node
+  # are recorded, so that when the values of nodes are modified (e.g. by attaching the values from a
+  # different parameter set), the number of data sets, dependencies and outputs only need to be
+  # determined again for the tasks using the modified nodes (see updateModifiedValues). This should
+  # be called once the graph is complete and the number of data sets has been determined.
+  #
+  # Only pipeline graphs record which nodes have modified values, so incremental mode can only be used
+  # with a pipeline graph. For any other graph, the mode is not set (so nothing is cached) and False is
+  # returned.
+  def setIncrementalMode(self, graph):
+    self.isIncremental   = isinstance(graph, pipelineGraph)
+    self.valueDependents = {}
+    self.taskFileCache   = {}
+    if not self.isIncremental: return False
+
     for task in self.pipeline.workflow:
+      nodeIDs  = self.nodeMethods.getPredecessorOptionNodes(graph, task)
+      nodeIDs += self.nodeMethods.getPredecessorFileNodes(graph, task)
+      nodeIDs += self.nodeMethods.getSuccessorFileNodes(graph, task)
+      for nodeID in nodeIDs:
+        if nodeID not in self.valueDependents: self.valueDependents[nodeID] = {}
+        self.valueDependents[nodeID][task] = True
+
+    # Values set before this point have already been accounted for.
+    graph.popModifiedValueNodes()
+
+    return True
+
+  # Get the tasks whose information depends on the values of a node. Nodes added to the graph after the
+  # incremental mode was set (e.g. new nodes for tool parameter set arguments) are added to the record.
+  def getValueDependents(self, graph, nodeID):
+    if nodeID not in self.valueDependents:
+      if nodeID not in graph: return []
+      self.valueDependents[nodeID] = {}
+      for task in graph.successors(nodeID) + graph.predecessors(nodeID):
+        if self.nodeMethods.getGraphNodeAttribute(graph, task, 'nodeType') == 'task': self.valueDependents[nodeID][task] = True
+
+    return self.valueDependents[nodeID].keys()
+
+  # Update the information derived from the values of the modified nodes. If no nodes are supplied, the
+  # nodes recorded as modified by the graph are used. Graphs other than pipeline graphs do not record
+  # the modified nodes, so in this case every task is updated. The number of data sets is determined
+  # again for each affected task and the stored dependencies and outputs are discarded. The affected
+  # tasks are returned in workflow order, so that other checks (e.g. checkRequiredFiles) can be limited
+  # to these tasks.
+  def updateModifiedValues(self, graph, nodeIDs = None):
+    if nodeIDs == None and not isinstance(graph, pipelineGraph): tasks = list(self.pipeline.workflow)
+    else:
+      if nodeIDs == None: nodeIDs = graph.popModifiedValueNodes()
+      affectedTasks = {}
+      for nodeID in nodeIDs:
+        for task in self.getValueDependents(graph, nodeID): affectedTasks[task] = True
+
+      tasks = [task for task in self.pipeline.workflow if task in affectedTasks]
+
+    for task in tasks:
+      if task in self.taskFileCache: del self.taskFileCache[task]
+    self.getNumberOfDataSets(graph, tasks)
+
+    return tasks
+
+  # For each task, determine the maximum number of datasets associated with any option. If a list of
+  # tasks is supplied, only these tasks are checked.
+  def getNumberOfDataSets(self, graph, tasks = None):
+    for task in self.pipeline.workflow if tasks == None else tasks:
       totalNumber                  = 0
       isGreedy                     = False
       hasMultipleInputFiles        = False
@@ -1085,6 +1449,163 @@ class configurationMethods:
         self.nodeMethods.setGraphNodeAttribute(graph, task, 'numberOfDataSets', 1)
       else: self.nodeMethods.setGraphNodeAttribute(graph, task, 'numberOfDataSets', totalNumber)
 
+  # Build a plan for executing the pipeline in parallel. Tasks connected by streams must run together,
+  # so are combined into stream groups (as identified by identifyStreamingNodes). Each group is a
+  # unit in the plan and runs once for each data set (as set by getNumberOfDataSets). The plan is a
+  # dictionary containing:
+  #
+  #   groups:       a list of the stream groups, each a list of tasks in workflow order.
+  #   dependencies: the indexes of the groups that each group depends on.
+  #   levels:       a list of levels, each a list of group indexes. Groups in the same level do not
+  #                 depend on each other and can run concurrently once all previous levels are complete.
+  #   criticalPath: the tasks in the longest chain of dependent groups, using taskCosts (a dictionary of
+  #                 costs for each task, with a default of one) to weight each task.
+  #   jobs:         a list of (group index, iteration, [(group index, iteration), ...]) tuples, giving
+  #                 each job to run and the jobs that it depends on.
+  def getExecutionPlan(self, graph, taskCosts = None):
+    if taskCosts == None: taskCosts = {}
+    workflow = self.pipeline.workflow
+    position = dict((task, counter) for counter, task in enumerate(workflow))
+
+    # Find the tasks that each task depends on.
+    predecessorTasks = dict((task, []) for task in workflow)
+    for task in workflow:
+      for fileNodeID in self.nodeMethods.getSuccessorFileNodes(graph, task):
+        isStreaming = self.nodeMethods.getGraphNodeAttribute(graph, fileNodeID, 'isStreaming')
+        for successorTask in self.nodeMethods.getSuccessorTaskNodes(graph, fileNodeID):
+          if successorTask in position: predecessorTasks[successorTask].append((task, isStreaming))
+
+    # Combine tasks connected by streaming file nodes into groups. Since the workflow is in order, a
+    # task reading a stream is added to the group of the task producing it.
+    groups     = []
+    groupIndex = {}
+    for task in workflow:
+      for predecessorTask, isStreaming in predecessorTasks[task]:
+        if isStreaming:
+          groupIndex[task] = groupIndex[predecessorTask]
+          groups[groupIndex[task]].append(task)
+          break
+
+      if task not in groupIndex:
+        groupIndex[task] = len(groups)
+        groups.append([task])
+
+    # Determine the dependencies between the groups.
+    dependencies = [[] for group in groups]
+    for task in workflow:
+      for predecessorTask, isStreaming in predecessorTasks[task]:
+        if groupIndex[predecessorTask] != groupIndex[task] and groupIndex[predecessorTask] not in dependencies[groupIndex[task]]:
+          dependencies[groupIndex[task]].append(groupIndex[predecessorTask])
+
+    # Assign each group to a level one greater than the highest level of the groups it depends on, and
+    # find the most costly chain of groups ending with each group. Groups are in workflow order, so all
+    # the groups a group depends on have already been processed.
+    groupLevels = []
+    pathCosts   = []
+    pathParents = []
+    for index, group in enumerate(groups):
+      level  = 0
+      cost   = 0
+      parent = None
+      for dependency in dependencies[index]:
+        level = max(level, groupLevels[dependency] + 1)
+        if pathCosts[dependency] > cost: cost, parent = pathCosts[dependency], dependency
+
+      groupLevels.append(level)
+      pathCosts.append(cost + sum([taskCosts.get(task, 1) for task in group]))
+      pathParents.append(parent)
+
+    levels = [[] for level in range(max(groupLevels) + 1)] if groups else []
+    for index, level in enumerate(groupLevels): levels[level].append(index)
+
+    # Trace the critical path back from the group with the most costly chain.
+    criticalPath = []
+    index        = pathCosts.index(max(pathCosts)) if groups else None
+    while index != None:
+      criticalPath = groups[index] + criticalPath
+      index        = pathParents[index]
+
+    # Determine the number of iterations of each group and whether the group is greedy (i.e. uses all
+    # iterations of its inputs).
+    iterations = []
+    isGreedy   = []
+    for group in groups:
+      iterations.append(max([max(self.nodeMethods.getGraphNodeAttribute(graph, task, 'numberOfDataSets'), 1) for task in group]))
+      isGreedy.append(True in [bool(self.nodeMethods.getGraphNodeAttribute(graph, task, 'isGreedy')) for task in group])
+
+    # Fan each group out into a job per iteration. An iteration depends on the same iteration of the
+    # groups it depends on, unless either the group is greedy or the number of iterations differs, in
+    # which case it depends on all their iterations. Groups with a single iteration only have one job
+    # for later groups to depend on.
+    jobs = []
+    for index in range(len(groups)):
+      for iteration in range(1, iterations[index] + 1):
+        jobDependencies = []
+        for dependency in dependencies[index]:
+          if iterations[dependency] == 1: jobDependencies.append((dependency, 1))
+          elif not isGreedy[index] and iterations[dependency] == iterations[index]: jobDependencies.append((dependency, iteration))
+          else:
+            for dependencyIteration in range(1, iterations[dependency] + 1): jobDependencies.append((dependency, dependencyIteration))
+
+        jobs.append((index, iteration, jobDependencies))
+
+    plan                 = {}
+    plan['groups']       = groups
+    plan['dependencies'] = dependencies
+    plan['levels']       = levels
+    plan['criticalPath'] = criticalPath
+    plan['jobs']         = jobs
+
+    return plan
+
+  # Write the parallel execution plan to a json file.
+  def writeExecutionPlan(self, graph, filename, taskCosts = None):
+    with open(filename, 'w') as planFile: json.dump(self.getExecutionPlan(graph, taskCosts), planFile, indent = 2)
+
+  # Split a command to be evaluated into segments. The segments alternate between text from the
+  # command and the IDs to be replaced by values, starting with text (which may be empty). Where IDs
+  # overlap, the longest ID is used.
+  def parseEvaluateCommand(self, command, IDs):
+    IDs = sorted([str(ID) for ID in IDs], key = len, reverse = True)
+    if not IDs: return [command]
+
+    return re.split('(' + '|'.join([re.escape(ID) for ID in IDs]) + ')', command)
+
+  # Build the commands to evaluate for every data set. Each ID in the command is replaced by the value
+  # of the node supplying it. Nodes have either a single data set, in which case the value is used for
+  # every data set, or a data set for each command, and each data set must contain a single value.
+  def buildEvaluateCommands(self, command, commandValues, numberOfDataSets):
+
+    # Check that all of the values have the same number of data sets, and get the values for each.
+    columns = {}
+    for ID in commandValues:
+      values = commandValues[ID]
+      if len(values) == 0 or (len(values) != 1 and len(values) != numberOfDataSets):
+        #TODO ERROR
+        print('configurationClass.evaluateCommands - number of values')
+        self.errors.terminate()
+
+      # Check that each data set contains a single value.
+      iterations = [1] if len(values) == 1 else range(1, numberOfDataSets + 1)
+      for iteration in iterations:
+        if iteration not in values or values.getNumberOfValues(iteration) != 1:
+          #TODO ERROR
+          print('configurationClass.evaluateCommands - number of values')
+          self.errors.terminate()
+
+      if len(values) == 1: columns[str(ID)] = [str(values.getValues(1)[0])] * numberOfDataSets
+      else: columns[str(ID)] = [str(values.getValues(iteration)[0]) for iteration in iterations]
+
+    # Build the commands for all data sets, with the text segments of the command the same for every
+    # data set.
+    segments = self.parseEvaluateCommand(str(command), commandValues.keys())
+    segments = [columns[segment] if counter % 2 else [segment] * numberOfDataSets for counter, segment in enumerate(segments)]
+
+    commands = {}
+    for count, parts in enumerate(zip(*segments)): commands[count + 1] = ['$(' + ''.join(parts) + ')']
+
+    return commands
+
   # Set commands to evaluate at run time.
   def evaluateCommands(self, graph):
 
@@ -1121,36 +1642,9 @@ class configurationMethods:
             numberOfDataSets  = len(commandValues[ID]) if len(commandValues[ID]) > numberOfDataSets else numberOfDataSets
             linkedNodeIDs.append(linkedNodeID)
 
-          # Check that all of the values have the same number of data sets.
-          for ID in commandValues: 
-            if len(commandValues[ID]) == 0:
-              #TODO ERROR
-              print('configurationClass.evaluateCommands - number of values')
-              self.errors.terminate()
-
-            if len(commandValues[ID]) != 1 and len(commandValues[ID]) != numberOfDataSets:
-              #TODO ERROR
-              print('configurationClass.evaluateCommands - number of values')
-              self.errors.terminate()
-
           # Build the command for each data set.
-          commands = {}
-          for count in range(1, numberOfDataSets + 1):
-            commands[count] = self.pipeline.evaluateCommands[task][longFormArgument].command
-            for ID in commandValues:
-              if len(commandValues[ID]) == 1:
-                if len(commandValues[ID][1]) != 1:
-                  #TODO ERROR                               
-                  print('configurationClass.evaluateCommands - number of values')
-                  self.errors.terminate() 
-                commands[count] = [str('$(') + str(commands[count].replace(str(ID), str(commandValues[ID][1][0]))) + str(')')]
-
-              else:
-                if len(commandValues[ID][count]) != 1:
-                  #TODO ERROR                               
-                  print('configurationClass.evaluateCommands - number of values')
-                  self.errors.terminate() 
-                commands[count] = [str('$(') + str(commands[count].replace(ID, value)) + str(')') for value in commandValues[ID][count]]
+          command  = self.pipeline.evaluateCommands[task][longFormArgument].command
+          commands = self.buildEvaluateCommands(command, commandValues, numberOfDataSets)
 
           self.nodeMethods.setGraphNodeAttribute(graph, nodeID, 'isCommandToEvaluate', True)
           self.nodeMethods.setGraphNodeAttribute(graph, nodeID, 'values', commands)
@@ -19,8 +19,14 @@ class configurationClassErrors:
     # Store if in debugging mode.
     self.isDebug = False
 
-  # Format the error message and write to screen.
+    # If an error collector is set, errors are recorded in the collector rather than written to the
+    # screen, and a configurationError is raised instead of terminating.
+    self.collector = None
+
+  # Format the error message and write to screen. If errors are being collected, the text is formatted
+  # when the errors are reported.
   def writeFormattedText(self):
+      if self.collector: return
       firstLine = True
       secondLine = False
       maxLength = 93 - 5
@@ -1591,6 +1597,15 @@ class configurationClassErrors:
   ##############################
 
   def terminate(self):
+
+    # If errors are being collected, record the error and stop processing the current configuration
+    # file. The error code is the name of the error method (or the method that called terminate).
+    if self.collector:
+      frame     = currentframe().f_back
+      error     = self.collector.addError(frame.f_code.co_name, frame.f_locals, self.text)
+      self.text = []
+      raise error
+
     print(file=sys.stderr)
     print('================================================================================================', file=sys.stderr)
     print('  TERMINATED: Errors in configurationClass.  See specific error messages above for resolution.', file=sys.stderr)
@@ -1606,3 +1621,80 @@ class configurationClassErrors:
 
     # Terminate.
     exit(2)
+
+# Define an error found when validating configuration files while collecting errors. The text of the
+# error is only formatted into a message when required.
+class configurationError(Exception):
+  def __init__(self, code, filename, tool, argument, text):
+    Exception.__init__(self, code)
+    self.argument = argument
+    self.code     = code
+    self.filename = filename
+    self.text     = text
+    self.tool     = tool
+
+  # Get the error message.
+  def getMessage(self):
+    return ' '.join([line.strip() for line in self.text])
+
+  def __str__(self):
+    return self.getMessage() if self.text else self.code
+
+# Collect the errors found when validating configuration files, so that all of the problems with a set
+# of configuration files can be reported together, rather than terminating on the first error.
+class configurationErrorCollector:
+  def __init__(self):
+    self.errors = []
+
+    # Store the configuration file (and the tool or pipeline it describes) currently being processed.
+    self.filename = None
+    self.tool     = None
+
+  # Set the configuration file being processed.
+  def setContext(self, filename, tool = None):
+    self.filename = filename
+    self.tool     = tool
+
+  # Record an error. The tool and argument are taken from the variables of the method that found the
+  # error, if available.
+  def addError(self, code, variables, text):
+    tool     = variables.get('tool', variables.get('pipeline', self.tool))
+    argument = None
+    for name in ['longFormArgument', 'argument', 'shortFormArgument']:
+      if name in variables:
+        argument = variables[name]
+        break
+
+    error = configurationError(code, self.filename, tool, argument, list(text))
+    self.errors.append(error)
+
+    return error
+
+  # Return true if any errors have been recorded.
+  def hasErrors(self):
+    return len(self.errors) > 0
+
+  # Get the errors as a list of dictionaries (e.g. for writing as json).
+  def getErrorData(self):
+    errorData = []
+    for error in self.errors:
+      errorData.append({'code': error.code, 'file': error.filename, 'tool': error.tool, 'argument': error.argument, 'message': error.getMessage()})
+
+    return errorData
+
+  # Get a single line describing each error.
+  def formatErrors(self):
+    lines = []
+    for error in self.errors:
+      location = ', '.join([str(value) for value in [error.filename, error.tool, error.argument] if value != None])
+      lines.append(error.code + (' (' + location + ')' if location else '') + ': ' + error.getMessage())
+
+    return lines
+
+  # Write all of the errors to the screen, using the same format as terminating errors.
+  def writeErrors(self):
+    errors = configurationClassErrors()
+    for error in self.errors:
+      errors.text = list(error.text) if error.text else [error.code]
+      if error.filename: errors.text.append('Configuration file: ' + error.filename)
+      errors.writeFormattedText()
@@ -2,48 +2,98 @@
 
 from __future__ import print_function
 import networkx as nx
-from copy import deepcopy
+from copy import copy, deepcopy
 
 import configurationClassErrors
 from configurationClassErrors import *
 
+import pipelineGraph
+from pipelineGraph import *
+
 import json
 import os
 import sys
 
-class edgeAttributes:
-  def __init__(self):
-    self.isFilenameStub = False
-    self.isGreedy       = False
-    self.isInput        = False
-    self.isRequired     = False
-    self.modifyArgument = None
-
-    # Define the arguments associated with the edge.
-    self.longFormArgument  = None
-    self.shortFormArgument = None
-
-    # Record how to handle streaming files.
-    self.isStreaming      = False
-    self.ifInputIsStream  = False
-    self.ifOutputIsStream = False
- 
-    # Record the value to include on the command line (and whether it should be included
-    # in the first place).
-    self.includeOnCommandLine = True
-    self.commandLineArgument  = None
-
-    # It is permissible in some cases to link the output of a tool producing a json file
-    # to another task which will read the json at execution time. In this case, there is
-    # no argument to set, but the following flag will be set.
-    self.readJson = False
-
-    # If a command uses the values from a different task in evaluating a command.
-    self.evaluateCommand = False
-
-    # If this was an edge added using the 'originating edges' field in the configuration
-    # file, store this information.
-    self.isOriginatingEdge = False
+# The node and edge attributes classes store their attributes in slots and share the default values
+# of any attributes that have not been set. The following functions are used to define these classes.
+#
+# Return the shared default value of an attribute that has not been set on the object.
+def getDefaultAttribute(attributes, attribute):
+  try: return type(attributes).defaults[attribute]
+  except KeyError: raise AttributeError("'%s' object has no attribute '%s'" % (type(attributes).__name__, attribute))
+
+# Return the attributes that have been set, so that the object can be pickled (or copied). Objects
+# with slots, but no __getstate__ method, cannot be pickled with protocols 0 or 1.
+def getAttributeState(attributes):
+  state = {}
+  for attribute in type(attributes).__slots__:
+    try: state[attribute] = object.__getattribute__(attributes, attribute)
+    except AttributeError: pass
+
+  return state
+
+# Set the attributes from a pickled state.
+def setAttributeState(attributes, state):
+  for attribute in state: setattr(attributes, attribute, state[attribute])
+
+# Return a copy of the object. Only the attributes that have been set are copied, and this avoids the
+# pickling methods used by the copy module.
+def copyAttributes(attributes):
+  duplicate = object.__new__(type(attributes))
+  for attribute in type(attributes).__slots__:
+    try: setattr(duplicate, attribute, object.__getattribute__(attributes, attribute))
+    except AttributeError: pass
+
+  return duplicate
+
+class edgeAttributes(object):
+
+  # An attributes object is attached to every edge in the graph, so the attributes are stored in
+  # slots rather than a per-instance dictionary. Only the attributes listed here can be set.
+  __slots__ = ('commandLineArgument', 'evaluateCommand', 'ifInputIsStream', 'ifOutputIsStream',
+               'includeOnCommandLine', 'isFilenameStub', 'isGreedy', 'isInput', 'isOriginatingEdge',
+               'isRequired', 'isStreaming', 'longFormArgument', 'modifyArgument', 'readJson',
+               'shortFormArgument')
+
+  # Define the default values of the attributes. These are shared by all edges, so an attribute only
+  # takes space on an edge once it has been set.
+  defaults                   = {}
+  defaults['isFilenameStub'] = False
+  defaults['isGreedy']       = False
+  defaults['isInput']        = False
+  defaults['isRequired']     = False
+  defaults['modifyArgument'] = None
+
+  # Define the arguments associated with the edge.
+  defaults['longFormArgument']  = None
+  defaults['shortFormArgument'] = None
+
+  # Record how to handle streaming files.
+  defaults['isStreaming']      = False
+  defaults['ifInputIsStream']  = False
+  defaults['ifOutputIsStream'] = False
+
+  # Record the value to include on the command line (and whether it should be included
+  # in the first place).
+  defaults['includeOnCommandLine'] = True
+  defaults['commandLineArgument']  = None
+
+  # It is permissible in some cases to link the output of a tool producing a json file
+  # to another task which will read the json at execution time. In this case, there is
+  # no argument to set, but the following flag will be set.
+  defaults['readJson'] = False
+
+  # If a command uses the values from a different task in evaluating a command.
+  defaults['evaluateCommand'] = False
+
+  # If this was an edge added using the 'originating edges' field in the configuration
+  # file, store this information.
+  defaults['isOriginatingEdge'] = False
+
+  __copy__     = copyAttributes
+  __getattr__  = getDefaultAttribute
+  __getstate__ = getAttributeState
+  __setstate__ = setAttributeState
 
 class edgeClass:
   def __init__(self):
@@ -65,37 +115,12 @@ class edgeClass:
       print('edgeMethods.addEdge')
       self.errors.terminate()
 
-    # Create an attributes class.
-    attributes = edgeAttributes()
-
-    # Find the values from the tool configuration file for this argument.
-    attributes.longFormArgument  = tools.getLongFormArgument(tool, argument)
-    attributes.shortFormArgument = tools.getArgumentAttribute(tool, attributes.longFormArgument, 'shortFormArgument')
-
-    # Find the command line argument that should be used in the makefile, e.g. that the tool expects.
-    # The configuration file may define a different value for consistency across the tools, but the
-    # tool itself must be supplied with what it expects.
-    if tools.getArgumentAttribute(tool, attributes.longFormArgument, 'commandLineArgument') == None: attributes.commandLineArgument = attributes.longFormArgument
-    else: attributes.commandLineArgument = tools.getArgumentAttribute(tool, attributes.longFormArgument, 'commandLineArgument')
-
-    # Identify if the edge represents a filename stub.
-    attributes.isFilenameStub = tools.getArgumentAttribute(tool, attributes.longFormArgument, 'isFilenameStub')
-    if attributes.isFilenameStub == None: attributes.isFilenameStub = False
-
-    # Determine if the option represents an input file.
-    attributes.isInput = tools.getArgumentAttribute(tool, attributes.longFormArgument, 'isInput')
+    # Copy the attributes for this argument from the template built from the tool configuration file.
+    longFormArgument = tools.getLongFormArgument(tool, argument)
+    attributes       = copy(tools.getEdgeTemplate(tool, longFormArgument))
 
-    # Check if the argument should be written to the comand line or not.
-    includeOnCommandLine = tools.getArgumentAttribute(tool, attributes.longFormArgument, 'includeOnCommandLine')
-    if includeOnCommandLine != None: attributes.includeOnCommandLine = includeOnCommandLine
-
-    # Check if the argument needs to be modified when written to the command line.
-    modifyArgument = tools.getArgumentAttribute(tool, attributes.longFormArgument, 'modifyArgument')
-    if modifyArgument: attributes.modifyArgument = modifyArgument
-
-    # Define how to handle streaming files.
-    attributes.ifOutputIsStream = tools.getArgumentAttribute(tool, attributes.longFormArgument, 'outputStream')
-    attributes.ifInputIsStream  = tools.getArgumentAttribute(tool, attributes.longFormArgument, 'inputStream')
+    # Store the long form argument as supplied.
+    attributes.longFormArgument = longFormArgument
 
     # Store if this edge was listed as an originating edge in the configuration file.
     attributes.isOriginatingEdge = isOriginatingEdge
@@ -155,7 +180,14 @@ class edgeClass:
   # Set an edge attribute.
   def setEdgeAttribute(self, graph, sourceNodeID, targetNodeID, attribute, value):
     self.getEdgeAttribute(graph, sourceNodeID, targetNodeID, attribute)
-    setattr(graph[sourceNodeID][targetNodeID]['attributes'], attribute, value)
+
+    # Pipeline graphs index the edges by argument, so if the argument is changed, the index must be
+    # updated.
+    if attribute == 'longFormArgument' and isinstance(graph, pipelineGraph):
+      graph.unindexEdge(sourceNodeID, targetNodeID)
+      setattr(graph[sourceNodeID][targetNodeID]['attributes'], attribute, value)
+      graph.indexEdge(sourceNodeID, targetNodeID)
+    else: setattr(graph[sourceNodeID][targetNodeID]['attributes'], attribute, value)
 
   # Determine if an edge exists between two nodes.
   def checkIfEdgeExists(self, graph, sourceNodeID, targetNodeID):
@@ -13,10 +13,40 @@ from nodeAttributes import *
 import edgeAttributes
 from edgeAttributes import *
 
+import hashlib
 import json
+import marshal
+import mmap
 import os
+import struct
 import sys
 
+try: import cPickle as pickle
+except ImportError: import pickle
+
+from collections import OrderedDict
+
+# Cache the contents of configuration files that have already been parsed. The cache is shared by
+# all fileOperations instances and is keyed by the path, modification time and size of the file,
+# so modified files are read again. The parsed data is stored in marshalled form, so that each
+# request gets its own copy of the data which can be modified without affecting the cache. When
+# the cache is full, the least recently used file is discarded.
+configurationCache     = OrderedDict()
+configurationCacheSize = 512
+
+# Optionally, the parsed files can also be stored on disk, so that later invocations do not need
+# to parse the files again. This is disabled unless a directory is provided.
+configurationCacheDirectory = None
+configurationCacheVersion   = 1
+
+# Define the format of compiled configuration snapshots. A snapshot begins with the identifier, the
+# format version and the length of the header. The header holds the hashes of the configuration
+# files that the snapshot was compiled from, and is followed by the pickled configuration data. The
+# version must be incremented whenever the contents of the configuration classes change.
+snapshotIdentifier = 'GKNOSNAP'
+snapshotVersion    = 1
+snapshotPrefix     = struct.Struct('<8sII')
+
 class fileOperations:
   def __init__(self):
     self.errors = configurationClassErrors()
@@ -24,16 +54,143 @@ class fileOperations:
   # Open a configuration file and store the contents of the file in the
   # configuration dictionary.
   def readConfigurationFile(self, filename, allowTermination = True):
+
+    # Check if the file has already been parsed. If the file cannot be found, continue, so that the
+    # failure is handled below.
+    try: key = self.getConfigurationCacheKey(filename)
+    except OSError: key = None
+
+    if key != None:
+      if key in configurationCache:
+        marshalledData = configurationCache.pop(key)
+        configurationCache[key] = marshalledData
+        return marshal.loads(marshalledData)
+
+      # Check the on disk cache.
+      marshalledData = self.readConfigurationCacheFile(key)
+      if marshalledData != None:
+        self.storeInConfigurationCache(key, marshalledData)
+        return marshal.loads(marshalledData)
+
     try: jsonData = open(filename)
     except:
       if allowTermination: self.errors.missingFile(filename)
       else: return False
 
-    try: configurationData = json.load(jsonData)
+    try:
+      try: configurationData = json.load(jsonData)
+      finally: jsonData.close()
     except:
       if allowTermination:
         exc_type, exc_value, exc_traceback = sys.exc_info()
         self.errors.jsonError(exc_value, filename)
       else: return False
 
+    # Store the parsed data in the cache.
+    if key != None:
+      marshalledData = marshal.dumps(configurationData)
+      self.storeInConfigurationCache(key, marshalledData)
+      self.writeConfigurationCacheFile(key, marshalledData)
+
     return configurationData
+
+  # Define the key used to identify a configuration file in the cache.
+  def getConfigurationCacheKey(self, filename):
+    path        = os.path.realpath(filename)
+    information = os.stat(path)
+
+    return (path, information.st_mtime, information.st_size)
+
+  # Store marshalled configuration data in the cache, discarding the least recently used files if
+  # the cache is full.
+  def storeInConfigurationCache(self, key, marshalledData):
+    configurationCache[key] = marshalledData
+    while len(configurationCache) > configurationCacheSize: configurationCache.popitem(last = False)
+
+  # Remove all files from the in memory cache.
+  def clearConfigurationCache(self):
+    configurationCache.clear()
+
+  # Set the directory used for the on disk configuration cache. If the directory is None, the on
+  # disk cache is not used.
+  def setConfigurationCacheDirectory(self, directory):
+    global configurationCacheDirectory
+    configurationCacheDirectory = directory
+
+  # Get the name of the on disk cache file for a configuration file.
+  def getConfigurationCacheFilename(self, key):
+    path = key[0] if isinstance(key[0], bytes) else key[0].encode('utf-8')
+    return os.path.join(configurationCacheDirectory, hashlib.md5(path).hexdigest() + '.cache')
+
+  # Read marshalled configuration data from the on disk cache. If the cache file does not exist, or
+  # was created from a different version of the configuration file, return None.
+  def readConfigurationCacheFile(self, key):
+    if configurationCacheDirectory == None: return None
+
+    try:
+      with open(self.getConfigurationCacheFilename(key), 'rb') as cacheFile: version, cachedKey, marshalledData = marshal.load(cacheFile)
+    except (IOError, EOFError, ValueError, TypeError): return None
+
+    if version != configurationCacheVersion or tuple(cachedKey) != key: return None
+    return marshalledData
+
+  # Write marshalled configuration data to the on disk cache. The file is written to a temporary
+  # file first and then renamed, so that other processes never read a partially written file.
+  # Failure to write the cache is not an error.
+  def writeConfigurationCacheFile(self, key, marshalledData):
+    if configurationCacheDirectory == None: return
+
+    filename     = self.getConfigurationCacheFilename(key)
+    tempFilename = filename + '.' + str(os.getpid())
+    try:
+      if not os.path.exists(configurationCacheDirectory): os.makedirs(configurationCacheDirectory)
+      with open(tempFilename, 'wb') as cacheFile: marshal.dump((configurationCacheVersion, key, marshalledData), cacheFile)
+      os.rename(tempFilename, filename)
+    except (IOError, OSError): pass
+
+  # Calculate the hash of the contents of each of the source configuration files.
+  def getSourceFileHashes(self, sourceFiles):
+    hashes = {}
+    for filename in sourceFiles:
+      with open(filename, 'rb') as sourceFile: hashes[os.path.realpath(filename)] = hashlib.sha1(sourceFile.read()).hexdigest()
+
+    return hashes
+
+  # Write a compiled snapshot of configuration data. The snapshot is only valid while the source
+  # configuration files are unchanged.
+  def writeConfigurationSnapshot(self, filename, sourceFiles, data):
+    header       = marshal.dumps(self.getSourceFileHashes(sourceFiles))
+    tempFilename = filename + '.' + str(os.getpid())
+    with open(tempFilename, 'wb') as snapshot:
+      snapshot.write(snapshotPrefix.pack(snapshotIdentifier, snapshotVersion, len(header)))
+      snapshot.write(header)
+      pickle.dump(data, snapshot, 2)
+    os.rename(tempFilename, filename)
+
+  # Read a compiled snapshot of configuration data. The file is memory mapped, so only the header is
+  # read before the snapshot is checked. If the snapshot does not exist, is from a different version,
+  # or any of the source configuration files have changed, return None.
+  def readConfigurationSnapshot(self, filename, sourceFiles):
+    try: snapshot = open(filename, 'rb')
+    except IOError: return None
+
+    try:
+      try: data = mmap.mmap(snapshot.fileno(), 0, access = mmap.ACCESS_READ)
+      except (ValueError, EnvironmentError): return None
+
+      try:
+        if len(data) < snapshotPrefix.size: return None
+        identifier, version, headerLength = snapshotPrefix.unpack(data[:snapshotPrefix.size])
+        if identifier != snapshotIdentifier or version != snapshotVersion: return None
+
+        # Check that the source files are unchanged.
+        start = snapshotPrefix.size
+        try: hashes = marshal.loads(data[start:start + headerLength])
+        except (EOFError, ValueError, TypeError): return None
+        try:
+          if hashes != self.getSourceFileHashes(sourceFiles): return None
+        except IOError: return None
+
+        return pickle.loads(data[start + headerLength:])
+      finally: data.close()
+    finally: snapshot.close()
@@ -0,0 +1,232 @@
+#!/bin/bash/python
+
+from __future__ import print_function
+
+import configurationClass
+from configurationClass import *
+
+import edgeAttributes
+from edgeAttributes import *
+
+import nodeAttributes
+from nodeAttributes import *
+
+import pipelineGraph
+from pipelineGraph import *
+
+import json
+import timeit
+
+# Define the methods of configurationMethods and nodeClass that are timed as phases (spans) when
+# instrumentation is enabled. The nodeClass purgeNodeMarkedForRemoval method is also timed, but is
+# replaced separately, as the nodes purged are counted as well.
+configurationSpans = ['attachPipelineParameterSetArgumentsToNodes', 'attachToolParameterSetArgumentsToNodes', 'assignPipelineAttributes',
+                      'buildPipelineGraph', 'buildTaskGraph', 'checkRequiredFiles', 'connectPipelineArgumentsFromAdditionalNodes',
+                      'correctWorkflowForStreams', 'evaluateCommands', 'exportParameterSet', 'generateWorkflow', 'getExecutionPlan',
+                      'getGraphDependencies', 'getGraphIntermediateFiles', 'getGraphOutputs', 'getNumberOfDataSets',
+                      'getWorkflowFileMatrix', 'identifyStreamingNodes', 'mergeNodes', 'processAdditionalNodes',
+                      'processOriginatingEdges', 'searchForUnsetFlags', 'setWhenToDeleteFiles', 'updateModifiedValues',
+                      'validateConfigurationFiles']
+nodeSpans          = ['getPipelineArgumentNodes', 'setRequiredNodes']
+
+# Define the frequently called accessors that are counted when instrumentation is enabled.
+nodeCounters = ['addValuesToGraphNode', 'getGraphNodeAttribute', 'getNodeForTaskArgument', 'getPredecessorFileNodes',
+                'getPredecessorOptionNodes', 'getSuccessorFileNodes', 'getSuccessorTaskNodes', 'setGraphNodeAttribute']
+edgeCounters = ['addEdge', 'getEdgeAttribute', 'setEdgeAttribute']
+
+# Store the total time and number of calls for each span and the value of each counter.
+spans    = {}
+counters = {}
+
+# Store the functions to call when a span completes or the counters are published. Each callback is
+# called with the type ('span' or 'counter'), the name and the value (the time in seconds for spans).
+callbacks = []
+
+# Store the original methods replaced while instrumentation is enabled. Each entry is keyed by the
+# (class, method name) and holds the method defined by the class, or None if the method is inherited.
+originalMethods = {}
+
+# Record the time taken for a span.
+def recordSpan(name, seconds):
+  try:
+    spans[name][0] += 1
+    spans[name][1] += seconds
+  except KeyError: spans[name] = [1, seconds]
+  for callback in callbacks: callback('span', name, seconds)
+
+# Increase the value of a counter.
+def incrementCounter(name, value = 1):
+  counters[name] = counters.get(name, 0) + value
+
+# Return a version of a method that records the time taken as a span.
+def timedMethod(name, method):
+  def instrumentedMethod(*arguments, **keywords):
+    start = timeit.default_timer()
+    try: return method(*arguments, **keywords)
+    finally: recordSpan(name, timeit.default_timer() - start)
+
+  return instrumentedMethod
+
+# Return a version of a method that counts the number of calls.
+def countedMethod(name, method):
+  def instrumentedMethod(*arguments, **keywords):
+    counters[name] = counters.get(name, 0) + 1
+    return method(*arguments, **keywords)
+
+  return instrumentedMethod
+
+# Define replacement methods for the pipeline graph, counting the nodes and edges added and the number of
+# times all of the nodes or edges in the graph are iterated over. The nodes and edges methods of the
+# graph use these iterators, so are also counted. Iterating over the edges of selected nodes is not a scan.
+def countedAddNode(method):
+  def instrumentedMethod(graph, n, attr_dict = None, **attr):
+    if n not in graph.succ: incrementCounter('nodesAdded')
+    return method(graph, n, attr_dict, **attr)
+
+  return instrumentedMethod
+
+def countedAddEdge(method):
+  def instrumentedMethod(graph, u, v, attr_dict = None, **attr):
+    incrementCounter('edgesAdded')
+    return method(graph, u, v, attr_dict, **attr)
+
+  return instrumentedMethod
+
+def countedAddEdgesFrom(method):
+  def instrumentedMethod(graph, ebunch, attr_dict = None, **attr):
+    ebunch = list(ebunch)
+    incrementCounter('edgesAdded', len(ebunch))
+    return method(graph, ebunch, attr_dict, **attr)
+
+  return instrumentedMethod
+
+def countedNodeScan(method):
+  def instrumentedMethod(graph, *arguments, **keywords):
+    incrementCounter('graphScans')
+    return method(graph, *arguments, **keywords)
+
+  return instrumentedMethod
+
+def countedEdgeScan(method):
+  def instrumentedMethod(graph, nbunch = None, data = False):
+    if nbunch == None: incrementCounter('graphScans')
+    return method(graph, nbunch, data)
+
+  return instrumentedMethod
+
+# Count the nodes removed when purging nodes marked for removal.
+def countedPurge(method):
+  def instrumentedMethod(nodeMethods, graph, *arguments, **keywords):
+    numberOfNodes = len(graph)
+    try: return method(nodeMethods, graph, *arguments, **keywords)
+    finally: incrementCounter('nodesPurged', numberOfNodes - len(graph))
+
+  return instrumentedMethod
+
+# Count the graphs scanned when finding nodes of a given type. Pipeline graphs use an index, so these
+# are not scans.
+def countedGetNodes(method):
+  def instrumentedMethod(nodeMethods, graph, nodeType):
+    if not isinstance(graph, pipelineGraph): incrementCounter('graphScans')
+    return method(nodeMethods, graph, nodeType)
+
+  return instrumentedMethod
+
+# Define a class for collecting timing and counter information about building and processing pipeline
+# graphs. When enabled, the phases of configurationMethods are timed and the frequently used nodeClass,
+# edgeClass and pipelineGraph methods are counted, by replacing the methods in these classes with
+# instrumented versions. When disabled, the original methods are restored, so the instrumentation has
+# no cost. Enabling the instrumentation more than once has no further effect.
+#
+# The methods are replaced in the classes themselves, so the instrumentation applies to the whole
+# process. For this reason, the recorded spans and counters, the callbacks and the replaced methods are
+# stored in this module and shared by all instrumentation objects, e.g. disabling or resetting one
+# object disables or resets them all.
+class instrumentation:
+
+  # Replace a method of a class with an instrumented version.
+  def replaceMethod(self, cls, name, wrapper):
+    if (cls, name) in originalMethods: return
+    originalMethods[(cls, name)] = cls.__dict__.get(name)
+    setattr(cls, name, wrapper(getattr(cls, name)))
+
+  # Enable the instrumentation.
+  def enable(self):
+    for name in configurationSpans: self.replaceMethod(configurationMethods, name, lambda method, name = name: timedMethod(name, method))
+    for name in nodeSpans: self.replaceMethod(nodeClass, name, lambda method, name = name: timedMethod(name, method))
+    for name in nodeCounters: self.replaceMethod(nodeClass, name, lambda method, name = name: countedMethod(name, method))
+    for name in edgeCounters: self.replaceMethod(edgeClass, name, lambda method, name = name: countedMethod(name, method))
+
+    # Count the nodes purged in addition to timing the purge.
+    self.replaceMethod(nodeClass, 'purgeNodeMarkedForRemoval', lambda method: countedPurge(timedMethod('purgeNodeMarkedForRemoval', method)))
+    self.replaceMethod(nodeClass, 'getNodes', countedGetNodes)
+
+    self.replaceMethod(pipelineGraph, 'add_node', countedAddNode)
+    self.replaceMethod(pipelineGraph, 'add_edge', countedAddEdge)
+    self.replaceMethod(pipelineGraph, 'add_edges_from', countedAddEdgesFrom)
+    self.replaceMethod(pipelineGraph, 'nodes_iter', countedNodeScan)
+    self.replaceMethod(pipelineGraph, 'edges_iter', countedEdgeScan)
+
+  # Disable the instrumentation and restore the original methods. The recorded information is kept.
+  def disable(self):
+    for cls, name in originalMethods.keys():
+      method = originalMethods.pop((cls, name))
+      if method == None: delattr(cls, name)
+      else: setattr(cls, name, method)
+
+  # Return true if the instrumentation is enabled.
+  def isEnabled(self):
+    return len(originalMethods) > 0
+
+  # Discard all of the recorded spans and counters.
+  def reset(self):
+    spans.clear()
+    counters.clear()
+
+  # Add a function to call when a span completes or the counters are published.
+  def addCallback(self, callback):
+    callbacks.append(callback)
+
+  # Remove a callback.
+  def removeCallback(self, callback):
+    if callback in callbacks: callbacks.remove(callback)
+
+  # Send the current value of each counter to the callbacks.
+  def publishCounters(self):
+    for name in sorted(counters):
+      for callback in callbacks: callback('counter', name, counters[name])
+
+  # Return a span, for timing any section of code in a with statement, e.g.
+  #
+  #   with instrumentation().span('build'): ...
+  #
+  # The span is only recorded if the instrumentation is enabled.
+  def span(self, name):
+    return instrumentationSpan(name, self.isEnabled())
+
+  # Get the recorded spans and counters.
+  def getReport(self):
+    report             = {}
+    report['spans']    = dict((name, {'calls': spans[name][0], 'seconds': spans[name][1]}) for name in spans)
+    report['counters'] = dict(counters)
+
+    return report
+
+  # Write the recorded spans and counters to a json file.
+  def writeReport(self, filename):
+    with open(filename, 'w') as reportFile: json.dump(self.getReport(), reportFile, indent = 2, sort_keys = True)
+
+# Define a span for timing a section of code.
+class instrumentationSpan:
+  def __init__(self, name, isEnabled):
+    self.isEnabled = isEnabled
+    self.name      = name
+    self.start     = None
+
+  def __enter__(self):
+    if self.isEnabled: self.start = timeit.default_timer()
+    return self
+
+  def __exit__(self, exceptionType, exception, traceback):
+    if self.isEnabled: recordSpan(self.name, timeit.default_timer() - self.start)
+    return False
@@ -10,121 +10,406 @@ from configurationClassErrors import *
 import edgeAttributes
 from edgeAttributes import *
 
+import pipelineGraph
+from pipelineGraph import *
+
 import inspect
 import json
 import operator
 import os
 import sys
 
+# Define a list holding the values of a single iteration in a value store. The list is a copy of the
+# stored values, but any change made to the list in place is written back to the store, so the values
+# can be modified as if the store were a dictionary of lists (e.g. values[1].append(value)).
+class nodeValueList(list):
+
+  __slots__ = ('iteration', 'store')
+
+  def __init__(self, values, store, iteration):
+    list.__init__(self, values)
+    self.iteration = iteration
+    self.store     = store
+
+  # Return a version of a list method that writes the modified list back to the store.
+  def writeBack(method):
+    def modifyValues(self, *arguments, **keywords):
+      result = method(self, *arguments, **keywords)
+      self.store[self.iteration] = self
+
+      return result
+
+    return modifyValues
+
+  append       = writeBack(list.append)
+  extend       = writeBack(list.extend)
+  insert       = writeBack(list.insert)
+  pop          = writeBack(list.pop)
+  remove       = writeBack(list.remove)
+  reverse      = writeBack(list.reverse)
+  sort         = writeBack(list.sort)
+  __delitem__  = writeBack(list.__delitem__)
+  __delslice__ = writeBack(list.__delslice__)
+  __iadd__     = writeBack(list.__iadd__)
+  __imul__     = writeBack(list.__imul__)
+  __setitem__  = writeBack(list.__setitem__)
+  __setslice__ = writeBack(list.__setslice__)
+  del writeBack
+
+  # Copies and pickles of the values are plain lists, not attached to the store.
+  def __reduce__(self): return (list, (list(self),))
+
+# Define a class for holding the values associated with an option or file node. The values behave as a
+# dictionary of lists, keyed by the iteration, but all of the values are stored in a single list, with
+# the start and end positions of each iteration in the list held in a dictionary. The lists returned
+# for each iteration are nodeValueLists, so changes made to them are written back to the store.
+#
+# A node whose values are the same for every iteration (e.g. an option that is set once, but used in
+# a run with multiple data sets) can be broadcast. The values are then only stored for iteration 1, but
+# are returned for every iteration up to the number of broadcast iterations. The values are only
+# copied for each iteration if the values of an individual iteration are modified.
+class nodeValueStore(object):
+
+  __slots__ = ('broadcast', 'data', 'offsets', 'unused')
+
+  __getstate__ = getAttributeState
+  __setstate__ = setAttributeState
+
+  def __init__(self, values = None):
+
+    # Store the number of iterations that the values of iteration 1 are broadcast to. If the values
+    # are not broadcast, this is zero.
+    self.broadcast = 0
+
+    # Store all the values for all iterations in a single list.
+    self.data = []
+
+    # Store the (start, end) positions of each iteration in the data list.
+    self.offsets = {}
+
+    # Record the number of positions in the data list no longer used by any iteration. When values
+    # for an iteration are replaced, the old positions are not reused, so the list is periodically
+    # compacted.
+    self.unused = 0
+
+    if values:
+      for iteration in values: self[iteration] = values[iteration]
+
+  # Return the interned copy of a value. Many nodes (e.g. the option and file nodes for the same file)
+  # hold the same values, so this avoids storing a string for each node. Only str values can be
+  # interned, and interned strings are discarded once no longer used.
+  def intern(self, value):
+    if type(value) == str: return intern(value)
+    return value
+
+  # Return the (start, end) positions of an iteration in the data list.
+  def getOffsets(self, iteration):
+    if self.broadcast and iteration in self: return self.offsets[1]
+    return self.offsets[iteration]
+
+  def __getitem__(self, iteration):
+    start, end = self.getOffsets(iteration)
+    return nodeValueList(self.data[start:end], self, iteration)
+
+  # Store the values for an iteration. If the iteration already exists and has the same number of
+  # values, the values are replaced in place, otherwise they are added to the end of the data list.
+  def __setitem__(self, iteration, values):
+    if self.broadcast: self.expand()
+    values = [self.intern(value) for value in values]
+    if iteration in self.offsets:
+      start, end = self.offsets[iteration]
+      if end - start == len(values):
+        self.data[start:end] = values
+        return
+      self.unused += end - start
+
+    self.offsets[iteration] = (len(self.data), len(self.data) + len(values))
+    self.data.extend(values)
+    if self.unused > len(self.data) / 2: self.compact()
+
+  def __delitem__(self, iteration):
+    if self.broadcast: self.expand()
+    start, end = self.offsets.pop(iteration)
+    self.unused += end - start
+    if self.unused > len(self.data) / 2: self.compact()
+
+  def __contains__(self, iteration):
+    if self.broadcast: return isinstance(iteration, (int, long)) and 1 <= iteration <= self.broadcast
+    return iteration in self.offsets
+
+  def __iter__(self): return iter(self.keys())
+  def __len__(self): return self.broadcast if self.broadcast else len(self.offsets)
+
+  def __eq__(self, other):
+    if isinstance(other, nodeValueStore): other = dict(other.items())
+    return dict(self.items()) == other
+
+  def __ne__(self, other): return not self == other
+  def __repr__(self): return repr(dict(self.items()))
+
+  # Provide the dictionary methods used when accessing node values.
+  def get(self, iteration, default = None): return self[iteration] if iteration in self else default
+  def has_key(self, iteration): return iteration in self
+  def keys(self): return range(1, self.broadcast + 1) if self.broadcast else self.offsets.keys()
+  def iterkeys(self): return iter(self.keys())
+  def values(self): return [self[iteration] for iteration in self.keys()]
+  def items(self): return [(iteration, self[iteration]) for iteration in self.keys()]
+  def iteritems(self): return ((iteration, self[iteration]) for iteration in self.keys())
+
+  def clear(self):
+    self.broadcast = 0
+    self.data      = []
+    self.offsets   = {}
+    self.unused    = 0
+
+  def copy(self):
+    values = nodeValueStore()
+    values.broadcast = self.broadcast
+    values.data      = list(self.data)
+    values.offsets   = dict(self.offsets)
+    values.unused    = self.unused
+
+    return values
+
+  # Add values to the end of an existing iteration. If the iteration is the last block in the data
+  # list, the values can be added without moving the existing values.
+  def extend(self, iteration, values):
+    if self.broadcast: self.expand()
+    start, end = self.offsets[iteration]
+    if end == len(self.data):
+      self.data.extend([self.intern(value) for value in values])
+      self.offsets[iteration] = (start, len(self.data))
+    else: self[iteration] = self.data[start:end] + list(values)
+
+  # Return a copy of the values in an iteration as a plain list. This is quicker than getting the values
+  # as a nodeValueList, so is used when the values are only read.
+  def getValues(self, iteration):
+    start, end = self.getOffsets(iteration)
+    return self.data[start:end]
+
+  # Return the number of values in an iteration without copying them.
+  def getNumberOfValues(self, iteration):
+    start, end = self.getOffsets(iteration)
+    return end - start
+
+  # Return all of the values for all of the iterations in a single list, in the same order as the
+  # iterations.
+  def getAllValues(self):
+    allValues = []
+    for iteration in self.keys():
+      start, end = self.getOffsets(iteration)
+      allValues.extend(self.data[start:end])
+
+    return allValues
+
+  # Broadcast the values of iteration 1 to the given number of iterations. This is only possible if
+  # the values of iteration 1 are the only values stored.
+  def setBroadcast(self, numberOfIterations):
+    if self.broadcast == 0 and self.offsets.keys() != [1]: return False
+    self.broadcast = numberOfIterations if numberOfIterations > 1 else 0
+
+    return True
+
+  # Return true if the values are broadcast to multiple iterations.
+  def isBroadcast(self): return self.broadcast != 0
+
+  # Store a copy of the broadcast values for each iteration, so that the values of individual
+  # iterations can be modified.
+  def expand(self):
+    numberOfIterations = self.broadcast
+    self.broadcast     = 0
+    start, end         = self.offsets[1]
+    for iteration in range(2, numberOfIterations + 1):
+      self.offsets[iteration] = (len(self.data), len(self.data) + end - start)
+      self.data.extend(self.data[start:end])
+
+  # Rebuild the data list without any of the unused positions.
+  def compact(self):
+    data = []
+    for iteration in self.offsets:
+      start, end              = self.offsets[iteration]
+      self.offsets[iteration] = (len(data), len(data) + end - start)
+      data.extend(self.data[start:end])
+
+    self.data   = data
+    self.unused = 0
+
+# Return the values for a node as a value store. Node values that are set as a dictionary (or any
+# other object with keys) are converted.
+def getNodeValueStore(values):
+  if isinstance(values, nodeValueStore): return values
+  return nodeValueStore(values)
+
+# Get and set the values of an option or file node. These are used to define the 'values' attribute of
+# the node attributes classes, so that values set as a dictionary are held in a value store.
+def getNodeValues(nodeAttributes): return nodeAttributes.valueStore
+def setNodeValues(nodeAttributes, values): nodeAttributes.valueStore = getNodeValueStore(values)
+
 # Define a class for holding attributes for task nodes.
-class taskNodeAttributes:
-  def __init__(self):
+class taskNodeAttributes(object):
 
-    # Describe the delimiter to use when writing out the command line. Typically, this is
-    # just a space, but in some case can be something else (e.g. FILE=<FILE>).
-    self.delimiter = ' '
+  # An attributes object is attached to every node in the graph, so the attributes are stored in
+  # slots rather than a per-instance dictionary. Only the attributes listed here can be set.
+  __slots__ = ('delimiter', 'description', 'executable', 'hasMultipleIterations', 'isGreedy', 'isHidden',
+               'modifier', 'nodeType', 'numberOfDataSets', 'outputStream', 'path', 'precommand', 'tool')
 
-    # Provide a description of the task node.
-    self.description = None
+  # Define the default values of the attributes. These are shared by all task nodes, so an attribute
+  # only takes space on a node once it has been set.
+  defaults = {}
 
-    # Define the executabe for the task.
-    self.executable = None
+  # Describe the delimiter to use when writing out the command line. Typically, this is
+  # just a space, but in some case can be something else (e.g. FILE=<FILE>).
+  defaults['delimiter'] = ' '
 
-    # If the task is hidden in help messsages, store the information.
-    self.isHidden = False
+  # Provide a description of the task node.
+  defaults['description'] = None
 
-    # If any of the input arguments to this task are greedy, mark the task as greedy.
-    self.isGreedy = False
+  # Define the executabe for the task.
+  defaults['executable'] = None
 
-    # If a task has multiple iterations, record that fact.
-    self.hasMultipleIterations = False
+  # If the task is hidden in help messsages, store the information.
+  defaults['isHidden'] = False
 
-    # If the executable has a precommand (e.g. java -jar), or a modifier (e.g. bamtools sort),
-    # store the values.
-    self.modifier   = None
-    self.precommand = None
+  # If any of the input arguments to this task are greedy, mark the task as greedy.
+  defaults['isGreedy'] = False
 
-    # Specify that this node is a task node.
-    self.nodeType = 'task'
+  # If a task has multiple iterations, record that fact.
+  defaults['hasMultipleIterations'] = False
+
+  # If the executable has a precommand (e.g. java -jar), or a modifier (e.g. bamtools sort),
+  # store the values.
+  defaults['modifier']   = None
+  defaults['precommand'] = None
 
-    # Store the path of the executable file.
-    self.path = None
+  # Store the path of the executable file.
+  defaults['path'] = None
 
-    # Define the name of the tool that this task uses.
-    self.tool = None
+  # Define the name of the tool that this task uses.
+  defaults['tool'] = None
 
-    #TODO IS THIS NEEDED.
-    # Store the number of data sets that this task is associated with.
-    self.numberOfDataSets = 0
+  #TODO IS THIS NEEDED.
+  # Store the number of data sets that this task is associated with.
+  defaults['numberOfDataSets'] = 0
 
-    # Record if this task outputs to a stream.
-    self.outputStream = False
+  # Record if this task outputs to a stream.
+  defaults['outputStream'] = False
+
+  __getattr__  = getDefaultAttribute
+  __getstate__ = getAttributeState
+  __setstate__ = setAttributeState
+
+  # The node type is checked for almost every node access, so is always set on the node.
+  def __init__(self):
+    self.nodeType = 'task'
 
 # Define a class for holding attributes for options nodes.  These are nodes that
 # hold option data, but are not files.
-class optionNodeAttributes:
+class optionNodeAttributes(object):
+
+  __slots__ = ('allowMultipleValues', 'allowedExtensions', 'associatedFileNodes', 'dataType', 'deleteFiles',
+               'description', 'filenameExtensions', 'hasMultipleDataSets', 'hasMultipleValues', 'hasValue',
+               'isCommandToEvaluate', 'isConstructed', 'isDirectory', 'isFile', 'isFilenameStub', 'isInput',
+               'isMarkedForRemoval', 'isOutput', 'isPipelineArgument', 'isRequired', 'isStream',
+               'isTemporary', 'isValuesModified', 'linkedExtension', 'nodeType', 'numberOfDataSets', 'valueStore')
+
+  # Define the default values of the attributes that cannot be modified in place. These are shared by
+  # all option nodes.
+  defaults                        = {}
+  defaults['allowMultipleValues'] = False
+  defaults['dataType']            = ''
+  defaults['description']         = 'No description provided'
+  defaults['filenameExtensions']  = ''
+  defaults['hasMultipleDataSets'] = False
+  defaults['hasMultipleValues']   = False
+  defaults['hasValue']            = False
+  defaults['isFile']              = False
+  defaults['isFilenameStub']      = False
+  defaults['isInput']             = False
+  defaults['isOutput']            = False
+  defaults['isPipelineArgument']  = False
+  defaults['isRequired']          = False
+  defaults['isStream']            = False
+  defaults['deleteFiles']         = False
+  defaults['numberOfDataSets']    = 0
+
+  # Record if this node points to a directory.
+  defaults['isDirectory'] = False
+
+  # If the node points to a temporary file/directory, mark the node as temporary.
+  defaults['isTemporary'] = False
+
+  # Mark the node if the values were construced, rather than set by the user.
+  defaults['isConstructed'] = False
+
+  # Store the extension that an option expects.
+  defaults['linkedExtension'] = ''
+
+  # Node markings for node removal.
+  defaults['isMarkedForRemoval'] = False
+
+  # If the values associated with this node are commands to be evaluated at run time.
+  defaults['isCommandToEvaluate'] = False
+
+  # Record if the values associated with the node have been modified.
+  defaults['isValuesModified'] = False
+
+  __getattr__  = getDefaultAttribute
+  __getstate__ = getAttributeState
+  __setstate__ = setAttributeState
+
+  # The lists and values are modified in place, so each node needs its own.
   def __init__(self):
     self.allowedExtensions   = []
-    self.allowMultipleValues = False
     self.associatedFileNodes = []
-    self.dataType            = ''
-    self.description         = 'No description provided'
-    self.filenameExtensions  = ''
-    self.hasMultipleDataSets = False
-    self.hasMultipleValues   = False
-    self.hasValue            = False
-    self.isFile              = False
-    self.isFilenameStub      = False
-    self.isInput             = False
-    self.isOutput            = False
-    self.isPipelineArgument  = False
-    self.isRequired          = False
-    self.isStream            = False
-    self.deleteFiles         = False
     self.nodeType            = 'option'
-    self.numberOfDataSets    = 0
     self.values              = {}
 
-    # Record if this node points to a directory.
-    self.isDirectory = False
+  # The values are held in a value store, but are set and accessed as a dictionary of lists.
+  values = property(getNodeValues, setNodeValues)
 
-    # If the node points to a temporary file/directory, mark the node as temporary.
-    self.isTemporary = False
+# Define a class for holding attributes for file nodes.  These are nodes that
+# hold information about files.
+class fileNodeAttributes(object):
 
-    # Mark the node if the values were construced, rather than set by the user.
-    self.isConstructed = False
+  __slots__ = ('allowMultipleValues', 'allowedExtensions', 'description', 'hasMultipleDataSets',
+               'hasMultipleValues', 'hasValue', 'isMarkedForRemoval', 'isStreaming', 'nodeType',
+               'numberOfDataSets', 'valueStore')
 
-    # Store the extension that an option expects.
-    self.linkedExtension = ''
+  # Define the default values of the attributes that cannot be modified in place. These are shared by
+  # all file nodes.
+  defaults                        = {}
+  defaults['allowMultipleValues'] = False
+  defaults['description']         = 'No description provided'
+  defaults['hasMultipleDataSets'] = False
+  defaults['hasMultipleValues']   = False
+  defaults['hasValue']            = False
+  defaults['numberOfDataSets']    = 0
 
-    # Node markings for node removal.
-    self.isMarkedForRemoval = False
+  # Node markings for node removal.
+  defaults['isMarkedForRemoval'] = False
 
-    # If the values associated with this node are commands to be evaluated at run time.
-    self.isCommandToEvaluate = False
+  # File node represents a streaming file.
+  defaults['isStreaming'] = False
 
-    # Record if the values associated with the node have been modified.
-    self.isValuesModified = False
+  __getattr__  = getDefaultAttribute
+  __getstate__ = getAttributeState
+  __setstate__ = setAttributeState
 
-# Define a class for holding attributes for file nodes.  These are nodes that
-# hold information about files.
-class fileNodeAttributes:
+  # The lists and values are modified in place, so each node needs its own.
   def __init__(self):
-    self.allowMultipleValues = False
-    self.allowedExtensions   = []
-    self.description         = 'No description provided'
-    self.hasMultipleDataSets = False
-    self.hasMultipleValues   = False
-    self.hasValue            = False
-    self.nodeType            = 'file'
-    self.numberOfDataSets    = 0
-    self.values              = {}
- 
-    # Node markings for node removal.
-    self.isMarkedForRemoval = False
+    self.allowedExtensions = []
+    self.nodeType          = 'file'
+    self.values            = {}
+
+  # The values are held in a value store, but are set and accessed as a dictionary of lists.
+  values = property(getNodeValues, setNodeValues)
 
-    # File node represents a streaming file.
-    self.isStreaming = False
+# Define the attributes available for each type of node. These are used to check attribute requests
+# without needing to create any attribute objects.
+nodeAttributeSchema           = {}
+nodeAttributeSchema['task']   = frozenset(taskNodeAttributes.__slots__)
+nodeAttributeSchema['option'] = frozenset(optionNodeAttributes.__slots__).union(['values'])
+nodeAttributeSchema['file']   = frozenset(fileNodeAttributes.__slots__).union(['values'])
 
 class nodeClass:
   def __init__(self):
@@ -286,6 +571,15 @@ class nodeClass:
   # Check if a node exists based on a task and an argument.
   def doesNodeExist(self, graph, task, argument):
     exists = False
+
+    # Pipeline graphs index the edges by argument, so only the nodes attached to the task with this
+    # argument need to be checked.
+    if isinstance(graph, pipelineGraph):
+      for sourceNodeID in graph.getNodesForArgument(task, argument):
+        if self.getGraphNodeAttribute(graph, sourceNodeID, 'nodeType') == 'option': return sourceNodeID
+
+      return None
+
     for sourceNodeID, targetNodeID in graph.in_edges(task):
       edgeArgument = self.edgeMethods.getEdgeAttribute(graph, sourceNodeID, targetNodeID, 'longFormArgument')
       nodeType     = self.getGraphNodeAttribute(graph, sourceNodeID, 'nodeType')
@@ -350,93 +644,90 @@ class nodeClass:
   # Get an attribute from the nodes data structure.  Check to ensure that the requested attribute is
   # available for the type of node.  If not, terminate with an error.
   def getGraphNodeAttribute(self, graph, nodeID, attribute):
-    try: value = getattr(graph.node[nodeID]['attributes'], attribute)
+    try: return getattr(graph.node[nodeID]['attributes'], attribute)
 
-    # If there is an error, determine if the node exists in the graph.  If the node exists, the problem
-    # lies with the attribute.  Determine if the attribute belongs to any of the node data structures,
-    # then terminate.
-    except:
-      if nodeID not in graph.nodes():
-        self.errors.missingNodeInAttributeRequest(nodeID)
-
-      # If no attributes have been attached to the node.
-      elif 'attributes' not in graph.node[nodeID]:
-        self.errors.noAttributesInAttributeRequest(nodeID)
-
-      # If the attribute is not associated with the node.
-      else:
-        inTaskNode    = False
-        inFileNode    = False
-        inOptionsNode = False
-        if hasattr(taskNodeAttributes(), attribute): inTaskNode      = True
-        if hasattr(fileNodeAttributes(), attribute): inFileNode      = True
-        if hasattr(optionNodeAttributes(), attribute): inOptionsNode = True
-        if graph.node[nodeID]['attributes'].nodeType == 'task': nodeType = 'task node'
-        if graph.node[nodeID]['attributes'].nodeType == 'file': nodeType = 'file node'
-        if graph.node[nodeID]['attributes'].nodeType == 'option': nodeType = 'options node'
-        self.errors.attributeNotAssociatedWithNode(nodeID, attribute, nodeType, inTaskNode, inFileNode, inOptionsNode)
+    # If there is an error, determine the source of the problem and terminate.
+    except: self.attributeRequestFailure(graph, nodeID, attribute, isSet = False)
 
-    return value
+  # Get multiple attributes from a node. The values are returned in the same order as the
+  # requested attributes.
+  def getGraphNodeAttributes(self, graph, nodeID, attributes):
+    try: nodeAttributes = graph.node[nodeID]['attributes']
+    except: self.attributeRequestFailure(graph, nodeID, attributes[0], isSet = False)
+
+    values = []
+    for attribute in attributes:
+      try: values.append(getattr(nodeAttributes, attribute))
+      except: self.attributeRequestFailure(graph, nodeID, attribute, isSet = False)
+
+    return values
 
   # Set an attribute from the nodes data structure.  Check to ensure that the requested attribute is
   # available for the type of node.  If not, terminate with an error.
   def setGraphNodeAttribute(self, graph, nodeID, attribute, value, replace = False):
-    try: test = getattr(graph.node[nodeID]['attributes'], attribute)
-
-    # If there is an error, determine if the node exists in the graph.  If the node exists, the problem
-    # lies with the attribute.  Determine if the attribute belongs to any of the node data structures,
-    # then terminate.
-    except:
-      if nodeID not in graph.nodes():
-        self.errors.missingNodeInAttributeSet(nodeID)
-
-      # If no attributes have been attached to the node.
-      elif 'attributes' not in graph.node[nodeID]:
-        self.errors.noAttributesInAttributeSet(nodeID)
-
-      # If the attribute is not associated with the node.
-      else:
-        inTaskNode    = False
-        inFileNode    = False
-        inOptionsNode = False
-        if hasattr(taskNodeAttributes(), attribute): inTaskNode      = True
-        if hasattr(fileNodeAttributes(), attribute): inFileNode      = True
-        if hasattr(optionNodeAttributes(), attribute): inOptionsNode = True
-        if graph.node[nodeID]['attributes'].nodeType == 'task': nodeType = 'task node'
-        elif graph.node[nodeID]['attributes'].nodeType == 'file': nodeType = 'file node'
-        elif graph.node[nodeID]['attributes'].nodeType == 'option': nodeType = 'options node'
-        self.errors.attributeNotAssociatedWithNodeInSet(nodeID, attribute, nodeType, inTaskNode, inFileNode, inOptionsNode)
-
-    # Set the attribute. If 'replace' is set to true, just set the value as is.
-    if replace or type(getattr(graph.node[nodeID]['attributes'], attribute)) != list:
-      setattr(graph.node[nodeID]['attributes'], attribute, value)
-
-    # If the attribute points to a list, append the value.
+    try:
+      nodeAttributes = graph.node[nodeID]['attributes']
+      currentValue   = getattr(nodeAttributes, attribute)
+    except: self.attributeRequestFailure(graph, nodeID, attribute, isSet = True)
+
+    # Set the attribute. If 'replace' is set to true, just set the value as is. If the attribute
+    # points to a list, append the value.
+    if not replace and type(currentValue) == list: currentValue.append(value)
+    else: setattr(nodeAttributes, attribute, value)
+    if attribute == 'values': self.recordModifiedValues(graph, nodeID)
+
+  # Set multiple attributes of a node. The attributes and values are supplied as a dictionary.
+  def setGraphNodeAttributes(self, graph, nodeID, attributeValues, replace = False):
+    for attribute in attributeValues: self.setGraphNodeAttribute(graph, nodeID, attribute, attributeValues[attribute], replace)
+
+  # If an attribute could not be got or set, determine if the node exists in the graph.  If the node
+  # exists, the problem lies with the attribute.  Determine if the attribute belongs to any of the
+  # node data structures, then terminate.
+  def attributeRequestFailure(self, graph, nodeID, attribute, isSet):
+    if nodeID not in graph:
+      if isSet: self.errors.missingNodeInAttributeSet(nodeID)
+      else: self.errors.missingNodeInAttributeRequest(nodeID)
+
+    # If no attributes have been attached to the node.
+    elif 'attributes' not in graph.node[nodeID]:
+      if isSet: self.errors.noAttributesInAttributeSet(nodeID)
+      else: self.errors.noAttributesInAttributeRequest(nodeID)
+
+    # If the attribute is not associated with the node.
     else:
-      valueList = getattr(graph.node[nodeID]['attributes'], attribute)
-      valueList.append(value)
-      setattr(graph.node[nodeID]['attributes'], attribute, valueList)
+      inTaskNode, inFileNode, inOptionsNode = self.getNodeTypesWithAttribute(attribute)
+      nodeType = self.getNodeTypeDescription(graph.node[nodeID]['attributes'])
+      if isSet: self.errors.attributeNotAssociatedWithNodeInSet(nodeID, attribute, nodeType, inTaskNode, inFileNode, inOptionsNode)
+      else: self.errors.attributeNotAssociatedWithNode(nodeID, attribute, nodeType, inTaskNode, inFileNode, inOptionsNode)
+
+  # Determine which of the node types (task, file and option) include an attribute.
+  def getNodeTypesWithAttribute(self, attribute):
+    inTaskNode    = attribute in nodeAttributeSchema['task']
+    inFileNode    = attribute in nodeAttributeSchema['file']
+    inOptionsNode = attribute in nodeAttributeSchema['option']
+
+    return inTaskNode, inFileNode, inOptionsNode
+
+  # Describe the type of a node for use in error messages.
+  def getNodeTypeDescription(self, nodeAttributes):
+    try: nodeType = nodeAttributes.nodeType
+    except AttributeError: return 'unknown node'
+
+    if nodeType == 'task': return 'task node'
+    elif nodeType == 'file': return 'file node'
+    elif nodeType == 'option': return 'options node'
+    else: return str(nodeType) + ' node'
 
   #TODO IS THIS USED?
   # Set an attribute from the nodes data structure.  In this method, the node is not a part of the graph and
   # so the node itself is given to the method.
   def setNodeAttribute(self, nodeAttributes, attribute, value):
-    try: test = getattr(nodeAttributes, attribute)
 
-    # If there is an error, determine if the attribute belongs to any of the node data structures,
-    # then terminate.
-    except:
-
-      # If the attribute is not associated with the node.
-      inTaskNode    = False
-      inFileNode    = False
-      inOptionsNode = False
-      if hasattr(taskNodeAttributes(), attribute): inTaskNode      = True
-      if hasattr(fileNodeAttributes(), attribute): inFileNode      = True
-      if hasattr(optionNodeAttributes(), attribute): inOptionsNode = True
-      if nodeAttributes.nodeType == 'task': nodeType = 'task node'
-      if nodeAttributes.nodeType == 'file': nodeType = 'file node'
-      if nodeAttributes.nodeType == 'option': nodeType = 'options node'
+    # If the attribute does not exist, determine if the attribute belongs to any of the node data
+    # structures, then terminate.
+    if not hasattr(nodeAttributes, attribute):
+      inTaskNode, inFileNode, inOptionsNode = self.getNodeTypesWithAttribute(attribute)
+      nodeType = self.getNodeTypeDescription(nodeAttributes)
       self.errors.attributeNotAssociatedWithNodeInSetNoGraph(attribute, nodeType, inTaskNode, inFileNode, inOptionsNode)
 
     setattr(nodeAttributes, attribute, value)
@@ -446,6 +737,7 @@ class nodeClass:
 
     # Since values have been added to the node, set the hasValue flag to True.
     self.setGraphNodeAttribute(graph, nodeID, 'hasValue', True)
+    self.recordModifiedValues(graph, nodeID)
 
     # If write is set to replace, set the number of datasets to 1, clear any values currently
     # set and add the new values.
@@ -465,19 +757,23 @@ class nodeClass:
         definedValues[1] = []
 
       # Check that the defined iteration exists.
-      try: iterationValues = definedValues[iteration]
-      except:
+      if iteration not in definedValues:
         #TODO ERROR
         print('Unavailable iteration in addValuesToGraphNode')
         self.errors.terminate()
 
-      for value in values: iterationValues.append(value)
-      graph.node[nodeID]['attributes'].values[iteration] = iterationValues
+      definedValues.extend(iteration, values)
 
-    # If write is set to append, find the number of datasets, then append a new set of values.
+    # If write is set to append, find the number of datasets, then append a new set of values. If the
+    # values are the same as those already stored for every iteration, broadcast the existing values
+    # rather than storing another copy.
     elif write == 'iteration':
       numberOfDataSets = self.getGraphNodeAttribute(graph, nodeID, 'numberOfDataSets')
-      graph.node[nodeID]['attributes'].values[numberOfDataSets + 1] = values
+      definedValues    = graph.node[nodeID]['attributes'].values
+      isBroadcast      = False
+      if numberOfDataSets > 0 and len(definedValues) == numberOfDataSets and definedValues.getNumberOfValues(1) == len(values):
+        if definedValues[1] == list(values): isBroadcast = definedValues.setBroadcast(numberOfDataSets + 1)
+      if not isBroadcast: definedValues[numberOfDataSets + 1] = values
       self.setGraphNodeAttribute(graph, nodeID, 'numberOfDataSets', numberOfDataSets + 1)
 
     # The write mode is either 'replace' or 'append'.  The 'replace' mode will remove any values
@@ -492,9 +788,9 @@ class nodeClass:
   # Replace a nodes values.
   def replaceGraphNodeValues(self, graph, nodeID, values):
 
-    # If replacing the values, the supplied values must be a dictionary.  If not, fail.
+    # If replacing the values, the supplied values must be a dictionary (or a value store).  If not, fail.
     # TODO Sort errors.
-    if type(values) != dict:
+    if type(values) != dict and not isinstance(values, nodeValueStore):
       print('nodeMethods.replaceGraphNodeValues: Values not dict')
       print(values)
       self.errors.terminate()
@@ -509,8 +805,28 @@ class nodeClass:
     self.setGraphNodeAttribute(graph, nodeID, 'values', values)
     self.setGraphNodeAttribute(graph, nodeID, 'numberOfDataSets', numberOfDataSets)
 
-  # Find all of the task nodes in the graph.
+  # Use the values of a node with a single iteration of values for the given number of iterations. The
+  # values are not copied for each iteration (see nodeValueStore).
+  def broadcastGraphNodeValues(self, graph, nodeID, numberOfDataSets):
+    values = self.getGraphNodeAttribute(graph, nodeID, 'values')
+    if not values.setBroadcast(numberOfDataSets):
+      #TODO ERROR
+      print('nodeMethods.broadcastGraphNodeValues: Node', nodeID, 'has multiple iterations of values')
+      self.errors.terminate()
+
+    self.setGraphNodeAttribute(graph, nodeID, 'numberOfDataSets', len(values))
+    self.recordModifiedValues(graph, nodeID)
+
+  # Record that the values of a node have been modified. Pipeline graphs keep a record of these nodes,
+  # so that only the tasks using them need to be updated (see configurationMethods.updateModifiedValues).
+  def recordModifiedValues(self, graph, nodeID):
+    if isinstance(graph, pipelineGraph): graph.setValuesModified(nodeID)
+
+  # Find all of the nodes of a given type in the graph. Pipeline graphs maintain an index of the
+  # node types, so the nodes can be returned without scanning the graph.
   def getNodes(self, graph, nodeType):
+    if isinstance(graph, pipelineGraph): return graph.getNodesOfType(nodeType)
+
     nodeList = []
     for node in graph.nodes(data = False):
       if self.getGraphNodeAttribute(graph, node, 'nodeType') == nodeType: nodeList.append(node)
@@ -520,6 +836,15 @@ class nodeClass:
   # Get the node associated with a tool argument.
   def getNodeForTaskArgument(self, graph, task, argument, nodeType):
     nodeIDs          = []
+
+    # Pipeline graphs index the edges by argument, so only the nodes attached to the task with this
+    # argument need to be checked.
+    if isinstance(graph, pipelineGraph):
+      for nodeID in graph.getNodesForArgument(task, argument):
+        if self.getGraphNodeAttribute(graph, nodeID, 'nodeType') == nodeType: nodeIDs.append(nodeID)
+
+      return nodeIDs
+
     for predecessorEdge in graph.in_edges(task):
       value = self.edgeMethods.getEdgeAttribute(graph, predecessorEdge[0], predecessorEdge[1], 'longFormArgument')
       if value == argument:
@@ -555,6 +880,8 @@ class nodeClass:
 
   # Get all predecessor file nodes for a task.
   def getPredecessorOptionNodes(self, graph, task):
+    if isinstance(graph, pipelineGraph): return graph.getNeighboursOfType(task, 'predecessors', 'option')
+
     optionNodes = []
 
     try: predecessors = graph.predecessors(task)
@@ -570,6 +897,8 @@ class nodeClass:
 
   # Get all successor file nodes for a task.
   def getSuccessorOptionNodes(self, graph, task):
+    if isinstance(graph, pipelineGraph): return graph.getNeighboursOfType(task, 'successors', 'option')
+
     optionNodes = []
 
     try: successors = graph.successors(task)
@@ -585,6 +914,8 @@ class nodeClass:
 
   # Get all predecessor file nodes for a task.
   def getPredecessorFileNodes(self, graph, task):
+    if isinstance(graph, pipelineGraph): return graph.getNeighboursOfType(task, 'predecessors', 'file')
+
     fileNodeIDs = []
 
     try: predecessors = graph.predecessors(task)
@@ -600,6 +931,8 @@ class nodeClass:
 
   # Get all successor file nodes for a task.
   def getSuccessorFileNodes(self, graph, task):
+    if isinstance(graph, pipelineGraph): return graph.getNeighboursOfType(task, 'successors', 'file')
+
     fileNodeIDs = []
 
     try: successors = graph.successors(task)
@@ -615,6 +948,8 @@ class nodeClass:
 
   # Get all successor task nodes for an option/file node.
   def getSuccessorTaskNodes(self, graph, nodeID):
+    if isinstance(graph, pipelineGraph): return graph.getNeighboursOfType(nodeID, 'successors', 'task')
+
     tasks = []
 
     try: successors = graph.successors(nodeID)
@@ -665,12 +1000,26 @@ class nodeClass:
       print(optionNodeID, 'nodeMethods.getAssociatedFileNodeIDs')
       self.errors.terminate()
 
+    # The option node stores the IDs of its file nodes as they are created, renamed and removed, so
+    # there is no need to search the graph. Only return nodes that are still present in the graph.
     fileNodeIDs = []
-    for nodeID in graph.nodes(data = False):
-      if self.getGraphNodeAttribute(graph, nodeID, 'nodeType') == 'file' and nodeID.startswith(optionNodeID + '_'): fileNodeIDs.append(nodeID)
+    for nodeID in self.getGraphNodeAttribute(graph, optionNodeID, 'associatedFileNodes'):
+      if nodeID in graph: fileNodeIDs.append(nodeID)
 
     return fileNodeIDs
 
+  # Update the list of file nodes associated with the option node that a file node belongs to. If
+  # newFileNodeID is None, the file node is removed from the list, otherwise it is replaced.
+  def updateAssociatedFileNode(self, graph, fileNodeID, newFileNodeID = None):
+    optionNodeID = self.getOptionNodeIDFromFileNodeID(fileNodeID)
+    if optionNodeID not in graph or 'attributes' not in graph.node[optionNodeID]: return
+    if graph.node[optionNodeID]['attributes'].nodeType != 'option': return
+
+    fileNodeIDs = graph.node[optionNodeID]['attributes'].associatedFileNodes
+    if fileNodeID in fileNodeIDs:
+      if newFileNodeID == None: fileNodeIDs.remove(fileNodeID)
+      else: fileNodeIDs[fileNodeIDs.index(fileNodeID)] = newFileNodeID
+
   # From a list of node IDs, find a node with a predecessor node. If more than one such node
   # is present in the list, return the first node ID encountered. If there are none, return 
   # a random node ID from the list.
@@ -706,7 +1055,11 @@ class nodeClass:
     if typeToRemove == 'general' or typeToRemove == 'all': nodeIDs += self.getNodes(graph, 'general')
 
     for nodeID in nodeIDs:
-      if self.getGraphNodeAttribute(graph, nodeID, 'isMarkedForRemoval'): graph.remove_node(nodeID)
+      if self.getGraphNodeAttribute(graph, nodeID, 'isMarkedForRemoval'):
+
+        # If a file node is removed, ensure that it is no longer associated with its option node.
+        if self.getGraphNodeAttribute(graph, nodeID, 'nodeType') == 'file': self.updateAssociatedFileNode(graph, nodeID)
+        graph.remove_node(nodeID)
 
   # Rename a node.  This involves creating a new node with the same attributes as the node being
   # removed.  Then reproduce all of the edges, before removing the old node.
@@ -732,6 +1085,9 @@ class nodeClass:
         attributes.shortFormArgument = None
         graph.add_edge(newNodeID, nodeID, attributes = attributes)
 
+    # If this is a file node, update the list of file nodes associated with its option node.
+    if self.getGraphNodeAttribute(graph, originalNodeID, 'nodeType') == 'file': self.updateAssociatedFileNode(graph, originalNodeID, newNodeID)
+
     # Remove the original node.
     graph.remove_node(originalNodeID)
 
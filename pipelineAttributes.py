@@ -183,6 +183,24 @@ class pipelineConfiguration:
     self.filename            = ''
     self.pipelineName        = ''
 
+  # Define the attributes holding the validated pipeline information. These are stored in compiled
+  # snapshots.
+  snapshotAttributes = ['additionalNodes', 'attributes', 'commonNodes', 'evaluateCommands', 'filename', 'greedyTasks',
+                        'hasAdditionalNodes', 'linkedExtension', 'linkedTaskArguments', 'nodeAttributes', 'originatingConfigID',
+                        'originatingEdges', 'pipelineArguments', 'pipelineName', 'pipelineToTaskArgument', 'taskArgument',
+                        'taskAttributes', 'tasksOutputtingToStream', 'unassignedArguments', 'workflow']
+
+  # Get the validated pipeline information for storing in a compiled snapshot.
+  def getSnapshotData(self):
+    snapshotData = {}
+    for attribute in self.snapshotAttributes: snapshotData[attribute] = getattr(self, attribute)
+
+    return snapshotData
+
+  # Set the pipeline information from a compiled snapshot.
+  def loadSnapshotData(self, snapshotData):
+    for attribute in self.snapshotAttributes: setattr(self, attribute, snapshotData[attribute])
+
   # Validate the contents of the tool configuration file.
   def processConfigurationData(self, data, pipeline, toolFiles, allowedCategories, allowTermination):
 
@@ -200,10 +218,15 @@ class pipelineConfiguration:
     success, self.attributes = self.checkGeneralAttributes(pipeline, data)
 
     # Check the 'tasks' section of the configuration file.
+    isCollecting = self.errors.collector != None
     if success: success = self.checkTasks(pipeline, data['tasks'], toolFiles)
+    elif isCollecting and isinstance(data.get('tasks'), dict): self.checkTasks(pipeline, data['tasks'], toolFiles)
 
-    # Check the contents of the nodes section.
+    # Check the contents of the nodes section. If errors are being collected, the tasks and nodes are
+    # checked even if errors were found in the general attributes or tasks, since these checks are
+    # independent. The following checks depend on these, so are only performed if there are no errors.
     if success: success = self.checkNodes(pipeline, data['nodes'])
+    elif isCollecting and isinstance(data.get('nodes'), list): self.checkNodes(pipeline, data['nodes'])
 
     # Check evaluate commands information.
     if success: success = self.checkEvaluateCommands(pipeline)
@@ -225,11 +248,23 @@ class pipelineConfiguration:
     # populated.
     if success: success = self.checkEdgesCanBeConstructed(pipeline)
 
-    # Check that the category to which the pipeline is assigned is valid.
+    # Check that the category to which the pipeline is assigned is valid. This only depends on the general
+    # attributes, so is also checked if errors are being collected.
     if success: success = self.checkCategory(pipeline, allowedCategories)
+    elif isCollecting: self.checkCategory(pipeline, allowedCategories)
 
     return success
 
+  # Process the configuration data for a pipeline, recording any errors in the supplied error collector
+  # (see configurationErrorCollector) rather than terminating. Independent checks (e.g. of each task and
+  # node) are all performed, but checks that depend on information containing errors are not.
+  def validateConfigurationData(self, data, pipeline, toolFiles, allowedCategories, collector, filename = None):
+    collector.setContext(filename, pipeline)
+    self.errors.collector = collector
+    try: return self.processConfigurationData(data, pipeline, toolFiles, allowedCategories, allowTermination = True)
+    except configurationError: return False
+    finally: self.errors.collector = None
+
   def checkGeneralAttributes(self, pipeline, data):
 
     # Set the general tool attributes.
@@ -248,38 +283,43 @@ class pipelineConfiguration:
     # Keep track of the observed required values.
     observedAttributes = {}
 
-    # Loop over all of the attributes in the configuration file.
+    # Loop over all of the attributes in the configuration file. If errors are being collected, each
+    # attribute is checked, even if errors are found in other attributes.
+    success = True
     for attribute in data:
+      try:
+        # If the value is not in the allowedAttributes, it is not an allowed value and execution
+        # should be terminate with an error.
+        if attribute not in allowedAttributes:
+          if self.allowTermination: self.errors.invalidGeneralAttributeInConfigurationFile(pipeline, attribute, allowedAttributes, True)
+          else: return False, attributes
 
-      # If the value is not in the allowedAttributes, it is not an allowed value and execution
-      # should be terminate with an error.
-      if attribute not in allowedAttributes:
-        if self.allowTermination: self.errors.invalidGeneralAttributeInConfigurationFile(pipeline, attribute, allowedAttributes, True)
-        else: return False, attributes
-
-      # Mark this values as having been observed,
-      observedAttributes[attribute] = True
+        # Mark this values as having been observed,
+        observedAttributes[attribute] = True
 
-      # Check that the value given to the attribute is of the correct type. If the value is unicode,
-      # convert to a string first.
-      value = str(data[attribute]) if isinstance(data[attribute], unicode) else data[attribute]
-      if allowedAttributes[attribute][0] != type(value):
-        if self.allowTermination:
-          self.errors.incorrectTypeInPipelineConfigurationFile(pipeline, attribute, value, allowedAttributes[attribute][0], 'general')
-        else: return False, attributes
+        # Check that the value given to the attribute is of the correct type. If the value is unicode,
+        # convert to a string first.
+        value = str(data[attribute]) if isinstance(data[attribute], unicode) else data[attribute]
+        if allowedAttributes[attribute][0] != type(value):
+          if self.allowTermination:
+            self.errors.incorrectTypeInPipelineConfigurationFile(pipeline, attribute, value, allowedAttributes[attribute][0], 'general')
+          else: return False, attributes
 
-      # At this point, the attribute in the configuration file is allowed and of valid type. Check that 
-      # the value itself is valid (if necessary) and store the value.
-      if allowedAttributes[attribute][2]: self.setAttribute(attributes, allowedAttributes[attribute][3], value)
+        # At this point, the attribute in the configuration file is allowed and of valid type. Check that 
+        # the value itself is valid (if necessary) and store the value.
+        if allowedAttributes[attribute][2]: self.setAttribute(attributes, allowedAttributes[attribute][3], value)
+      except configurationError: success = False
 
     # Having parsed all of the general attributes attributes, check that all those that are required
     # are present.
     for attribute in allowedAttributes:
-      if allowedAttributes[attribute][1] and attribute not in observedAttributes:
-        if self.allowTermination: self.errors.missingGeneralAttributeInConfigurationFile(pipeline, attribute, allowedAttributes, True)
-        return False, attributes
+      try:
+        if allowedAttributes[attribute][1] and attribute not in observedAttributes:
+          if self.allowTermination: self.errors.missingGeneralAttributeInConfigurationFile(pipeline, attribute, allowedAttributes, True)
+          return False, attributes
+      except configurationError: success = False
 
-    return True, attributes
+    return success, attributes
 
   # Check the 'tasks' section of the configuration file.
   def checkTasks(self, pipeline, tasks, toolFiles):
@@ -289,56 +329,59 @@ class pipelineConfiguration:
     allowedAttributes['tool']             = (str, True, True, 'tool')
     allowedAttributes['output to stream'] = (bool, False, True, 'outputStream')
 
+    # If errors are being collected, each task is checked, even if errors are found in other tasks.
+    success = True
     for task in tasks:
+      try:
+        # Define the taskAttributes object.
+        attributes = taskAttributes()
 
-      # Define the taskAttributes object.
-      attributes = taskAttributes()
-
-      # Keep track of the observed required values.
-      observedAttributes = {}
+        # Keep track of the observed required values.
+        observedAttributes = {}
 
-      # Check that the task name is accompanied by a dictionary.
-      if not isinstance(tasks[task], dict):
-        if self.allowTermination: self.errors.taskIsNotDictionary(pipeline, task)
-        else: return False
+        # Check that the task name is accompanied by a dictionary.
+        if not isinstance(tasks[task], dict):
+          if self.allowTermination: self.errors.taskIsNotDictionary(pipeline, task)
+          else: return False
 
-      # Loop over the included attributes.
-      for attribute in tasks[task]:
-        if attribute not in allowedAttributes:
-          if self.allowTermination: self.errors.invalidAttributeInTasks(pipeline, task, attribute, allowedAttributes)
-          return False
+        # Loop over the included attributes.
+        for attribute in tasks[task]:
+          if attribute not in allowedAttributes:
+            if self.allowTermination: self.errors.invalidAttributeInTasks(pipeline, task, attribute, allowedAttributes)
+            return False
+
+          # Check that the value given to the attribute is of the correct type. If the value is unicode,
+          # convert to a string first.
+          value = str(tasks[task][attribute]) if isinstance(tasks[task][attribute], unicode) else tasks[task][attribute]
+          if allowedAttributes[attribute][0] != type(value):
+            if self.allowTermination:
+              self.errors.incorrectTypeInPipelineConfigurationFile(pipeline, attribute, value, allowedAttributes[attribute][0], 'tasks')
+            else: return False
 
-        # Check that the value given to the attribute is of the correct type. If the value is unicode,
-        # convert to a string first.
-        value = str(tasks[task][attribute]) if isinstance(tasks[task][attribute], unicode) else tasks[task][attribute]
-        if allowedAttributes[attribute][0] != type(value):
-          if self.allowTermination:
-            self.errors.incorrectTypeInPipelineConfigurationFile(pipeline, attribute, value, allowedAttributes[attribute][0], 'tasks')
-          else: return False
+          # Mark the attribute as seen.
+          observedAttributes[attribute] = True
 
-        # Mark the attribute as seen.
-        observedAttributes[attribute] = True
+          # Store the given attribtue.
+          if allowedAttributes[attribute][2]: self.setAttribute(attributes, allowedAttributes[attribute][3], tasks[task][attribute])
 
-        # Store the given attribtue.
-        if allowedAttributes[attribute][2]: self.setAttribute(attributes, allowedAttributes[attribute][3], tasks[task][attribute])
+        # Having parsed all of the general attributes attributes, check that all those that are required
+        # are present.
+        for attribute in allowedAttributes:
+          if allowedAttributes[attribute][1] and attribute not in observedAttributes:
+            if self.allowTermination: self.errors.missingAttributeInPipelineConfigurationFile(pipeline, attribute, allowedAttributes, 'tasks', None)
+            else: return False
 
-      # Having parsed all of the general attributes attributes, check that all those that are required
-      # are present.
-      for attribute in allowedAttributes:
-        if allowedAttributes[attribute][1] and attribute not in observedAttributes:
-          if self.allowTermination: self.errors.missingAttributeInPipelineConfigurationFile(pipeline, attribute, allowedAttributes, 'tasks', None)
+        # Check that each task has a tool defined and that a tool configuration file exists for this tool.
+        tool = tasks[task]['tool']
+        if tool + '.json' not in toolFiles:
+          if self.allowTermination: self.errors.invalidToolInPipelineConfigurationFile(pipeline, task, tool)
           else: return False
 
-      # Check that each task has a tool defined and that a tool configuration file exists for this tool.
-      tool = tasks[task]['tool']
-      if tool + '.json' not in toolFiles:
-        if self.allowTermination: self.errors.invalidToolInPipelineConfigurationFile(pipeline, task, tool)
-        else: return False
-
-      # Store the attributes for the task.
-      self.taskAttributes[task] = attributes
+        # Store the attributes for the task.
+        self.taskAttributes[task] = attributes
+      except configurationError: success = False
 
-    return True
+    return success
 
   # Check the contents of the nodes section.
   def checkNodes(self, pipeline, nodes):
@@ -358,57 +401,60 @@ class pipelineConfiguration:
     allowedAttributes['short form argument'] = (str, False, True, 'shortFormArgument')
     allowedAttributes['tasks']               = (dict, True, True, 'tasks')
 
-    # Loop over all of the defined nodes.
+    # Loop over all of the defined nodes. If errors are being collected, each node is checked, even if
+    # errors are found in other nodes.
+    success = True
     for node in nodes:
+      try:
+        # Check that node is a dictionary.
+        if not isinstance(node, dict):
+          if self.allowTermination: self.errors.nodeIsNotADictionary(pipeline)
+          else: return False
 
-      # Check that node is a dictionary.
-      if not isinstance(node, dict):
-        if self.allowTermination: self.errors.nodeIsNotADictionary(pipeline)
-        else: return False
-
-      # Define the attributes object.
-      attributes = pipelineNodeAttributes()
-
-      # Keep track of the observed required values.
-      observedAttributes = {}
+        # Define the attributes object.
+        attributes = pipelineNodeAttributes()
 
-      # Check that the node has an ID. This will be used to identify the node in error messages.
-      try: ID = node['ID']
-      except: 
-        if self.allowTermination: self.errors.noIDInPipelineNode(pipeline)
-        else: return False
+        # Keep track of the observed required values.
+        observedAttributes = {}
 
-      # Loop over all attributes in the node.
-      for attribute in node:
-        if attribute not in allowedAttributes:
-          if self.allowTermination: self.errors.invalidAttributeInNodes(pipeline, ID, attribute, allowedAttributes)
+        # Check that the node has an ID. This will be used to identify the node in error messages.
+        try: ID = node['ID']
+        except: 
+          if self.allowTermination: self.errors.noIDInPipelineNode(pipeline)
           else: return False
 
-        # Check that the value given to the attribute is of the correct type. If the value is unicode,
-        # convert to a string first.
-        value = str(node[attribute]) if isinstance(node[attribute], unicode) else node[attribute]
-        if allowedAttributes[attribute][0] != type(value):
-          if self.allowTermination:
-            self.errors.incorrectTypeInPipelineConfigurationFile(pipeline, attribute, value, allowedAttributes[attribute][0], 'nodes')
-          else: return False
+        # Loop over all attributes in the node.
+        for attribute in node:
+          if attribute not in allowedAttributes:
+            if self.allowTermination: self.errors.invalidAttributeInNodes(pipeline, ID, attribute, allowedAttributes)
+            else: return False
 
-        # Mark the attribute as seen.
-        observedAttributes[attribute] = True
+          # Check that the value given to the attribute is of the correct type. If the value is unicode,
+          # convert to a string first.
+          value = str(node[attribute]) if isinstance(node[attribute], unicode) else node[attribute]
+          if allowedAttributes[attribute][0] != type(value):
+            if self.allowTermination:
+              self.errors.incorrectTypeInPipelineConfigurationFile(pipeline, attribute, value, allowedAttributes[attribute][0], 'nodes')
+            else: return False
 
-        # Store the given attribtue.
-        if allowedAttributes[attribute][2]: self.setAttribute(attributes, allowedAttributes[attribute][3], node[attribute])
+          # Mark the attribute as seen.
+          observedAttributes[attribute] = True
 
-      # Having parsed all of the general attributes attributes, check that all those that are required
-      # are present.
-      for attribute in allowedAttributes:
-        if allowedAttributes[attribute][1] and attribute not in observedAttributes:
-          if self.allowTermination: self.errors.missingAttributeInPipelineConfigurationFile(pipeline, attribute, allowedAttributes, 'nodes', ID)
-          else: return False
+          # Store the given attribtue.
+          if allowedAttributes[attribute][2]: self.setAttribute(attributes, allowedAttributes[attribute][3], node[attribute])
 
-      # Store the attributes.
-      self.nodeAttributes[ID] = attributes
+        # Having parsed all of the general attributes attributes, check that all those that are required
+        # are present.
+        for attribute in allowedAttributes:
+          if allowedAttributes[attribute][1] and attribute not in observedAttributes:
+            if self.allowTermination: self.errors.missingAttributeInPipelineConfigurationFile(pipeline, attribute, allowedAttributes, 'nodes', ID)
+            else: return False
 
-    return True
+        # Store the attributes.
+        self.nodeAttributes[ID] = attributes
+      except configurationError: success = False
+
+    return success
 
   # Check evaluate commands information.
   def checkEvaluateCommands(self, pipeline):
@@ -800,12 +846,15 @@ class pipelineConfiguration:
   # Check that the defined category and help group are valid.
   def checkCategory(self, pipeline, allowedCategories):
     categories = self.attributes.categories
+    success    = True
     for category in categories:
-      if category not in allowedCategories:
-        if self.allowTermination: self.errors.invalidCategory(pipeline, category, allowedCategories, True)
-        else: return False
+      try:
+        if category not in allowedCategories:
+          if self.allowTermination: self.errors.invalidCategory(pipeline, category, allowedCategories, True)
+          else: return False
+      except configurationError: success = False
 
-    return True
+    return success
 
   # Set the workflow and the taskAttributes for a tool.
   def definePipelineAttributesForTool(self, name):
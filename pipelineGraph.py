@@ -0,0 +1,240 @@
+#!/bin/bash/python
+
+from __future__ import print_function
+import networkx as nx
+
+import os
+import sys
+
+# Define a directed graph for holding the pipeline. This behaves exactly as a networkx DiGraph,
+# but also maintains indexes of the nodes so that the nodeClass methods can answer common
+# queries without scanning every node in the graph. Graphs that are not pipelineGraphs are
+# still handled by the nodeClass methods, but these fall back to scanning the graph.
+class pipelineGraph(nx.DiGraph):
+  def __init__(self, data = None, **attr):
+
+    # Store all of the nodes in the graph, keyed by the node type ('task', 'option', 'file' or
+    # 'general'). Each node type points to a dictionary of the node IDs of that type. This must
+    # be defined before the graph is initialised, as initialising from existing data adds nodes.
+    self.nodeTypeIndex = {}
+
+    # Cache the neighbours of each node, keyed by the node ID, then by the direction ('predecessors'
+    # or 'successors') and node type of the neighbours. The cached lists for a node are discarded
+    # whenever an edge to or from the node is added or removed.
+    self.neighbourCache = {}
+
+    # Index the edges by the target node and the long form argument associated with the edge. Each
+    # (target node, argument) pair points to a dictionary of the source nodes of these edges, so
+    # that the node supplying a particular task argument can be found without checking every edge.
+    self.argumentIndex = {}
+
+    # Record the nodes whose values have been added or replaced since the record was last reset. The
+    # information derived from node values can then be updated for only the tasks using these nodes.
+    self.modifiedValueNodes = {}
+
+    nx.DiGraph.__init__(self, data, **attr)
+
+  # Add a node to the graph and update the node type index.
+  def add_node(self, n, attr_dict = None, **attr):
+
+    # If the node already exists, its attributes (and so its type) may be replaced, so the cached
+    # neighbours of the nodes it is connected to may no longer be valid.
+    if n in self.succ: self.clearNeighbourCache(n, includeNeighbours = True)
+    nx.DiGraph.add_node(self, n, attr_dict, **attr)
+    self.indexNode(n)
+
+  # Add multiple nodes to the graph and update the node type index.
+  def add_nodes_from(self, nodes, **attr):
+    nodes = list(nodes)
+    for n in nodes:
+      try: nodeID = n if n in self.succ else None
+      except TypeError: nodeID = n[0] if n[0] in self.succ else None
+      if nodeID != None: self.clearNeighbourCache(nodeID, includeNeighbours = True)
+
+    nx.DiGraph.add_nodes_from(self, nodes, **attr)
+    for n in nodes:
+      try: self.indexNode(n)
+      except TypeError: self.indexNode(n[0])
+
+  # Remove a node from the graph and from the node type index.
+  def remove_node(self, n):
+    if n in self.succ:
+      self.clearNeighbourCache(n, includeNeighbours = True)
+      for predecessor in self.pred[n]: self.unindexEdge(predecessor, n)
+      for successor in self.succ[n]: self.unindexEdge(n, successor)
+
+    nx.DiGraph.remove_node(self, n)
+    self.unindexNode(n)
+
+  # Remove multiple nodes from the graph and the node type index.
+  def remove_nodes_from(self, nbunch):
+    for n in nbunch:
+      if n in self.succ: self.remove_node(n)
+
+  # Add an edge to the graph and discard the cached neighbours of both nodes.
+  def add_edge(self, u, v, attr_dict = None, **attr):
+    self.unindexEdge(u, v)
+    nx.DiGraph.add_edge(self, u, v, attr_dict, **attr)
+    self.indexEdge(u, v)
+    self.clearNeighbourCache(u)
+    self.clearNeighbourCache(v)
+
+  # Add multiple edges to the graph.
+  def add_edges_from(self, ebunch, attr_dict = None, **attr):
+    ebunch = list(ebunch)
+    for edge in ebunch: self.unindexEdge(edge[0], edge[1])
+    nx.DiGraph.add_edges_from(self, ebunch, attr_dict, **attr)
+    for edge in ebunch:
+      self.indexEdge(edge[0], edge[1])
+      self.clearNeighbourCache(edge[0])
+      self.clearNeighbourCache(edge[1])
+
+  # Remove an edge from the graph and discard the cached neighbours of both nodes.
+  def remove_edge(self, u, v):
+    self.unindexEdge(u, v)
+    nx.DiGraph.remove_edge(self, u, v)
+    self.clearNeighbourCache(u)
+    self.clearNeighbourCache(v)
+
+  # Remove multiple edges from the graph.
+  def remove_edges_from(self, ebunch):
+    ebunch = list(ebunch)
+    for edge in ebunch: self.unindexEdge(edge[0], edge[1])
+    nx.DiGraph.remove_edges_from(self, ebunch)
+    for edge in ebunch:
+      self.clearNeighbourCache(edge[0])
+      self.clearNeighbourCache(edge[1])
+
+  # Remove all nodes and edges from the graph.
+  def clear(self):
+    nx.DiGraph.clear(self)
+    self.nodeTypeIndex      = {}
+    self.neighbourCache     = {}
+    self.argumentIndex      = {}
+    self.modifiedValueNodes = {}
+
+  # The networkx subgraph method populates the node and edge dictionaries directly, so the indexes
+  # need to be built for the new graph.
+  def subgraph(self, nbunch):
+    graph = nx.DiGraph.subgraph(self, nbunch)
+    graph.rebuildNodeIndex()
+    graph.rebuildArgumentIndex()
+
+    return graph
+
+  # Store a node in the node type index. The node type is determined from the attributes attached
+  # to the node. If no attributes are attached, the node is not indexed.
+  def indexNode(self, n):
+    if n not in self.node: return
+
+    # Remove any existing entry for this node. If the node already existed, the attributes may have
+    # been replaced.
+    self.unindexNode(n)
+    try: nodeType = self.node[n]['attributes'].nodeType
+    except (KeyError, AttributeError): return
+
+    if nodeType not in self.nodeTypeIndex: self.nodeTypeIndex[nodeType] = {}
+    self.nodeTypeIndex[nodeType][n] = True
+
+  # Remove a node from the node type index.
+  def unindexNode(self, n):
+    for nodeType in self.nodeTypeIndex:
+      if n in self.nodeTypeIndex[nodeType]:
+        del self.nodeTypeIndex[nodeType][n]
+        break
+
+  # Rebuild the node type index from scratch.
+  def rebuildNodeIndex(self):
+    self.nodeTypeIndex = {}
+    for n in self.node: self.indexNode(n)
+
+  # Return a list of all the nodes of a given type.
+  def getNodesOfType(self, nodeType):
+    if nodeType not in self.nodeTypeIndex: return []
+    return self.nodeTypeIndex[nodeType].keys()
+
+  # Return a list of the predecessors or successors (defined by direction) of a node that are of
+  # the given node type. The list is cached until the edges of the node are modified.
+  def getNeighboursOfType(self, n, direction, nodeType):
+    try: return list(self.neighbourCache[n][(direction, nodeType)])
+    except KeyError: pass
+
+    try: neighbours = self.pred[n] if direction == 'predecessors' else self.succ[n]
+    except KeyError: raise nx.NetworkXError('The node %s is not in the digraph.' % (n,))
+
+    nodeIDs = []
+    for neighbour in neighbours:
+      try:
+        if self.node[neighbour]['attributes'].nodeType == nodeType: nodeIDs.append(neighbour)
+      except (KeyError, AttributeError): pass
+
+    if n not in self.neighbourCache: self.neighbourCache[n] = {}
+    self.neighbourCache[n][(direction, nodeType)] = nodeIDs
+
+    return list(nodeIDs)
+
+  # Discard the cached neighbours for a node. If includeNeighbours is set, also discard the cached
+  # neighbours of all the nodes connected to this node.
+  def clearNeighbourCache(self, n, includeNeighbours = False):
+    if n in self.neighbourCache: del self.neighbourCache[n]
+    if includeNeighbours and n in self.succ:
+      for neighbour in self.succ[n]:
+        if neighbour in self.neighbourCache: del self.neighbourCache[neighbour]
+      for neighbour in self.pred[n]:
+        if neighbour in self.neighbourCache: del self.neighbourCache[neighbour]
+
+  # Store an edge in the argument index. Edges without attributes, or whose attributes do not
+  # define an argument, are not indexed.
+  def indexEdge(self, u, v):
+    try: argument = self.succ[u][v]['attributes'].longFormArgument
+    except (KeyError, AttributeError): return
+    if argument == None: return
+
+    if (v, argument) not in self.argumentIndex: self.argumentIndex[(v, argument)] = {}
+    self.argumentIndex[(v, argument)][u] = True
+
+  # Remove an edge from the argument index.
+  def unindexEdge(self, u, v):
+    try: argument = self.succ[u][v]['attributes'].longFormArgument
+    except (KeyError, AttributeError): return
+
+    if (v, argument) in self.argumentIndex:
+      sourceNodeIDs = self.argumentIndex[(v, argument)]
+      if u in sourceNodeIDs: del sourceNodeIDs[u]
+      if not sourceNodeIDs: del self.argumentIndex[(v, argument)]
+
+  # Rebuild the argument index from scratch.
+  def rebuildArgumentIndex(self):
+    self.argumentIndex = {}
+    for u in self.succ:
+      for v in self.succ[u]: self.indexEdge(u, v)
+
+  # Return a list of the nodes connected to node n by an edge associated with the given argument.
+  # The nodes are returned in the same order as the predecessors of n. edgeClass.setEdgeAttribute
+  # keeps the index up to date, but the argument could be changed directly on the edge attributes,
+  # so each indexed edge is checked and discarded from the index if the argument no longer matches.
+  def getNodesForArgument(self, n, argument):
+    if (n, argument) not in self.argumentIndex: return []
+    sourceNodeIDs = self.argumentIndex[(n, argument)]
+    for sourceNodeID in sourceNodeIDs.keys():
+      try: isValid = self.succ[sourceNodeID][n]['attributes'].longFormArgument == argument
+      except (KeyError, AttributeError): isValid = False
+      if not isValid: del sourceNodeIDs[sourceNodeID]
+
+    if not sourceNodeIDs:
+      del self.argumentIndex[(n, argument)]
+      return []
+    if len(sourceNodeIDs) == 1: return sourceNodeIDs.keys()
+
+    return [predecessor for predecessor in self.pred[n] if predecessor in sourceNodeIDs]
+
+  # Record that the values of a node have been modified.
+  def setValuesModified(self, n):
+    self.modifiedValueNodes[n] = True
+
+  # Return a list of the nodes whose values have been modified and reset the record.
+  def popModifiedValueNodes(self):
+    nodeIDs                 = self.modifiedValueNodes.keys()
+    self.modifiedValueNodes = {}
+
+    return nodeIDs
@@ -0,0 +1,56 @@
+#!/bin/bash/python
+
+from __future__ import print_function
+
+import os
+import shutil
+import sys
+import tempfile
+import unittest
+
+# Import the modules from the directory above the tests.
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import benchmark
+from benchmark import *
+
+class testSyntheticConfiguration(unittest.TestCase):
+  def setUp(self):
+    self.directory = tempfile.mkdtemp()
+
+  def tearDown(self):
+    shutil.rmtree(self.directory)
+
+  # Generate the configuration files, run the benchmark once and return the number of tasks in the
+  # workflow.
+  def getNumberOfTasks(self, configuration):
+    toolFiles, pipelineFilename = configuration.writeConfigurationFiles(self.directory)
+    results                     = pipelineBenchmark(configuration, 2).getResults(toolFiles, pipelineFilename, 1)
+
+    return results['graph']['tasks']
+
+  # The evaluated commands only use the files of tasks that do not output a filename stub.
+  def testEvaluateCommands(self):
+    for numberOfEvaluateCommands in range(10):
+      configuration = syntheticConfiguration(12, 1, 3, 5, 1, numberOfEvaluateCommands)
+      self.assertEqual(self.getNumberOfTasks(configuration), 13 + numberOfEvaluateCommands)
+
+  # The greedy tasks use the output of the last task in the chain that does not output a filename stub.
+  def testGreedyTasks(self):
+    for numberOfTasks in [1, 2, 3, 47, 48]:
+      configuration = syntheticConfiguration(numberOfTasks, 0, 3, 7, 2, 1)
+      self.assertEqual(self.getNumberOfTasks(configuration), numberOfTasks + 3)
+
+  # Every frequency greater than one includes tasks of that type.
+  def testFrequencies(self):
+    for frequency in [2, 3, 5]:
+      configuration = syntheticConfiguration(10, 0, frequency, 0, 1, 1)
+      self.assertEqual(configuration.getTaskTool(frequency - 1), 'benchmark_stub')
+      self.assertEqual(self.getNumberOfTasks(configuration), 12)
+
+      configuration = syntheticConfiguration(10, 0, 0, frequency, 1, 1)
+      self.assertEqual(configuration.getTaskTool(frequency - 1), 'benchmark_stream')
+      self.assertEqual(self.getNumberOfTasks(configuration), 12)
+
+if __name__ == '__main__':
+  unittest.main()
@@ -0,0 +1,416 @@
+#!/bin/bash/python
+
+from __future__ import print_function
+
+import StringIO
+import json
+import os
+import shutil
+import sys
+import tempfile
+import unittest
+
+# Import the modules from the directory above the tests.
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import networkx as nx
+
+import benchmark
+from benchmark import *
+
+import configurationClass
+from configurationClass import *
+
+class testIncrementalMode(unittest.TestCase):
+
+  # Build a graph with a single task, reading an input file and writing an output file.
+  def buildGraph(self, graph):
+    config = configurationMethods()
+    config.pipeline.workflow = ['task']
+
+    graph.add_node('task', attributes = taskNodeAttributes())
+    for nodeID, isInput in [('INPUT', True), ('OUTPUT', False)]:
+      option        = optionNodeAttributes()
+      option.isFile = True
+      option.values = {1: [nodeID.lower() + '.bam']}
+      graph.add_node(nodeID, attributes = option)
+
+      fileNode        = fileNodeAttributes()
+      fileNode.values = {1: [nodeID.lower() + '.bam']}
+      graph.add_node(nodeID + '_FILE', attributes = fileNode)
+
+      attributes                  = edgeAttributes()
+      attributes.longFormArgument = '--' + nodeID.lower()
+      attributes.isInput          = isInput
+      graph.add_edge(nodeID, 'task', attributes = attributes)
+      if isInput: graph.add_edge(nodeID + '_FILE', 'task', attributes = copy(attributes))
+      else: graph.add_edge('task', nodeID + '_FILE', attributes = copy(attributes))
+
+    config.getNumberOfDataSets(graph)
+
+    return config
+
+  # Replace the values of the input file with two data sets.
+  def modifyInput(self, config, graph):
+    config.nodeMethods.setGraphNodeAttribute(graph, 'INPUT', 'values', {1: ['a.bam'], 2: ['b.bam']})
+    config.nodeMethods.setGraphNodeAttribute(graph, 'INPUT_FILE', 'values', {1: ['a.bam'], 2: ['b.bam']})
+
+  def testPipelineGraph(self):
+    graph  = pipelineGraph()
+    config = self.buildGraph(graph)
+    self.assertTrue(config.setIncrementalMode(graph))
+    self.assertEqual(config.getTaskDependencies(graph, 'task', False, 1), ['input.bam'])
+
+    self.modifyInput(config, graph)
+    self.assertEqual(config.updateModifiedValues(graph), ['task'])
+    self.assertEqual(config.getTaskDependencies(graph, 'task', False, 1), ['a.bam'])
+    self.assertEqual(config.nodeMethods.getGraphNodeAttribute(graph, 'task', 'numberOfDataSets'), 2)
+
+  # Other graphs do not record modified nodes, so nothing is cached and every task is updated.
+  def testOtherGraph(self):
+    graph  = nx.DiGraph()
+    config = self.buildGraph(graph)
+    self.assertFalse(config.setIncrementalMode(graph))
+    self.assertFalse(config.isIncremental)
+    self.assertEqual(config.getTaskDependencies(graph, 'task', False, 1), ['input.bam'])
+
+    self.modifyInput(config, graph)
+    self.assertEqual(config.updateModifiedValues(graph), ['task'])
+    self.assertEqual(config.getTaskDependencies(graph, 'task', False, 1), ['a.bam'])
+    self.assertEqual(config.getTaskDependencies(graph, 'task', False, 2), ['b.bam'])
+    self.assertEqual(config.nodeMethods.getGraphNodeAttribute(graph, 'task', 'numberOfDataSets'), 2)
+
+class testGenerateWorkflow(unittest.TestCase):
+  def setUp(self):
+    self.directory = tempfile.mkdtemp()
+
+  def tearDown(self):
+    shutil.rmtree(self.directory)
+
+  # Build the graph for a synthetic pipeline and return the configuration, graph and workflow.
+  def buildPipeline(self, configuration):
+    directory                   = tempfile.mkdtemp(dir = self.directory)
+    toolFiles, pipelineFilename = configuration.writeConfigurationFiles(directory)
+    config, graph               = pipelineBenchmark(configuration).run(toolFiles, pipelineFilename)
+
+    return config, graph, config.pipeline.workflow
+
+  # Every task is included once and is after all of the tasks that it depends on.
+  def checkOrder(self, config, graph, workflow):
+    tasks = config.nodeMethods.getNodes(graph, 'task')
+    self.assertEqual(sorted(workflow), sorted(tasks))
+
+    position = dict((task, counter) for counter, task in enumerate(workflow))
+    for task in tasks:
+      for nodeID in graph.successors(task):
+        for successorTask in config.nodeMethods.getSuccessorTaskNodes(graph, nodeID): self.assertTrue(position[task] < position[successorTask])
+
+  # Each task outputting to a stream is immediately followed by the task reading the stream.
+  def testStreamingTasksAdjacent(self):
+    for parameters in [(20, 0, 0, 3, 1, 1), (40, 2, 4, 3, 3, 3), (48, 1, 5, 7, 2, 4)]:
+      config, graph, workflow = self.buildPipeline(syntheticConfiguration(*parameters))
+      self.checkOrder(config, graph, workflow)
+
+      streamSuccessors = config.getStreamSuccessors(graph)
+      self.assertTrue(streamSuccessors)
+      for task in streamSuccessors: self.assertEqual(workflow[workflow.index(task) + 1], streamSuccessors[task])
+
+  # Without streams, the workflow is the same as a topological sort of the graph.
+  def testWithoutStreams(self):
+    config, graph, workflow = self.buildPipeline(syntheticConfiguration(30, 1, 4, 0, 2, 3))
+    self.checkOrder(config, graph, workflow)
+    sortedTasks = [nodeID for nodeID in nx.topological_sort(graph) if config.nodeMethods.getGraphNodeAttribute(graph, nodeID, 'nodeType') == 'task']
+    self.assertEqual(workflow, sortedTasks)
+
+  # Build a graph of tasks, each writing a file used by the next task. The last task writes a file used
+  # by the first, so the tasks form a cycle. If isStream is set, the first task outputs to a stream.
+  def buildCycle(self, isStream):
+    graph = pipelineGraph()
+    tasks = ['a', 'b', 'c']
+    for task in tasks:
+      attributes              = taskNodeAttributes()
+      attributes.outputStream = isStream and task == 'a'
+      graph.add_node(task, attributes = attributes)
+
+    for counter, task in enumerate(tasks):
+      graph.add_node(task + '_FILE', attributes = fileNodeAttributes())
+      graph.add_edge(task, task + '_FILE')
+      graph.add_edge(task + '_FILE', tasks[(counter + 1) % len(tasks)])
+
+    return graph
+
+  # A cycle in the graph is an error, whether or not the cycle includes streaming tasks.
+  def testCycle(self):
+    for isStream in [False, True]:
+      config                  = configurationMethods()
+      config.errors.collector = configurationErrorCollector()
+      graph                   = self.buildCycle(isStream)
+      self.assertEqual(config.getStreamSuccessors(graph), {'a': 'b'} if isStream else {})
+
+      # Discard the error message.
+      stdout     = sys.stdout
+      sys.stdout = StringIO.StringIO()
+      try: self.assertRaises(configurationError, config.generateWorkflow, graph)
+      finally: sys.stdout = stdout
+      self.assertEqual([error.code for error in config.errors.collector.errors], ['generateWorkflow'])
+
+class testEvaluateCommands(unittest.TestCase):
+
+  # Return the values of a node with the given values for each data set.
+  def getValues(self, values):
+    attributes        = optionNodeAttributes()
+    attributes.values = values
+
+    return attributes.values
+
+  # Where one ID is a prefix of another, the longest ID is replaced.
+  def testParseEvaluateCommand(self):
+    config = configurationMethods()
+    self.assertEqual(config.parseEvaluateCommand('cat ID1 ID10', ['ID1', 'ID10']), ['cat ', 'ID1', ' ', 'ID10', ''])
+    self.assertEqual(config.parseEvaluateCommand('ID10ID1', ['ID10', 'ID1']), ['', 'ID10', '', 'ID1', ''])
+    self.assertEqual(config.parseEvaluateCommand('wc -l', []), ['wc -l'])
+
+  def testPrefixIDs(self):
+    commandValues = {'ID1': self.getValues({1: ['a.txt']}), 'ID10': self.getValues({1: ['b.txt']})}
+    commands      = configurationMethods().buildEvaluateCommands('cat ID1 ID10 | wc -l', commandValues, 1)
+    self.assertEqual(commands, {1: ['$(cat a.txt b.txt | wc -l)']})
+
+  # Values with a single data set are used for every data set.
+  def testMixedDataSets(self):
+    commandValues         = {}
+    commandValues['A']    = self.getValues({1: ['ref.fa']})
+    commandValues['AB']   = self.getValues({1: ['1.bam'], 2: ['2.bam'], 3: ['3.bam']})
+    commandValues['ABC']  = self.getValues({1: ['x'], 2: ['y'], 3: ['z']})
+    commands              = configurationMethods().buildEvaluateCommands('tool A AB ABC', commandValues, 3)
+    self.assertEqual(commands, {1: ['$(tool ref.fa 1.bam x)'], 2: ['$(tool ref.fa 2.bam y)'], 3: ['$(tool ref.fa 3.bam z)']})
+
+  # Each node must have either one data set or one for every command, with a single value in each.
+  def testInvalidValues(self):
+    for values in [{1: ['1.bam'], 2: ['2.bam']}, {1: ['1.bam', '2.bam']}, {}]:
+      config                  = configurationMethods()
+      config.errors.collector = configurationErrorCollector()
+      commandValues           = {'A': self.getValues({1: ['ref.fa']}), 'B': self.getValues(values)}
+
+      # Discard the error message.
+      stdout     = sys.stdout
+      sys.stdout = StringIO.StringIO()
+      try: self.assertRaises(configurationError, config.buildEvaluateCommands, 'tool A B', commandValues, 3)
+      finally: sys.stdout = stdout
+
+class testExecutionPlan(unittest.TestCase):
+  def setUp(self):
+    self.directory = tempfile.mkdtemp()
+
+  def tearDown(self):
+    shutil.rmtree(self.directory)
+
+  # Build a graph for the workflow a, b, c, d, e, f. Task a streams its output to b, c greedily uses
+  # all of the outputs of b and e uses the outputs of b and d. f also uses the outputs of b, but has
+  # a different number of data sets.
+  def buildGraph(self):
+    config = configurationMethods()
+    config.pipeline.workflow = ['a', 'b', 'c', 'd', 'e', 'f']
+
+    graph = pipelineGraph()
+    for task, numberOfDataSets, isGreedy in [('a', 2, False), ('b', 2, False), ('c', 1, True), ('d', 1, False), ('e', 2, False), ('f', 3, False)]:
+      attributes                  = taskNodeAttributes()
+      attributes.numberOfDataSets = numberOfDataSets
+      attributes.isGreedy         = isGreedy
+      graph.add_node(task, attributes = attributes)
+
+    for task, successorTasks, isStreaming in [('a', ['b'], True), ('b', ['c', 'e', 'f'], False), ('d', ['e'], False)]:
+      attributes             = fileNodeAttributes()
+      attributes.isStreaming = isStreaming
+      graph.add_node(task + '_FILE', attributes = attributes)
+      graph.add_edge(task, task + '_FILE')
+      for successorTask in successorTasks: graph.add_edge(task + '_FILE', successorTask)
+
+    return config, graph
+
+  def testPlan(self):
+    config, graph = self.buildGraph()
+    plan          = config.getExecutionPlan(graph)
+    self.assertEqual(plan['groups'], [['a', 'b'], ['c'], ['d'], ['e'], ['f']])
+    self.assertEqual(plan['dependencies'], [[], [0], [], [0, 2], [0]])
+    self.assertEqual(plan['levels'], [[0, 2], [1, 3, 4]])
+    self.assertEqual(plan['criticalPath'], ['a', 'b', 'c'])
+
+    # The greedy group and the group with a different number of data sets depend on every iteration of
+    # the stream group. A group with a single iteration is a dependency of every iteration.
+    jobs = []
+    jobs.append((0, 1, []))
+    jobs.append((0, 2, []))
+    jobs.append((1, 1, [(0, 1), (0, 2)]))
+    jobs.append((2, 1, []))
+    jobs.append((3, 1, [(0, 1), (2, 1)]))
+    jobs.append((3, 2, [(0, 2), (2, 1)]))
+    for iteration in range(1, 4): jobs.append((4, iteration, [(0, 1), (0, 2)]))
+    self.assertEqual(plan['jobs'], jobs)
+
+  # The critical path is the most costly chain of groups.
+  def testTaskCosts(self):
+    config, graph = self.buildGraph()
+    self.assertEqual(config.getExecutionPlan(graph, {'d': 5})['criticalPath'], ['d', 'e'])
+    self.assertEqual(config.getExecutionPlan(graph)['criticalPath'], ['a', 'b', 'c'])
+
+  def testWriteExecutionPlan(self):
+    config, graph = self.buildGraph()
+    filename      = os.path.join(self.directory, 'plan.json')
+    config.writeExecutionPlan(graph, filename)
+    with open(filename) as planFile: plan = json.load(planFile)
+    self.assertEqual(plan['groups'], [['a', 'b'], ['c'], ['d'], ['e'], ['f']])
+    self.assertEqual(plan['jobs'][2], [1, 1, [[0, 1], [0, 2]]])
+
+  def testEmptyWorkflow(self):
+    plan = configurationMethods().getExecutionPlan(pipelineGraph())
+    self.assertEqual((plan['groups'], plan['levels'], plan['criticalPath'], plan['jobs']), ([], [], [], []))
+
+class testValidateConfigurationFiles(unittest.TestCase):
+  def setUp(self):
+    self.directory = tempfile.mkdtemp()
+
+  def tearDown(self):
+    shutil.rmtree(self.directory)
+
+  # Build the description of a tool argument.
+  def buildArgument(self, argument, extension):
+    description                          = {}
+    description['command line argument'] = argument
+    description['data type']             = 'string'
+    description['description']           = argument
+    description['extensions']            = [extension]
+    description['long form argument']    = argument
+
+    return description
+
+  # Build a valid tool configuration.
+  def buildTool(self, tool):
+    data                   = {}
+    data['arguments']      = {'inputs': [self.buildArgument('--in', '.bam')], 'outputs': [self.buildArgument('--out', '.bam')]}
+    data['categories']     = ['General']
+    data['description']    = tool
+    data['executable']     = tool
+    data['help']           = '--help'
+    data['id']             = tool
+    data['parameter sets'] = []
+    data['path']           = tool
+    data['tools']          = []
+
+    return data
+
+  # Write configuration data to a file and return the filename.
+  def writeFile(self, name, data):
+    filename = os.path.join(self.directory, name + '.json')
+    with open(filename, 'w') as configurationFile: json.dump(data, configurationFile)
+
+    return filename
+
+  def testValidFiles(self):
+    filename  = self.writeFile('tool', self.buildTool('tool'))
+    collector = configurationMethods().validateConfigurationFiles([('tool', filename)], [], ['General'])
+    self.assertFalse(collector.hasErrors())
+
+  # All of the independent errors in a file are reported, not just the first.
+  def testMultipleErrorsInToolFile(self):
+    data = self.buildTool('tool')
+    data['colour']      = 'blue'
+    data['categories']  = ['Unknown']
+    data['description'] = ['not a string']
+    del data['arguments']['inputs'][0]['description']
+    data['arguments']['outputs'][0]['size'] = 1
+    filename = self.writeFile('tool', data)
+
+    collector = configurationMethods().validateConfigurationFiles([('tool', filename)], [], ['General'])
+    errors    = [(error.code, error.argument) for error in collector.errors]
+    self.assertEqual(len(errors), 5)
+    self.assertTrue(('invalidGeneralAttributeInConfigurationFile', None) in errors)
+    self.assertTrue(('incorrectTypeInToolConfigurationFile', None) in errors)
+    self.assertTrue(('missingArgumentAttributeInToolConfigurationFile', '--in') in errors)
+    self.assertTrue(('invalidArgumentAttributeInToolConfigurationFile', '--out') in errors)
+    self.assertTrue(('invalidCategory', None) in errors)
+    self.assertEqual(set([error.filename for error in collector.errors]), set([filename]))
+
+  def testMultipleErrorsInPipelineFile(self):
+    toolFilename = self.writeFile('tool', self.buildTool('tool'))
+
+    data                   = {}
+    data['categories']     = ['General']
+    data['description']    = 'pipeline'
+    data['parameter sets'] = []
+    data['tasks']          = {'first': {'tool': 'tool', 'colour': 'blue'}, 'second': {'tool': 'missing'}}
+    data['nodes']          = [{'ID': 'node', 'tasks': {'first': '--in'}}]
+    filename               = self.writeFile('pipeline', data)
+
+    collector = configurationMethods().validateConfigurationFiles([('tool', toolFilename)], [('pipeline', filename)], ['General'])
+    codes     = sorted([error.code for error in collector.errors])
+    self.assertEqual(codes, ['invalidAttributeInTasks', 'invalidToolInPipelineConfigurationFile', 'missingAttributeInPipelineConfigurationFile'])
+
+class testGraphTemplates(unittest.TestCase):
+  def setUp(self):
+    self.directory = tempfile.mkdtemp()
+    configurationMethods().clearGraphTemplates()
+
+  def tearDown(self):
+    shutil.rmtree(self.directory)
+    configurationMethods().clearGraphTemplates()
+
+  # Read the configuration files, build the pipeline graph (using a stored template if available) and
+  # return the workflow, dependencies and files to delete.
+  def runPipeline(self, configuration, toolFiles, pipelineFilename):
+    config = configurationMethods()
+    for tool, filename in toolFiles:
+      config.tools.processConfigurationData(tool, config.fileOperations.readConfigurationFile(filename), ['General'], True)
+    data = config.fileOperations.readConfigurationFile(pipelineFilename)
+    config.pipeline.processConfigurationData(data, 'benchmark', [os.path.basename(filename) for tool, filename in toolFiles], ['General'], True)
+    config.pipeline.checkCommonNodes(config.tools)
+
+    config.isPipeline = True
+    graph             = pipelineGraph()
+    sourceFiles       = [filename for tool, filename in toolFiles] + [pipelineFilename]
+    config.buildPipelineGraph(graph, sorted(config.pipeline.taskAttributes.keys()), sourceFiles)
+    config.nodeMethods.getPipelineArgumentNodes(graph, config)
+    config.connectPipelineArgumentsFromAdditionalNodes(graph)
+    config.pipeline.workflow = config.correctWorkflowForStreams(graph, config.generateWorkflow(graph))
+    config.nodeMethods.setRequiredNodes(graph, config.tools, config.pipeline.workflow)
+    config.identifyStreamingNodes(graph)
+
+    pipelineBenchmark(configuration, 2).attachValues(config, graph)
+    config.evaluateCommands(graph)
+    config.checkRequiredFiles(graph, benchmarkGkno())
+    config.getNumberOfDataSets(graph)
+    deleteList = config.setWhenToDeleteFiles(graph, config.getGraphIntermediateFiles(graph, config.pipeline.workflow))
+
+    return config.pipeline.workflow, config.getGraphDependencies(graph, config.pipeline.workflow, 'all'), deleteList
+
+  # The graph built for the first run and the copies of the template used for later runs give the same
+  # workflow, dependencies and files to delete.
+  def testCopiesMatchBuild(self):
+    configuration               = syntheticConfiguration(40, 2, 4, 3, 3, 3)
+    toolFiles, pipelineFilename = configuration.writeConfigurationFiles(self.directory)
+    built                       = self.runPipeline(configuration, toolFiles, pipelineFilename)
+    self.assertEqual(len(configurationClass.graphTemplates), 1)
+    self.assertEqual(self.runPipeline(configuration, toolFiles, pipelineFilename), built)
+    self.assertEqual(self.runPipeline(configuration, toolFiles, pipelineFilename), built)
+
+  # Only a limited number of templates are stored, and the least recently used is discarded first.
+  def testTemplateLimit(self):
+    graphTemplateSize                    = configurationClass.graphTemplateSize
+    configurationClass.graphTemplateSize = 2
+    try:
+      pipelines = {}
+      for numberOfTasks in [2, 3, 2, 4]:
+        if numberOfTasks not in pipelines:
+          configuration            = syntheticConfiguration(numberOfTasks, 0, 0, 0, 0, 0)
+          directory                = os.path.join(self.directory, str(numberOfTasks))
+          os.mkdir(directory)
+          pipelines[numberOfTasks] = (configuration,) + configuration.writeConfigurationFiles(directory)
+        self.runPipeline(*pipelines[numberOfTasks])
+      self.assertEqual([len(key[1]) for key in configurationClass.graphTemplates], [2, 4])
+
+      config = configurationMethods()
+      config.clearGraphTemplates()
+      self.assertEqual(len(configurationClass.graphTemplates), 0)
+    finally: configurationClass.graphTemplateSize = graphTemplateSize
+
+if __name__ == '__main__':
+  unittest.main()
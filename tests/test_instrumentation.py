@@ -0,0 +1,65 @@
+#!/bin/bash/python
+
+from __future__ import print_function
+
+import os
+import sys
+import unittest
+
+# Import the modules from the directory above the tests.
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import instrumentation
+from instrumentation import *
+
+class testInstrumentation(unittest.TestCase):
+  def setUp(self):
+    self.collector = instrumentation()
+    self.collector.reset()
+
+  def tearDown(self):
+    self.collector.disable()
+    self.collector.reset()
+
+  # Build a graph with two option nodes, one of which is marked for removal.
+  def buildGraph(self):
+    graph = pipelineGraph()
+    for nodeID, isMarkedForRemoval in [('keep', False), ('remove', True)]:
+      attributes                    = optionNodeAttributes()
+      attributes.isMarkedForRemoval = isMarkedForRemoval
+      graph.add_node(nodeID, attributes = attributes)
+
+    return graph
+
+  # Enabling the instrumentation a second time does not instrument the methods again.
+  def testEnableTwice(self):
+    original = nodeClass.__dict__['purgeNodeMarkedForRemoval']
+    addNode  = pipelineGraph.__dict__['add_node']
+    self.collector.enable()
+    instrumented = nodeClass.__dict__['purgeNodeMarkedForRemoval']
+    self.collector.enable()
+    self.assertTrue(nodeClass.__dict__['purgeNodeMarkedForRemoval'] is instrumented)
+
+    graph = self.buildGraph()
+    nodeClass().purgeNodeMarkedForRemoval(graph)
+    self.assertEqual(graph.nodes(), ['keep'])
+
+    report = self.collector.getReport()
+    self.assertEqual(report['spans']['purgeNodeMarkedForRemoval']['calls'], 1)
+    self.assertEqual(report['counters']['nodesPurged'], 1)
+
+    # Disabling the instrumentation restores the original methods.
+    self.collector.disable()
+    self.assertFalse(self.collector.isEnabled())
+    self.assertTrue(nodeClass.__dict__['purgeNodeMarkedForRemoval'] is original)
+    self.assertTrue(pipelineGraph.__dict__['add_node'] is addNode)
+
+  # The recorded information is shared by all instrumentation objects.
+  def testSharedState(self):
+    instrumentation().enable()
+    self.assertTrue(self.collector.isEnabled())
+    nodeClass().purgeNodeMarkedForRemoval(self.buildGraph())
+    self.assertEqual(self.collector.getReport()['counters']['nodesPurged'], 1)
+
+if __name__ == '__main__':
+  unittest.main()
@@ -0,0 +1,125 @@
+#!/bin/bash/python
+
+from __future__ import print_function
+
+import os
+import pickle
+import sys
+import unittest
+from copy import copy
+
+# Import the modules from the directory above the tests.
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import edgeAttributes
+from edgeAttributes import *
+
+import nodeAttributes
+from nodeAttributes import *
+
+import pipelineGraph
+from pipelineGraph import *
+
+class testAttributePickling(unittest.TestCase):
+
+  # Build a small graph with a task, option and file node, with some attributes set and others left
+  # at their defaults.
+  def buildGraph(self):
+    graph = pipelineGraph()
+
+    task      = taskNodeAttributes()
+    task.tool = 'tool'
+    graph.add_node('task', attributes = task)
+
+    option                     = optionNodeAttributes()
+    option.isFile              = True
+    option.associatedFileNodes = ['file']
+    option.values              = {1: ['a.bam'], 2: ['b.bam']}
+    graph.add_node('option', attributes = option)
+
+    fileNode        = fileNodeAttributes()
+    fileNode.values = {1: ['a.bam']}
+    graph.add_node('file', attributes = fileNode)
+
+    attributes                  = edgeAttributes()
+    attributes.longFormArgument = '--in'
+    attributes.isInput          = True
+    graph.add_edge('option', 'task', attributes = attributes)
+
+    return graph
+
+  def testAttributesRoundTrip(self):
+    for protocol in range(pickle.HIGHEST_PROTOCOL + 1):
+      option                    = optionNodeAttributes()
+      option.isRequired         = True
+      option.values             = {1: ['x']}
+      option.allowedExtensions.append('bam')
+      loaded = pickle.loads(pickle.dumps(option, protocol))
+      self.assertEqual(loaded.isRequired, True)
+      self.assertEqual(loaded.isFile, False)
+      self.assertEqual(loaded.allowedExtensions, ['bam'])
+      self.assertEqual(loaded.values, {1: ['x']})
+      self.assertEqual(loaded.nodeType, 'option')
+
+      attributes                  = edgeAttributes()
+      attributes.longFormArgument = '--out'
+      loaded                      = pickle.loads(pickle.dumps(attributes, protocol))
+      self.assertEqual(loaded.longFormArgument, '--out')
+      self.assertEqual(loaded.includeOnCommandLine, True)
+
+  def testGraphRoundTrip(self):
+    graph = self.buildGraph()
+    for protocol in range(pickle.HIGHEST_PROTOCOL + 1):
+      loaded = pickle.loads(pickle.dumps(graph, protocol))
+      self.assertEqual(sorted(loaded.nodes()), ['file', 'option', 'task'])
+      self.assertEqual(loaded.node['task']['attributes'].tool, 'tool')
+      self.assertEqual(loaded.node['task']['attributes'].delimiter, ' ')
+      self.assertEqual(loaded.node['option']['attributes'].values, {1: ['a.bam'], 2: ['b.bam']})
+      self.assertEqual(loaded.node['file']['attributes'].values[1], ['a.bam'])
+      self.assertEqual(loaded['option']['task']['attributes'].longFormArgument, '--in')
+      self.assertEqual(loaded.getNodesForArgument('task', '--in'), ['option'])
+
+  # Defaults are shared, but setting an attribute only changes the node it is set on.
+  def testSharedDefaults(self):
+    first  = optionNodeAttributes()
+    second = optionNodeAttributes()
+    first.isRequired = True
+    first.allowedExtensions.append('bam')
+    self.assertEqual(second.isRequired, False)
+    self.assertEqual(second.allowedExtensions, [])
+    self.assertRaises(AttributeError, getattr, first, 'notAnAttribute')
+
+    attributes         = edgeAttributes()
+    attributes.isInput = True
+    duplicate          = copy(attributes)
+    duplicate.isInput  = False
+    self.assertEqual(attributes.isInput, True)
+    self.assertEqual(duplicate.isGreedy, False)
+
+class testNodeValueStore(unittest.TestCase):
+
+  # Changes made in place to the values of an iteration are written back to the store.
+  def testInPlaceChanges(self):
+    option        = optionNodeAttributes()
+    option.values = {1: ['a'], 2: ['b', 'c']}
+    values        = option.values
+    values[1].append('z')
+    option.values[2][0] = 'B'
+    self.assertEqual(option.values, {1: ['a', 'z'], 2: ['B', 'c']})
+
+    del option.values[2][0:1]
+    option.values[1].sort(reverse = True)
+    self.assertEqual(option.values[1], ['z', 'a'])
+    self.assertEqual(option.values[2], ['c'])
+    self.assertEqual(type(copy(option.values[1])), list)
+
+  # Modifying one iteration of broadcast values only changes that iteration.
+  def testBroadcastChanges(self):
+    fileNode        = fileNodeAttributes()
+    fileNode.values = {1: ['a.bam']}
+    fileNode.values.setBroadcast(3)
+    fileNode.values[3].append('b.bam')
+    self.assertEqual(fileNode.values, {1: ['a.bam'], 2: ['a.bam'], 3: ['a.bam', 'b.bam']})
+
+if __name__ == '__main__':
+  unittest.main()
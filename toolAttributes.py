@@ -7,7 +7,14 @@ from copy import deepcopy
 import configurationClassErrors
 from configurationClassErrors import *
 
+import edgeAttributes
+from edgeAttributes import *
+
+import fileOperations
+from fileOperations import *
+
 import json
+import multiprocessing
 import os
 import sys
 
@@ -195,6 +202,15 @@ class toolConfiguration:
     self.longFormArguments  = {}
     self.shortFormArguments = {}
 
+    # Store the edge attributes for each tool argument. These depend only on the tool configuration,
+    # so are built once the tool has been processed and copied whenever an edge is added to the graph.
+    self.edgeTemplates = {}
+
+    # Store the tools whose configuration files have been registered, but not yet read. Each tool
+    # points to a tuple containing the configuration filename and the allowed categories. In lazy
+    # mode, a tool is only read and validated the first time information about it is requested.
+    self.lazyTools = {}
+
     # Define the errors class for handling errors.
     self.errors = configurationClassErrors()
 
@@ -226,8 +242,11 @@ class toolConfiguration:
     # Check the general tool information.
     success, self.attributes[tool] = self.checkGeneralAttributes(tool, data)
 
-    # Check the validity of all of the supplied arguments.
+    # Check the validity of all of the supplied arguments. If errors are being collected, the arguments
+    # are checked even if there are errors in the general attributes, since these checks are independent.
+    # The following checks depend on both, so are only performed if there are no errors.
     if success: success = self.checkToolArguments(tool, data['arguments'])
+    elif self.errors.collector and isinstance(data.get('arguments'), dict): self.checkToolArguments(tool, data['arguments'])
 
     # Check general and argument attribute dependencies.
     if success: success = self.checkAttributeDependencies(tool)
@@ -264,11 +283,26 @@ class toolConfiguration:
     # that they use.
     if success: success = self.connectArguments(tool)
 
-    # Check that the category to which the tool is assigned is valid.
+    # Check that the category to which the tool is assigned is valid. This only depends on the general
+    # attributes, so is also checked if errors are being collected.
     if success: success = self.checkCategory(tool, allowedCategories)
+    elif self.errors.collector: self.checkCategory(tool, allowedCategories)
+
+    # Build the edge attributes for all of the tool arguments.
+    if success: self.buildEdgeTemplates(tool)
 
     return success
 
+  # Process the configuration data for a tool, recording any errors in the supplied error collector
+  # (see configurationErrorCollector) rather than terminating. Independent checks (e.g. of each argument)
+  # are all performed, but checks that depend on information containing errors are not.
+  def validateConfigurationData(self, tool, data, allowedCategories, collector, filename = None):
+    collector.setContext(filename, tool)
+    self.errors.collector = collector
+    try: return self.processConfigurationData(tool, data, allowedCategories, allowTermination = True)
+    except configurationError: return False
+    finally: self.errors.collector = None
+
   # Check and store the top level tool attibutes.
   def checkGeneralAttributes(self, tool, data):
 
@@ -301,38 +335,43 @@ class toolConfiguration:
     # Keep track of the observed required values.
     observedAttributes = {}
 
-    # Loop over all of the attributes in the configuration file.
+    # Loop over all of the attributes in the configuration file. If errors are being collected, each
+    # attribute is checked, even if errors are found in other attributes.
+    success = True
     for attribute in data:
+      try:
+        # If the value is not in the allowedAttributes, it is not an allowed value and execution
+        # should be terminate with an error.
+        if attribute not in allowedAttributes:
+          if self.allowTermination: self.errors.invalidGeneralAttributeInConfigurationFile(tool, attribute, allowedAttributes, False)
+          else: return False, attributes
 
-      # If the value is not in the allowedAttributes, it is not an allowed value and execution
-      # should be terminate with an error.
-      if attribute not in allowedAttributes:
-        if self.allowTermination: self.errors.invalidGeneralAttributeInConfigurationFile(tool, attribute, allowedAttributes, False)
-        else: return False, attributes
-
-      # Mark this values as having been observed,
-      observedAttributes[attribute] = True
+        # Mark this values as having been observed,
+        observedAttributes[attribute] = True
 
-      # Check that the value given to the attribute is of the correct type. If the value is unicode,
-      # convert to a string first.
-      value = str(data[attribute]) if isinstance(data[attribute], unicode) else data[attribute]
-      if allowedAttributes[attribute][0] != type(value):
-        if self.allowTermination:
-          self.errors.incorrectTypeInToolConfigurationFile(tool, '', attribute, None, value, allowedAttributes[attribute][0])
-        else: return False, attributes
+        # Check that the value given to the attribute is of the correct type. If the value is unicode,
+        # convert to a string first.
+        value = str(data[attribute]) if isinstance(data[attribute], unicode) else data[attribute]
+        if allowedAttributes[attribute][0] != type(value):
+          if self.allowTermination:
+            self.errors.incorrectTypeInToolConfigurationFile(tool, '', attribute, None, value, allowedAttributes[attribute][0])
+          else: return False, attributes
 
-      # At this point, the attribute in the configuration file is allowed and of valid type. Check that 
-      # the value itself is valid (if necessary) and store the value.
-      if allowedAttributes[attribute][2]: self.setAttribute(attributes, tool, allowedAttributes[attribute][3], value)
+        # At this point, the attribute in the configuration file is allowed and of valid type. Check that 
+        # the value itself is valid (if necessary) and store the value.
+        if allowedAttributes[attribute][2]: self.setAttribute(attributes, tool, allowedAttributes[attribute][3], value)
+      except configurationError: success = False
 
     # Having parsed all of the general attributes attributes, check that all those that are required
     # are present.
     for attribute in allowedAttributes:
-      if allowedAttributes[attribute][1] and attribute not in observedAttributes:
-        if self.allowTermination: self.errors.missingGeneralAttributeInConfigurationFile(tool, attribute, allowedAttributes, False)
-        else: return False, attributes
+      try:
+        if allowedAttributes[attribute][1] and attribute not in observedAttributes:
+          if self.allowTermination: self.errors.missingGeneralAttributeInConfigurationFile(tool, attribute, allowedAttributes, False)
+          else: return False, attributes
+      except configurationError: success = False
 
-    return True, attributes
+    return success, attributes
 
   # Check that all the supplied arguments are valid and complete.
   def checkToolArguments(self, tool, arguments):
@@ -347,95 +386,108 @@ class toolConfiguration:
     # file author is free to title any other groups as they see fit.
 
     # Start by checking the 'inputs'.
+    success = True
     try: validateArguments = arguments.pop('inputs')
-    except: self.errors.missingRequiredArgumentGroup(tool, True)
+    except: success, validateArguments = self.missingArgumentGroup(tool), []
 
     # Set any additional fields that are valid for this group.
     allowedAttributes = self.setAllowedArgumentAttributes('inputs')
-    success           = self.checkArgumentGroup(tool, 'inputs', validateArguments, allowedAttributes, observedShortForms)
+    success           = self.checkArgumentGroup(tool, 'inputs', validateArguments, allowedAttributes, observedShortForms) and success
 
     # Next check the 'outputs'.
     try: validateArguments = arguments.pop('outputs')
-    except: self.errors.missingRequiredArgumentGroup(tool, True)
+    except: success, validateArguments = self.missingArgumentGroup(tool), []
 
     # Set any additional fields that are valid for this group.
     allowedAttributes = self.setAllowedArgumentAttributes('outputs')
-    sucess            = self.checkArgumentGroup(tool, 'outputs', validateArguments, allowedAttributes, observedShortForms)
+    success           = self.checkArgumentGroup(tool, 'outputs', validateArguments, allowedAttributes, observedShortForms) and success
 
     # Now set all of the other arguments from user defined argument groups.
     for argumentGroup in arguments.keys():
       allowedAttributes = self.setAllowedArgumentAttributes(str(argumentGroup))
-      success           = self.checkArgumentGroup(tool, argumentGroup, arguments.pop(argumentGroup), allowedAttributes, observedShortForms)
+      success           = self.checkArgumentGroup(tool, argumentGroup, arguments.pop(argumentGroup), allowedAttributes, observedShortForms) and success
 
     return success
 
-  # Validate the argument group.
-  def checkArgumentGroup(self, tool, group, arguments, allowedAttributes, observedShortForms):
-    for argumentDescription in arguments:
+  # Report a missing required argument group. If errors are being collected, the error is recorded and
+  # the remaining argument groups are still checked.
+  def missingArgumentGroup(self, tool):
+    try: self.errors.missingRequiredArgumentGroup(tool, True)
+    except configurationError: pass
 
-      # Keep track of the observed attributes.
-      observedAttributes = {}
+    return False
 
-      # First check that the argument defines a dictionary of values.
-      if not isinstance(argumentDescription, dict): self.errors.toolArgumentHasNoDictionary(tool)
+  # Validate the argument group.
+  def checkArgumentGroup(self, tool, group, arguments, allowedAttributes, observedShortForms):
 
-      # First get the 'long form' for this argument. This will be used to identify the argument in error messages and
-      # will be used as the key when storing attributes in a dictionary.
-      try: longFormArgument = argumentDescription['long form argument']
-      except:
-        if self.allowTermination: self.errors.noLongFormForToolArgument(tool, group)
-        else: return False
+    # If errors are being collected, each argument is checked, even if errors are found in other arguments.
+    success = True
+    for argumentDescription in arguments:
+      try:
+        # Keep track of the observed attributes.
+        observedAttributes = {}
+
+        # First check that the argument defines a dictionary of values.
+        if not isinstance(argumentDescription, dict): self.errors.toolArgumentHasNoDictionary(tool)
+
+        # First get the 'long form' for this argument. This will be used to identify the argument in error messages and
+        # will be used as the key when storing attributes in a dictionary.
+        try: longFormArgument = argumentDescription['long form argument']
+        except:
+          if self.allowTermination: self.errors.noLongFormForToolArgument(tool, group)
+          else: return False
 
-      # Check that this argument is unique.
-      if longFormArgument in self.argumentAttributes[tool]:
-        if self.allowTermination: self.errors.repeatedToolArgumentInToolConfigurationFile(tool, longFormArgument, isLongForm = True)
-        else: return False
+        # Check that this argument is unique.
+        if longFormArgument in self.argumentAttributes[tool]:
+          if self.allowTermination: self.errors.repeatedToolArgumentInToolConfigurationFile(tool, longFormArgument, isLongForm = True)
+          else: return False
 
-      # Initialise the data structure for holding the argument information.
-      attributes = argumentAttributes()
+        # Initialise the data structure for holding the argument information.
+        attributes = argumentAttributes()
 
-      # Store the long and short form arguments. If these aren't included, the routine will fail at the final check
-      # since these are required argument. If the value is already included, fail.
-      if 'short form argument' in argumentDescription:
-        shortFormArgument = argumentDescription['short form argument']
-        if shortFormArgument in observedShortForms:
-          if self.allowTermination: self.errors.repeatedToolArgumentInToolConfigurationFile(tool, shortFormArgument, isLongForm = False)
-          else: return False
-        else: observedShortForms[shortFormArgument] = True
+        # Store the long and short form arguments. If these aren't included, the routine will fail at the final check
+        # since these are required argument. If the value is already included, fail.
+        if 'short form argument' in argumentDescription:
+          shortFormArgument = argumentDescription['short form argument']
+          if shortFormArgument in observedShortForms:
+            if self.allowTermination: self.errors.repeatedToolArgumentInToolConfigurationFile(tool, shortFormArgument, isLongForm = False)
+            else: return False
+          else: observedShortForms[shortFormArgument] = True
 
-      # Loop over all entries in the argument description, checking that the attributes are allowed and valid.
-      for attribute in argumentDescription:
-        if attribute not in allowedAttributes:
-          if self.allowTermination: self.errors.invalidArgumentAttributeInToolConfigurationFile(tool, group, longFormArgument, attribute, allowedAttributes)
-          else: return False
+        # Loop over all entries in the argument description, checking that the attributes are allowed and valid.
+        for attribute in argumentDescription:
+          if attribute not in allowedAttributes:
+            if self.allowTermination: self.errors.invalidArgumentAttributeInToolConfigurationFile(tool, group, longFormArgument, attribute, allowedAttributes)
+            else: return False
 
-        # Mark the attribute as observed.
-        observedAttributes[attribute] = True
+          # Mark the attribute as observed.
+          observedAttributes[attribute] = True
 
-        # Check that the value given to the attribute is of the correct type. If the value is unicode,
-        # convert to a string first.
-        value = str(argumentDescription[attribute]) if isinstance(argumentDescription[attribute], unicode) else argumentDescription[attribute]
-        if allowedAttributes[attribute][0] != type(value):
-          if self.allowTermination:
-            self.errors.incorrectTypeInToolConfigurationFile(tool, group, attribute, longFormArgument, value, allowedAttributes[attribute][0])
-          else: return False
+          # Check that the value given to the attribute is of the correct type. If the value is unicode,
+          # convert to a string first.
+          value = str(argumentDescription[attribute]) if isinstance(argumentDescription[attribute], unicode) else argumentDescription[attribute]
+          if allowedAttributes[attribute][0] != type(value):
+            if self.allowTermination:
+              self.errors.incorrectTypeInToolConfigurationFile(tool, group, attribute, longFormArgument, value, allowedAttributes[attribute][0])
+            else: return False
 
-        # Store the information in the attributes structure.
-        self.setAttribute(attributes, tool, allowedAttributes[attribute][2], value)
+          # Store the information in the attributes structure.
+          self.setAttribute(attributes, tool, allowedAttributes[attribute][2], value)
 
-      # Set additional attributes depending on the argument group.
-      attributes = self.setAdditionalArgumentAttributes(tool, group, attributes)
+        # Set additional attributes depending on the argument group.
+        attributes = self.setAdditionalArgumentAttributes(tool, group, attributes)
 
-      # Check if any required arguments are missing.
-      for attribute in allowedAttributes:
-        if allowedAttributes[attribute][1] and attribute not in observedAttributes:
-          if self.allowTermination: self.errors.missingArgumentAttributeInToolConfigurationFile(tool, group, longFormArgument, attribute, allowedAttributes)
-          else: return False
+        # Check if any required arguments are missing.
+        for attribute in allowedAttributes:
+          if allowedAttributes[attribute][1] and attribute not in observedAttributes:
+            if self.allowTermination: self.errors.missingArgumentAttributeInToolConfigurationFile(tool, group, longFormArgument, attribute, allowedAttributes)
+            else: return False
 
-      # Store the attributes.
-      self.argumentAttributes[tool][longFormArgument] = attributes
+        # Store the attributes.
+        self.argumentAttributes[tool][longFormArgument] = attributes
+      except configurationError: success = False
 
-    return True
+    return success
 
   # Set the attributes allowed in the argument block. The structure describes the expected data type, 
   # whether the attribute is requred and finally, the name of the attribute in the data structure storing
@@ -967,12 +1019,15 @@ class toolConfiguration:
   def checkCategory(self, tool, allowedCategories):
     categories = self.attributes[tool].categories
 
+    success = True
     for category in categories:
-      if category not in allowedCategories:
-        if self.allowTermination: self.errors.invalidCategory(tool, category, allowedCategories, False)
-        else: return False
+      try:
+        if category not in allowedCategories:
+          if self.allowTermination: self.errors.invalidCategory(tool, category, allowedCategories, False)
+          else: return False
+      except configurationError: success = False
 
-    return True
+    return success
 
   #TODO IS THIS NEEDED. VALUES ADDED EARLIER.
   # Connect argument lists to the arguments they use.
@@ -988,11 +1043,152 @@ class toolConfiguration:
 
     return True
 
+  # Read and validate all of the tool configuration files in a directory. The files are processed in
+  # parallel, each in a separate toolConfiguration, and all of the valid tools are then merged into
+  # this configuration. Problems with a configuration file do not result in termination. Instead, a
+  # list of (tool, filename, message) tuples describing the failures is returned.
+  def loadToolConfigurationDirectory(self, directory, allowedCategories, numberOfProcesses = None):
+    filenames = []
+    for tool, filename in self.getToolConfigurationFiles(directory): filenames.append((tool, filename, allowedCategories))
+
+    # Process the files. If only a single process is requested, or there is at most one file, do not
+    # create a pool of processes.
+    if numberOfProcesses == 1 or len(filenames) < 2: results = map(loadToolConfigurationFile, filenames)
+    else:
+      pool = multiprocessing.Pool(numberOfProcesses)
+      try: results = pool.map(loadToolConfigurationFile, filenames)
+      finally:
+        pool.close()
+        pool.join()
+
+    # Merge the valid tools into this configuration and collect the errors.
+    errors = []
+    for tool, filename, toolData, message in results:
+      if toolData == None: errors.append((tool, filename, message))
+      else: self.addToolData(tool, toolData)
+
+    return errors
+
+  # Get a list of (tool, filename) tuples for all of the tool configuration files in a directory.
+  def getToolConfigurationFiles(self, directory):
+    toolFiles = []
+    for filename in sorted(os.listdir(directory)):
+      if filename.endswith('.json') and not filename.endswith('_parameterSets.json'):
+        toolFiles.append((filename[:-5], os.path.join(directory, filename)))
+
+    return toolFiles
+
+  # Register all of the tool configuration files in a directory for lazy loading. The tools are
+  # included in the available tools, but the files are not read until the tool is used.
+  def registerToolConfigurationDirectory(self, directory, allowedCategories):
+    for tool, filename in self.getToolConfigurationFiles(directory): self.registerToolConfigurationFile(tool, filename, allowedCategories)
+
+  # Register a single tool configuration file for lazy loading.
+  def registerToolConfigurationFile(self, tool, filename, allowedCategories):
+    if tool in self.argumentAttributes: return
+    self.lazyTools[tool]      = (filename, allowedCategories)
+    self.availableTools[tool] = tool
+
+  # If a tool has been registered for lazy loading, read and validate its configuration file. Return
+  # True if the tool was loaded.
+  def loadLazyTool(self, tool):
+    if tool not in self.lazyTools: return False
+
+    filename, allowedCategories = self.lazyTools.pop(tool)
+    data                        = fileOperations().readConfigurationFile(filename)
+    self.processConfigurationData(tool, data, allowedCategories, allowTermination = True)
+
+    return True
+
+  # Add the processed data for a tool (as returned by getToolData) to this configuration.
+  def addToolData(self, tool, toolData):
+    self.availableTools[tool]     = tool
+    self.attributes[tool]         = toolData['attributes']
+    self.argumentAttributes[tool] = toolData['argumentAttributes']
+    self.longFormArguments[tool]  = toolData['longFormArguments']
+    self.shortFormArguments[tool] = toolData['shortFormArguments']
+    self.buildEdgeTemplates(tool)
+
+  # Get the validated data for all of the tools that have been loaded, for storing in a compiled
+  # snapshot.
+  def getSnapshotData(self):
+    snapshotData = {}
+    for tool in self.argumentAttributes: snapshotData[tool] = self.getToolData(tool)
+
+    return snapshotData
+
+  # Add the tools stored in a compiled snapshot to this configuration.
+  def loadSnapshotData(self, snapshotData):
+    for tool in snapshotData:
+      if tool in self.lazyTools: del self.lazyTools[tool]
+      self.addToolData(tool, snapshotData[tool])
+
+  # Get all of the processed data for a tool.
+  def getToolData(self, tool):
+    toolData                       = {}
+    toolData['attributes']         = self.attributes[tool]
+    toolData['argumentAttributes'] = self.argumentAttributes[tool]
+    toolData['longFormArguments']  = self.longFormArguments[tool]
+    toolData['shortFormArguments'] = self.shortFormArguments[tool]
+
+    return toolData
+
+  # Build the attributes for an edge associated with each argument of the tool. These templates must
+  # not be modified, since they are shared by all edges for the argument.
+  def buildEdgeTemplates(self, tool):
+    self.edgeTemplates[tool] = {}
+    for argument in self.argumentAttributes[tool]:
+      attributes = edgeAttributes()
+
+      # Find the values from the tool configuration file for this argument.
+      attributes.longFormArgument  = argument
+      attributes.shortFormArgument = self.getArgumentAttribute(tool, argument, 'shortFormArgument')
+
+      # Find the command line argument that should be used in the makefile, e.g. that the tool expects.
+      # The configuration file may define a different value for consistency across the tools, but the
+      # tool itself must be supplied with what it expects.
+      commandLineArgument            = self.getArgumentAttribute(tool, argument, 'commandLineArgument')
+      attributes.commandLineArgument = argument if commandLineArgument == None else commandLineArgument
+
+      # Identify if the edge represents a filename stub.
+      attributes.isFilenameStub = self.getArgumentAttribute(tool, argument, 'isFilenameStub')
+      if attributes.isFilenameStub == None: attributes.isFilenameStub = False
+
+      # Determine if the option represents an input file.
+      attributes.isInput = self.getArgumentAttribute(tool, argument, 'isInput')
+
+      # Check if the argument should be written to the comand line or not.
+      includeOnCommandLine = self.getArgumentAttribute(tool, argument, 'includeOnCommandLine')
+      if includeOnCommandLine != None: attributes.includeOnCommandLine = includeOnCommandLine
+
+      # Check if the argument needs to be modified when written to the command line.
+      modifyArgument = self.getArgumentAttribute(tool, argument, 'modifyArgument')
+      if modifyArgument: attributes.modifyArgument = modifyArgument
+
+      # Define how to handle streaming files.
+      attributes.ifOutputIsStream = self.getArgumentAttribute(tool, argument, 'outputStream')
+      attributes.ifInputIsStream  = self.getArgumentAttribute(tool, argument, 'inputStream')
+
+      self.edgeTemplates[tool][argument] = attributes
+
+  # Get the edge attributes template for a tool argument. The argument must be in its long form. If
+  # the templates for the tool have not been built, build them now.
+  def getEdgeTemplate(self, tool, argument):
+    if tool not in self.edgeTemplates:
+      if tool not in self.argumentAttributes and not self.loadLazyTool(tool): self.errors.invalidToolInGetArguments(tool)
+      self.buildEdgeTemplates(tool)
+
+    try: return self.edgeTemplates[tool][argument]
+    except KeyError: self.errors.unknownToolArgument(tool, argument)
+
   # Get a tool argument attribute.
   def getGeneralAttribute(self, tool, attribute):
     try: value = getattr(self.attributes[tool], attribute)
     except:
 
+      # If the tool has not yet been loaded, load it and try again.
+      if self.loadLazyTool(tool): return self.getGeneralAttribute(tool, attribute)
+
       # Identify the source of the error.
       if tool not in self.attributes: self.errors.invalidToolInGeneralToolAttributes(tool, attribute)
       else: return None
@@ -1004,7 +1200,7 @@ class toolConfiguration:
     arguments = []
 
     # If the supplied tool is invalid.
-    if tool not in self.argumentAttributes: self.errors.invalidToolInGetArguments(tool)
+    if tool not in self.argumentAttributes and not self.loadLazyTool(tool): self.errors.invalidToolInGetArguments(tool)
 
     # Find all the arguments.
     for argument in self.argumentAttributes[tool]: arguments.append(argument)
@@ -1015,6 +1211,9 @@ class toolConfiguration:
     try: value = getattr(self.argumentAttributes[tool][argument], attribute)
     except:
 
+      # If the tool has not yet been loaded, load it and try again.
+      if self.loadLazyTool(tool): return self.getArgumentAttribute(tool, argument, attribute)
+
       # Identify the source of the error.
       if tool not in self.argumentAttributes:
         self.errors.invalidToolInToolArgumentAttributes(tool, argument, attribute, problemID = 'tool')
@@ -1044,8 +1243,8 @@ class toolConfiguration:
   # Get the long form of a tool argument.
   def getLongFormArgument(self, tool, argument, allowTermination = True):
 
-    # Check that the tool is valid.
-    if tool not in self.longFormArguments:
+    # Check that the tool is valid, loading it if necessary.
+    if tool not in self.longFormArguments and not self.loadLazyTool(tool):
       if allowTermination: self.errors.missingToolInGetLongFormArgument(tool)
       else: return None
 
@@ -1084,3 +1283,28 @@ class toolConfiguration:
   # Determine whether to add an extension when constructing the filename.
   def addExtensionFromConstruction(self, tool, argument):
     return self.argumentAttributes[tool][argument].constructionInstructions['add extension']
+
+# Read and validate a single tool configuration file. This is defined outside of the toolConfiguration
+# class so that it can be used by a pool of processes. The argument is a (tool, filename, allowed
+# categories) tuple and a (tool, filename, tool data, error message) tuple is returned. If the file
+# is not valid, the tool data is None.
+def loadToolConfigurationFile(arguments):
+  tool, filename, allowedCategories = arguments
+  tools                             = toolConfiguration()
+
+  try:
+    data = fileOperations().readConfigurationFile(filename, allowTermination = False)
+    if data == False: return (tool, filename, None, 'The configuration file could not be read or is not valid json.')
+
+    # Collect the error from the configuration file, so that the reason for the failure can be returned.
+    collector = configurationErrorCollector()
+    if not tools.validateConfigurationData(tool, data, allowedCategories, collector, filename):
+      message = '; '.join(collector.formatErrors())
+      return (tool, filename, None, message if message else 'The configuration file failed validation.')
+
+  # Some checks terminate regardless of the allowTermination setting. The error message has already
+  # been written, so just record the failure.
+  except SystemExit: return (tool, filename, None, 'Processing of the configuration file was terminated.')
+  except Exception as exception: return (tool, filename, None, 'Unexpected error: ' + str(exception))
+
+  return (tool, filename, tools.getToolData(tool), None)